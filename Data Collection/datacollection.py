@@ -1,16 +1,20 @@
 import schwabdev
 import json
-import time
 import os
+import sys
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Repository root, for infrastructure
+from infrastructure.adapters.rate_limiter import BULK, rate_limited
+
 # Initialize the Schwab client
 load_dotenv()
 app_key = os.getenv('app_key')         # Replace with your app key
 app_secret = os.getenv('app_secret')  # Replace with your app secret
 callback_url = os.getenv('callback_url')  # Replace with your callback URL
-client = schwabdev.Client(app_key, app_secret, callback_url)
+# Bulk collection yields to any other API caller in this process
+client = rate_limited(schwabdev.Client(app_key, app_secret, callback_url), lanes={'price_history': BULK})
 
 # Placeholder list of 100 stock symbols (replace with actual symbols)
 symbols = ['AAPL', 'ABBV', 'ABT', 'ACN', 'ADBE', 'AIG', 'AMD', 'AMGN',
@@ -64,7 +68,6 @@ def fetch_minute_data(symbol, days=60):
         
         # Move the window back
         end_date = start_date
-        time.sleep(0.5)  # Delay to avoid hitting rate limits
 
     # Sort candles by timestamp to ensure chronological order
     all_candles.sort(key=lambda x: x["datetime"])
@@ -1,18 +1,36 @@
 import logging
-import json
 import datetime
-from time import sleep, time
-from collections import deque
+import asyncio
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from schwabdev import Client
 from schwabdev.client import Stream
 from dotenv import load_dotenv
 import os
-import zoneinfo
-from domain.entities.indicators import Indicators
 from domain.entities.portfolio import Portfolio
+from domain.entities.strategy import StrategyParameters, evaluate_signal, has_macd_crossover
+from application.message_queue import MessageQueue, BackpressurePolicy
+from application.stream_decoder import StreamDecoder, chart_updates
+from application.sharded_runtime import ShardedRuntime
+from application.latency import LatencyRecorder
+from application.candidate_queue import CandidateQueue, screener_candidates
+from application.screener_pipeline import ScreenerPipeline
+from application.subscription_manager import SubscriptionManager
+from application.order_gateway import OrderGateway, TERMINAL_STATUSES
+from application.position_tracker import PositionTracker
+from infrastructure.adapters.clock import RealClock, Scheduler, MarketHours
+from infrastructure.adapters.tape import TapeRecorder
+from infrastructure.adapters.rate_limiter import RateLimitedClient, rate_limited
+
+# Per-stage latencies recorded besides the queue wait (receive to dequeue) kept by MessageQueue
+LATENCY_STAGES = ('decode', 'indicators', 'decision', 'tick_to_decision', 'tick_to_order', 'order_queue', 'order_ack', 'order_fill')
 
 class TradingBot:
-    def __init__(self, app_key, app_secret, callback_url="https://127.0.0.1", tokens_file="tokens.json", simulate=True, initial_cash=100000.0):
+    def __init__(self, app_key, app_secret, callback_url="https://127.0.0.1", tokens_file="tokens.json", simulate=True, initial_cash=100000.0, strategy=None,
+                 clock=None, client=None, stream=None, market_hours=None, queue_size=10000, backpressure=None,
+                 latency_dump=None, screener_workers=4, subscription_hold=7200.0,
+                 tape=None, order_workers=2, order_poll_interval=5.0, rate_limiter=None, fill_simulator=None):
         """
         Initialize the TradingBot with necessary components.
 
@@ -23,13 +41,64 @@ class TradingBot:
             tokens_file (str): Path to the tokens file.
             simulate (bool): Whether to simulate trades or execute real orders.
             initial_cash (float): Initial cash for the simulated portfolio.
+            strategy (StrategyParameters, optional): Strategy thresholds. Defaults to StrategyParameters().
+            clock (RealClock or VirtualClock, optional): Time source for timers. Defaults to RealClock().
+            client (optional): Pre-built API client, e.g. a SimulatedStream for replays. Used as given unless
+                rate_limiter is passed; a client built here is always wrapped in the process-wide limiter.
+            stream (optional): Pre-built streamer, e.g. a SimulatedStream for replays.
+            market_hours (MarketHours, optional): Session window for the live streamer.
+            queue_size (int): Maximum number of streamer messages buffered for the trading loop.
+            backpressure (BackpressurePolicy, optional): Overload handling. Defaults to shedding in real time
+                and to BackpressurePolicy.lossless() under a virtual clock.
+            latency_dump (str, optional): JSON file rewritten with per-stage latency percentiles on every report.
+            screener_workers (int): Threads evaluating screener candidates in the background.
+            subscription_hold (float): Seconds a symbol stays subscribed after it last qualified or held a position.
+            tape (str, optional): Tape file recording every raw streamer message for replay with TapeReplayer.
+            order_workers (int): Threads placing real orders off the trading loop.
+            order_poll_interval (float): Seconds between polls of live order states and positions.
+            rate_limiter (PriorityRateLimiter, optional): Limiter the client's API calls go through.
+                Defaults to shared_limiter() for a client built here.
+            fill_simulator (FillSimulator, optional): Fills simulated orders with latency, slippage, partial fills
+                and commissions. Defaults to filling at once at the decision bar's close.
         """
-        self.client = Client(app_key, app_secret, callback_url, tokens_file)
-        self.stream = Stream(self.client)
-        self.indicators = Indicators()
+        if client is None or rate_limiter is not None:
+            client = rate_limited(client or Client(app_key, app_secret, callback_url, tokens_file), limiter=rate_limiter)
+        self.client = client
+        self.stream = stream or Stream(self.client)
+        self.clock = clock or RealClock()
+        self.scheduler = Scheduler(self.clock)
+        self.market_hours = market_hours or MarketHours()
+        self.report_interval = 300  # 5 minutes
+        self.shard_timeout = 30.0  # Seconds a screener warm-up waits for its shard
+        self.running = False
+        self.strategy = strategy or StrategyParameters()
+        self.indicators = self.strategy.create_indicators()
         self.portfolio = Portfolio(initial_cash=initial_cash)
         self.simulate = simulate
-        self.shared_list = []
+        self.fills = fill_simulator if simulate else None
+        self.bar_time = None  # Chart time of the update the indicators are applying
+        self.signal_times = {}  # symbol -> chart time of the bar behind its latest decision
+        self.open_tickets = {}  # symbol -> ids of live gateway tickets not yet in a terminal status
+        self.backpressure = backpressure or (BackpressurePolicy() if self.clock.realtime else BackpressurePolicy.lossless())
+        self.message_queue = MessageQueue(maxsize=queue_size, overflow=self.backpressure.overflow)
+        self.lag_alerts = 0
+        self.last_lag_alert = None
+        self.latency = LatencyRecorder(LATENCY_STAGES)
+        self.latency.stages['queue_wait'] = self.message_queue.wait_histogram
+        self.latency_dump = latency_dump
+        self.batch_received_ns = None  # perf_counter_ns arrival of the oldest message in the current batch
+        self.decoder = StreamDecoder()
+        self.wake = None  # Set by run_async to wake the event loop from the streamer thread
+        self.executor = None
+        self.sharded = None
+        self.loop = None
+        self.screener = None
+        self.screener_workers = screener_workers
+        self.subscriptions = SubscriptionManager(self.stream, self.clock, hold=subscription_hold)
+        self.tape = TapeRecorder(tape) if tape else None
+        self.orders = None
+        self.tracker = None
+        self.order_poll_interval = order_poll_interval
         self.logger = logging.getLogger('TradingBot')
         logging.basicConfig(level=logging.INFO)
         self.account_hash = None
@@ -40,6 +109,8 @@ class TradingBot:
                 self.account_hash = accounts[0]["hashValue"]
             else:
                 raise Exception("Failed to get account hash")
+            self.tracker = PositionTracker(self.fetch_positions, self.fetch_orders, on_update=self._notify)
+            self.orders = OrderGateway(self.place_order, self.tracker.order_status, workers=order_workers, on_update=self._notify)
 
     def setup(self, initial_symbols):
         """
@@ -49,115 +120,513 @@ class TradingBot:
             initial_symbols (list): List of symbols to subscribe to initially.
         """
         for symbol in initial_symbols:
-            if "CHART_EQUITY" not in self.stream.subscriptions:
-                self.stream.subscriptions["CHART_EQUITY"] = {}
-            self.stream.subscriptions["CHART_EQUITY"][symbol] = ["0", "1", "2", "3", "4", "5", "6", "7", "8"]
+            self._register_subscription(symbol)
             self._load_initial_history(symbol)
 
-    def _load_initial_history(self, symbol, min_hourly_candles=35, initial_days=5):
+    def _register_subscription(self, symbol):
+        if "CHART_EQUITY" not in self.stream.subscriptions:
+            self.stream.subscriptions["CHART_EQUITY"] = {}
+        self.stream.subscriptions["CHART_EQUITY"][symbol] = ["0", "1", "2", "3", "4", "5", "6", "7", "8"]
+        self.subscriptions.track(symbol)
+
+    def _fetch_history(self, symbol, days, label="history"):
         """
-        Load initial historical data for a symbol.
+        Request minute candles for a symbol. Blocking; safe to run on an executor thread.
 
         Args:
             symbol (str): Stock symbol.
-            min_hourly_candles (int): Minimum number of hourly candles required.
-            initial_days (int): Initial number of days to fetch.
+            days (int): Number of days to fetch.
+            label (str): Description used in the error log.
+
+        Returns:
+            list: Candle dicts, or None if the request failed.
         """
         history_response = self.client.price_history(
             symbol=symbol,
             periodType="day",
-            period=initial_days,
+            period=days,
             frequencyType="minute",
             frequency=1,
             needExtendedHoursData=False
         )
-        if history_response.ok:
-            history_data = history_response.json()
-            candles = history_data.get('candles', [])
-            for candle in candles:
-                close = candle['close']
-                volume = candle['volume']
-                timestamp = candle['datetime']
-                self.indicators.update_minute_data(symbol, close, volume, timestamp)
-
-            if symbol in self.indicators.hourly_data and len(self.indicators.hourly_data[symbol]) < min_hourly_candles:
-                additional_days = 5
-                history_response = self.client.price_history(
-                    symbol=symbol,
-                    periodType="day",
-                    period=initial_days + additional_days,
-                    frequencyType="minute",
-                    frequency=1,
-                    needExtendedHoursData=False
-                )
-                if history_response.ok:
-                    history_data = history_response.json()
-                    candles = history_data.get('candles', [])
-                    for candle in candles:
-                        close = candle['close']
-                        volume = candle['volume']
-                        timestamp = candle['datetime']
-                        self.indicators.update_minute_data(symbol, close, volume, timestamp)
-                else:
-                    self.logger.error(f"Failed to fetch additional history for {symbol}: {history_response.text}")
+        if not history_response.ok:
+            self.logger.error(f"Failed to fetch {label} for {symbol}: {history_response.text}")
+            return None
+        return history_response.json().get('candles', [])
+
+    def _apply_history(self, symbol, candles, indicators=None):
+        indicators = indicators or self.indicators
+        for candle in candles:
+            indicators.update_minute_data(symbol, candle['close'], candle['volume'], candle['datetime'])
+
+    def _needs_more_history(self, symbol, min_hourly_candles, indicators=None):
+        indicators = indicators or self.indicators
+        return symbol in indicators.hourly_data and len(indicators.hourly_data[symbol]) < min_hourly_candles
+
+    def _warm_up(self, symbol, min_hourly_candles=35, initial_days=5, fetch=None, indicators=None):
+        """
+        Feed recent history into the indicators, fetching more days if too few hourly candles result.
+
+        Args:
+            fetch (callable, optional): History request with the signature of _fetch_history. Defaults to _fetch_history.
+            indicators (Indicators, optional): Target state. Defaults to the bot's own indicators.
+
+        Returns:
+            bool: False if the initial history request failed.
+        """
+        fetch = fetch or self._fetch_history
+        candles = fetch(symbol, initial_days)
+        if candles is None:
+            return False
+        self._apply_history(symbol, candles, indicators)
+        if self._needs_more_history(symbol, min_hourly_candles, indicators):
+            additional_days = 5
+            candles = fetch(symbol, initial_days + additional_days, "additional history")
+            if candles is not None:
+                self._apply_history(symbol, candles, indicators)
+        return True
+
+    def _load_initial_history(self, symbol, min_hourly_candles=35, initial_days=5):
+        """
+        Load initial historical data for a symbol.
+
+        Args:
+            symbol (str): Stock symbol.
+            min_hourly_candles (int): Minimum number of hourly candles required.
+            initial_days (int): Initial number of days to fetch.
+        """
+        if self._warm_up(symbol, min_hourly_candles, initial_days):
             self.logger.info(f"Loaded historical data for {symbol}")
-        else:
-            self.logger.error(f"Failed to fetch history for {symbol}: {history_response.text}")
 
     def response_handler(self, message):
-        """Append incoming streamer messages to the shared list."""
-        self.shared_list.append(message)
+        """Enqueue incoming streamer messages for the trading loop."""
+        if self.tape:
+            self.tape.record(message)
+        self.message_queue.put(message)
+        self._notify()
+
+    def _notify(self):
+        wake = self.wake
+        if wake:
+            try:
+                wake()
+            except RuntimeError:
+                pass  # Event loop already closed
+
+    def start_stream(self):
+        """Start the streamer: gated by market hours in real time, immediately under a virtual clock."""
+        if self.clock.realtime:
+            self.stream.start_auto(
+                receiver=self.response_handler,
+                start_time=self.market_hours.start_time,
+                stop_time=self.market_hours.stop_time,
+                on_days=self.market_hours.on_days,
+                now_timezone=self.market_hours.timezone,
+                daemon=True
+            )
+        else:
+            self.stream.start(receiver=self.response_handler, daemon=True)
+
+    def report(self):
+        """Periodic report timer callback."""
+        if self.stream.active:
+            self.portfolio.report_gains_losses()
+            stats = self.message_queue.stats()
+            self.logger.info(f"[Queue Report] Depth: {stats['depth']} (max {stats['max_depth']}), Processed: {stats['dequeued']}, "
+                             f"Dropped: {stats['dropped_chart']} chart / {stats['dropped_screener']} screener, Lag Alerts: {self.lag_alerts}, "
+                             f"Wait: {stats['mean_wait_ms']:.2f} ms mean / {stats['max_wait_ms']:.2f} ms max, "
+                             f"Consumer Idle: {stats['consumer_idle_s']:.1f} s")
+            if self.sharded:
+                sharded = self.sharded.stats()
+                self.logger.info(f"[Shard Report] Shards: {sharded['shards']}, Routed per Shard: {sharded['routed']}, Decisions: {sharded['decisions']}")
+            self.logger.info(f"[Latency Report] {self.latency.format_report()}")
+            if self.latency_dump:
+                self.latency.dump(self.latency_dump)
+            if self.screener:
+                screened = self.screener.stats()
+                self.logger.info(f"[Screener Report] Submitted: {screened['submitted']}, Completed: {screened['completed']}, "
+                                 f"In Flight: {screened['in_flight']}, Queued: {screened['queued']}, "
+                                 f"Evicted: {screened['evicted']}, Stale: {screened['stale']}")
+            if isinstance(self.client, RateLimitedClient):
+                lanes = self.client.limiter.stats()
+                self.logger.info("[Rate Limit Report] " + ", ".join(f"{lane}: {stats['granted']} granted, {stats['waiting']} waiting, "
+                                                                     f"{stats['waited_s']:.1f} s waited" for lane, stats in lanes.items()))
+            if self.fills:
+                filled = self.fills.stats()
+                self.logger.info(f"[Fill Report] Submitted: {filled['submitted']}, Filled: {filled['filled']}, Expired: {filled['expired']}, "
+                                 f"Rejected: {filled['rejected']}, "
+                                 f"Open: {filled['open']}, Partial Fills: {filled['partial_fills']}, Mean Delay: {filled['mean_delay_bars']:.1f} bars, "
+                                 f"Slippage: {filled['slippage_cost']:.2f}, Commissions: {filled['commissions']:.2f}")
+            if self.orders:
+                orders = self.orders.stats()
+                self.logger.info(f"[Order Report] Submitted: {orders['submitted']}, Placed: {orders['placed']}, Rejected: {orders['rejected']}, "
+                                 f"Filled: {orders['filled']}, Open: {orders['open']}, Pending: {orders['pending']}")
+                tracked = self.tracker.stats()
+                self.logger.info(f"[Position Report] Positions: {tracked['positions']}, Orders: {tracked['orders']}, Polls: {tracked['polls']}, "
+                                 f"Failures: {tracked['failures']}, Deltas: {tracked['position_deltas']} position / {tracked['order_deltas']} order, "
+                                 f"Last Poll: {tracked['poll_ms']:.0f} ms")
+            subscribed = self.subscriptions.stats()
+            self.logger.info(f"[Subscription Report] Subscribed: {subscribed['subscribed']}, Requests: {subscribed['requests']}, "
+                             f"Added: {subscribed['added']}, Dropped: {subscribed['dropped']}")
+            decoded = self.decoder.stats()
+            self.logger.info(f"[Decode Report] Messages: {decoded['messages']}, Chart Updates: {decoded['updates']}, "
+                             f"Applied After Coalescing: {decoded['kept']}, Collapsed Batches: {decoded['collapsed_batches']}")
+
+    def next_batch(self, first=None):
+        """
+        Drain every pending message and apply the backpressure policy to the batch.
+
+        Args:
+            first (str, optional): A message already taken from the queue.
+
+        Returns:
+            tuple: (list of messages, bool whether the batch should be collapsed)
+        """
+        received_ns = self.message_queue.last_received_ns if first is not None else None
+        lag = self.message_queue.lag()
+        messages = ([first] if first is not None else []) + self.message_queue.drain()
+        self.batch_received_ns = received_ns if received_ns is not None else self.message_queue.last_received_ns
+        policy = self.backpressure
+        if policy.lag_alert is not None and lag > policy.lag_alert:
+            self.lag_alerts += 1
+            now = time.monotonic()
+            if self.last_lag_alert is None or now - self.last_lag_alert >= policy.alert_interval:
+                self.last_lag_alert = now
+                self.logger.warning(f"[Lag Alert] Consumer is {lag:.1f} s behind the stream with {len(messages)} messages pending")
+        return messages, policy.collapse_lag is not None and lag > policy.collapse_lag
+
+    def process_batch(self, raw_messages, execute=None, on_screener=None, on_chart=None, collapse=False):
+        """
+        Decode a burst of streamer messages and apply them in one pass.
+
+        Chart updates are coalesced to the latest per (symbol, minute) and fed to
+        the indicators in a single batch call. Under a virtual clock the batch is
+        split wherever a timer comes due, so timers fire at the same simulated
+        times as they would message by message.
+
+        Args:
+            raw_messages (list): JSON strings received from the streamer.
+            execute (callable, optional): Called with (action, symbol, price) per decision. Defaults to execute.
+            on_screener (callable, optional): SCREENER_EQUITY handler. Defaults to submit_screener when the
+                background screener runs, otherwise stock_scanner.
+            on_chart (callable, optional): Takes over chart updates entirely, e.g. ShardedRuntime.route.
+            collapse (bool): Keep only the latest update per symbol, as chosen by next_batch under overload.
+        """
+        execute = execute or self.execute
+        on_screener = on_screener or (self.submit_screener if self.screener else self.stock_scanner)
+
+        def trade(updates):
+            for decision in self.decisions(updates):
+                execute(*decision, received_ns=self.batch_received_ns)
+
+        route = on_chart or trade
+
+        def on_bars(updates):
+            self.portfolio.update_prices(updates)
+            if self.fills:
+                # Orders already open trade in these bars before new decisions are made on them
+                self.apply_fills(self.fills.on_bars(updates))
+            route(updates)
+
+        started = time.perf_counter_ns()
+        batch = self.decoder.decode(raw_messages, collapse)
+        self.latency.record('decode', started)
+        pending = []
+        for service_time, updates in itertools.groupby(batch.chart, key=lambda update: update[4]):
+            if not self.clock.seeded:
+                # A replay starts at its first recorded timestamp; timers are anchored there
+                self.clock.advance_to(service_time / 1000.0)
+            pending.extend(updates)
+            deadline = self.scheduler.next_deadline()
+            if not self.clock.realtime and deadline is not None and service_time / 1000.0 >= deadline:
+                on_bars(pending)
+                pending = []
+                self.clock.advance_to(service_time / 1000.0)
+                self.scheduler.run_pending()
+        if pending:
+            on_bars(pending)
+        if batch.timestamp is not None:
+            self.clock.advance_to(batch.timestamp / 1000.0)
+        for service in batch.screener:
+            on_screener(service)
+        for heartbeat in batch.heartbeats:
+            self.logger.info(f"[Heartbeat]({datetime.datetime.fromtimestamp(heartbeat // 1000)})")
+        self.scheduler.run_pending()
+
+    def process_message(self, raw_message):
+        """Decode one streamer message and dispatch its services."""
+        self.process_batch([raw_message])
+
+    def _start_timers(self):
+        self.scheduler.call_every(self.report_interval, self.report)
+        if self.tracker:
+            self.tracker.poll()
+            self.scheduler.call_every(self.order_poll_interval, self.tracker.poll)
+
+    def start_screener(self, screen=None):
+        """
+        Start the background screener pipeline.
+
+        Args:
+            screen (callable, optional): (symbol, fetch) -> (action, state) run on screener workers. Defaults to _screen_candidate.
+        """
+        self.screener = ScreenerPipeline(self._fetch_history, screen or self._screen_candidate, workers=self.screener_workers,
+                                         on_result=self._notify, candidates=CandidateQueue(clock=self.clock))
+
+    def _screen_candidate(self, symbol, fetch, min_hourly_candles=35, initial_days=5):
+        """Warm up a candidate in private Indicators on a screener worker, so the bot's own state has a single writer."""
+        indicators = self.strategy.create_indicators()
+        if not self._warm_up(symbol, min_hourly_candles, initial_days, fetch, indicators):
+            return None, None
+        return evaluate_signal(indicators.indicators.get(symbol, {}), self.strategy), indicators
+
+    def submit_screener(self, service):
+        """Hand SCREENER_EQUITY candidates to the background screener and reconcile subscriptions."""
+        self.screener.submit([(symbol, score) for symbol, score in screener_candidates(service) if not self.is_subscribed(symbol)])
+        self.sync_subscriptions()
+
+    def apply_screener_results(self):
+        """Subscribe to screened buy candidates, first adopting the indicator state warmed up by the screener."""
+        wanted = False
+        for symbol, action, state in self.screener.drain():
+            if action != "buy" or self.is_subscribed(symbol):
+                continue
+            if state is not None:
+                self.indicators.adopt_symbol(symbol, state)
+            self.subscriptions.want(symbol)
+            wanted = True
+        if wanted:
+            self.sync_subscriptions()
+
+    def sync_subscriptions(self):
+        """Send one ADD and one UNSUBS for the difference between desired and current subscriptions."""
+        added, dropped = self.subscriptions.sync(self.send_request, keep=self.open_positions())
+        if added:
+            self.logger.info(f"Subscribed to {','.join(added)} based on screener data and buy condition")
+        if dropped:
+            self.logger.info(f"Unsubscribed from {','.join(dropped)} as no position is open")
+
+    def send_request(self, request):
+        """Send a streamer request; under run_async it is offloaded because Stream.send calls asyncio.run."""
+        if self.loop is not None:
+            task = self.loop.create_task(self._offload(self.stream.send, request))
+            self.pending_requests.add(task)
+            task.add_done_callback(self.pending_requests.discard)
+        else:
+            self.stream.send(request)
 
-    def run(self):
+    def run(self, initial_symbols=None):
         """Start the trading bot's main loop."""
-        initial_symbols = ["TSLA"]  # Add more symbols as needed
+        initial_symbols = initial_symbols or ["TSLA"]  # Add more symbols as needed
         self.setup(initial_symbols)
 
-        self.stream.start_auto(
-            receiver=self.response_handler,
-            start_time=datetime.time(9, 29, 0),
-            stop_time=datetime.time(16, 0, 0),
-            on_days=(0, 1, 2, 3, 4),
-            now_timezone=zoneinfo.ZoneInfo("America/New_York"),
-            daemon=True
-        )
+        self.start_stream()
 
         self.stream.send(self.stream.chart_equity(",".join(initial_symbols), "0,1,2,3,4,5,6,7,8"))
         self.stream.send(self.stream.screener_equity("$SPX.X_AVERAGE_PERCENT_VOLUME_60", "0,1,2,3,4,5,6,7,8"))
 
-        report_interval = 300  # 5 minutes
-        last_report_time = time()
-
-        while True:
-            while len(self.shared_list) > 0:
-                message = json.loads(self.shared_list.pop(0))
-                for rtype, services in message.items():
-                    if rtype == "data":
-                        for service in services:
-                            if service["service"] == "CHART_EQUITY":
-                                self.stock_trader(service)
-                            elif service["service"] == "SCREENER_EQUITY":
-                                self.stock_scanner(service)
-                    elif rtype == "notify":
-                        for service in services:
-                            self.logger.info(f"[Heartbeat]({datetime.datetime.fromtimestamp(int(service.get('heartbeat', 0))//1000)})")
-            current_time = time()
-            if current_time - last_report_time >= report_interval and self.stream.active:
-                self.portfolio.report_gains_losses()
-                last_report_time = current_time
-            sleep(0.5)
+        self._start_timers()
+        self.start_screener()
+        self.running = True
+
+        try:
+            while self.running:
+                message = self.message_queue.get(timeout=0.5)
+                if message is not None:
+                    messages, collapse = self.next_batch(message)
+                    self.process_batch(messages, collapse=collapse)
+                self.apply_screener_results()
+                self.apply_order_updates()
+                self.scheduler.run_pending()
+        finally:
+            self.screener.stop()
+            self._stop_orders()
+
+    def stop(self):
+        """Stop the main loop and wake it if it is waiting for messages."""
+        self.running = False
+        self.message_queue.close()
+        self._notify()
+        if self.tape:
+            self.tape.close()
+
+    async def _offload(self, function, *args):
+        """Run a blocking API call on the I/O executor."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _warm_up_async(self, symbol, min_hourly_candles=35, initial_days=5):
+        """_warm_up with the history requests offloaded; indicators are only touched on the event loop."""
+        candles = await self._offload(self._fetch_history, symbol, initial_days)
+        if candles is None:
+            return False
+        self._apply_history(symbol, candles)
+        if self._needs_more_history(symbol, min_hourly_candles):
+            additional_days = 5
+            candles = await self._offload(self._fetch_history, symbol, initial_days + additional_days, "additional history")
+            if candles is not None:
+                self._apply_history(symbol, candles)
+        return True
+
+    async def _load_initial_history_async(self, symbol):
+        if await self._warm_up_async(symbol):
+            self.logger.info(f"Loaded historical data for {symbol}")
+
+    async def _message_task(self):
+        while self.running:
+            self.message_event.clear()
+            messages, collapse = self.next_batch()
+            if messages:
+                self.process_batch(messages, collapse=collapse)
+            self.apply_screener_results()
+            self.apply_order_updates()
+            await asyncio.sleep(0)  # Let request tasks progress between batches
+            if self.running and not len(self.message_queue) and self.screener.results.empty() and not self._order_updates_pending():
+                await self.message_event.wait()
+
+    async def _timer_task(self):
+        while self.running:
+            deadline = self.scheduler.next_deadline()
+            delay = 0.5 if deadline is None else deadline - self.clock.time()
+            await asyncio.sleep(min(max(delay, 0.0), 0.5))
+            self.scheduler.run_pending()
+
+    async def run_async(self, initial_symbols=None, io_workers=8):
+        """
+        Run the bot on an asyncio event loop, e.g. asyncio.run(bot.run_async()).
+
+        Stream messages and periodic reports run as separate tasks, screener
+        warm-ups run in the background screener pipeline and real orders in
+        the order gateway. Blocking schwabdev calls (price history, orders,
+        stream requests) run on thread pools, so one slow request never
+        stalls decisions for subscribed symbols.
+
+        Args:
+            initial_symbols (list, optional): Symbols to subscribe to initially.
+            io_workers (int): Threads available for blocking API calls.
+        """
+        initial_symbols = initial_symbols or ["TSLA"]
+        loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="TradingBotIO")
+        self.message_event = asyncio.Event()
+        self.pending_requests = set()
+        self.wake = lambda: loop.call_soon_threadsafe(self.message_event.set)
+        self.loop = loop
+        tasks = []
+        try:
+            for symbol in initial_symbols:
+                self._register_subscription(symbol)
+            await asyncio.gather(*(self._load_initial_history_async(symbol) for symbol in initial_symbols))
+
+            self.start_stream()
+            await self._offload(self.stream.send, self.stream.chart_equity(",".join(initial_symbols), "0,1,2,3,4,5,6,7,8"))
+            await self._offload(self.stream.send, self.stream.screener_equity("$SPX.X_AVERAGE_PERCENT_VOLUME_60", "0,1,2,3,4,5,6,7,8"))
+
+            self._start_timers()
+            self.start_screener()
+            self.running = True
+            tasks = [loop.create_task(self._timer_task())]
+            await self._message_task()
+        finally:
+            self.running = False
+            self.wake = None
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, *self.pending_requests, return_exceptions=True)
+            self.loop = None
+            if self.screener:
+                self.screener.stop()
+            await self._offload(self._stop_orders)
+            self.executor.shutdown(wait=False)
+
+    def _screen_sharded(self, symbol, fetch=None, min_hourly_candles=35, initial_days=5):
+        """Warm up a symbol in its shard: history is fetched here and replayed by the shard, which owns the state."""
+        fetch = fetch or self._fetch_history
+        candles = fetch(symbol, initial_days)
+        if candles is None:
+            return None, None
+        hourly, action = self._load_shard_history(symbol, candles)
+        if hourly is not None and hourly < min_hourly_candles:
+            additional_days = 5
+            candles = fetch(symbol, initial_days + additional_days, "additional history")
+            if candles is not None:
+                hourly, action = self._load_shard_history(symbol, candles)
+        return action, None
+
+    def _load_shard_history(self, symbol, candles):
+        """
+        Replay history in the symbol's shard and wait up to shard_timeout for its answer.
+
+        Returns:
+            tuple: (int or None, str or None) - Hourly candle count and action, or (None, None) if the
+                shard did not answer in time or failed, so the symbol is skipped.
+        """
+        try:
+            return self.sharded.load_history(symbol, candles).result(timeout=self.shard_timeout)
+        except FutureTimeoutError:
+            self.logger.error(f"Shard did not load history for {symbol} within {self.shard_timeout} s; skipping it")
+        except Exception:
+            self.logger.exception(f"Shard failed to load history for {symbol}; skipping it")
+        return None, None
+
+    def run_sharded(self, initial_symbols=None, shards=None):
+        """
+        Run the bot with indicator and decision work sharded across processes.
+
+        Symbols are hash-partitioned across worker processes that each own their
+        slice of the indicator state. This process receives and decodes stream
+        messages, routes compact chart records to the shards, and executes the
+        decisions they publish on the trading loop. Screener warm-ups run in the
+        background screener pipeline and replay history into the owning shard.
+
+        Args:
+            initial_symbols (list, optional): Symbols to subscribe to initially.
+            shards (int, optional): Number of worker processes. Defaults to the CPU count.
+        """
+        initial_symbols = initial_symbols or ["TSLA"]
+        self.sharded = ShardedRuntime(self.strategy, shards, on_result=self._notify)
+        self.sharded.start()
+        self.start_screener(self._screen_sharded)
+        try:
+            for symbol in initial_symbols:
+                self._register_subscription(symbol)
+                if self._screen_sharded(symbol)[0] is not None:
+                    self.logger.info(f"Loaded historical data for {symbol}")
+
+            self.start_stream()
+            self.stream.send(self.stream.chart_equity(",".join(initial_symbols), "0,1,2,3,4,5,6,7,8"))
+            self.stream.send(self.stream.screener_equity("$SPX.X_AVERAGE_PERCENT_VOLUME_60", "0,1,2,3,4,5,6,7,8"))
+
+            self._start_timers()
+            self.running = True
+
+            while self.running:
+                message = self.message_queue.get(timeout=0.5)
+                if message is not None:
+                    messages, collapse = self.next_batch(message)
+                    self.process_batch(messages, on_chart=self._route_sharded, collapse=collapse)
+                self.apply_shard_decisions()
+                self.apply_screener_results()
+                self.apply_order_updates()
+                self.scheduler.run_pending()
+        finally:
+            self.running = False
+            self.screener.stop()
+            self.sharded.stop()
+            self._stop_orders()
+
+    def _route_sharded(self, updates):
+        self.sharded.route(updates, self.batch_received_ns)
+
+    def apply_shard_decisions(self):
+        """Execute the decisions the shards have published, on the trading loop so the portfolio keeps a single writer."""
+        for action, symbol, price, chart_time, received_ns in self.sharded.drain():
+            if received_ns is not None:
+                self.latency.record('tick_to_decision', received_ns)
+            self.signal_times[symbol] = chart_time
+            self.execute(action, symbol, price, received_ns=received_ns)
 
     def has_macd_crossover(self, macdhistory, direction="above"):
-        if len(macdhistory) < 2:
-            return False
-        for i in range(1, min(4, len(macdhistory))):
-            prev_macd, prev_signal = macdhistory[-i-1]
-            curr_macd, curr_signal = macdhistory[-i]
-            if direction == "above" and prev_macd <= prev_signal and curr_macd > curr_signal:
-                return True
-            elif direction == "below" and prev_macd >= prev_signal and curr_macd < curr_signal:
-                return True
-        return False
+        return has_macd_crossover(macdhistory, direction, self.strategy.macd_lookback)
 
     def buy_condition(self, symbol):
         """
@@ -166,165 +635,244 @@ class TradingBot:
         Returns:
             str: "buy", "sell", or "hold"
         """
-        ind = self.indicators.indicators.get(symbol, {})
-        if not ind or len(ind['ma_short_history']) < 2:
-            return "hold"
-
-        ma_short_prev = ind['ma_short_history'][-2]
-        ma_long_prev = ind['ma_long_history'][-2]
-        ma_short_current = ind['ma_short_history'][-1]
-        ma_long_current = ind['ma_long_history'][-1]
-        ma_cross_up = ma_short_prev <= ma_long_prev and ma_short_current > ma_long_current
-        ma_cross_down = ma_short_prev >= ma_long_prev and ma_short_current < ma_long_current
-
-        rsi = ind['rsi_history'][-1] if ind['rsi_history'] else None
-        rsi_buy = rsi is not None and rsi < 70
-        rsi_sell = rsi is not None and rsi > 70
-
-        macd_history = ind['macd_history']
-        macd_buy = self.has_macd_crossover(macd_history, "above")
-        macd_sell = self.has_macd_crossover(macd_history, "below")
-
-        bollinger = ind['bollinger_history'][-1] if ind['bollinger_history'] else (None, None, None)
-        bollinger_condition = False
-        if bollinger[0] is not None:
-            upper, middle, lower = bollinger
-            band_width = (upper - lower) / middle
-            bollinger_condition = band_width < 0.1
-
-        volume_history = ind['volume_history']
-        volume_condition = False
-        if len(volume_history) >= 6:
-            current_volume = volume_history[-1]
-            volume_condition = all(current_volume > v for v in volume_history[-6:-1])
-
-        if ma_cross_up and rsi_buy and macd_buy and bollinger_condition and volume_condition:
-            return "buy"
-        if ma_cross_down and rsi_sell and macd_sell and bollinger_condition:
-            return "sell"
-        return "hold"
+        return evaluate_signal(self.indicators.indicators.get(symbol, {}), self.strategy)
+
+    def decisions(self, updates):
+        """
+        Feed chart updates to the indicators and evaluate the strategy after each hourly close.
+
+        Args:
+            updates (list): (symbol, close, volume, chart_time, service_time) tuples, e.g. from chart_updates().
+
+        Returns:
+            list: (action, symbol, price) for every "buy" or "sell" signal, in order.
+        """
+        decisions = []
+        if not updates:
+            return decisions
+        started = time.perf_counter_ns()
+        deciding = 0
+
+        def evaluate(symbol, close_price):
+            nonlocal deciding
+            decision_start = time.perf_counter_ns()
+            action = self.buy_condition(symbol)
+            decided = time.perf_counter_ns()
+            deciding += decided - decision_start
+            self.latency.record('decision', decision_start, decided)
+            if self.batch_received_ns is not None:
+                self.latency.record('tick_to_decision', self.batch_received_ns, decided)
+            if action in ("buy", "sell"):
+                decisions.append((action, symbol, close_price))
+                self.signal_times[symbol] = self.bar_time
+
+        def feed():
+            for symbol, close, volume, chart_time, _ in updates:
+                self.bar_time = chart_time
+                yield symbol, close, volume, chart_time
+
+        self.indicators.update_minute_batch(feed(), evaluate)
+        # Minute-to-hour aggregation and indicator updates happen together in update_minute_data
+        self.latency.histogram('indicators').record(time.perf_counter_ns() - started - deciding)
+        return decisions
+
+    def should_place(self, action, symbol):
+        """Only buy without a position and only sell with one, and never while an order for the symbol is open."""
+        if self.fills and self.fills.has_open(symbol):
+            return False
+        if self.open_tickets.get(symbol):
+            return False
+        return self.holds(symbol) == (action == "sell")
+
+    def execute(self, action, symbol, price, quantity=100, received_ns=None):
+        if not self.should_place(action, symbol):
+            return
+        if self.simulate and self.fills:
+            if action == "sell":
+                quantity = self.portfolio.get_position(symbol).quantity  # Close what partial fills bought
+            _, fills = self.fills.submit(action, symbol, quantity, price, self.signal_times.pop(symbol, None))
+            self.apply_fills(fills)
+        elif self.simulate:
+            if action == "buy":
+                self.portfolio.buy(symbol, price, quantity)
+            else:
+                self.portfolio.sell(symbol, price, quantity)
+        else:
+            # Hand off to the order gateway; the round-trip never blocks the trading loop
+            if received_ns is not None:
+                self.latency.record('tick_to_order', received_ns)
+            ticket = self.orders.submit(action, symbol, quantity, received_ns)
+            # Positions only change on a later poll, so the open ticket guards against duplicate orders until then
+            self.open_tickets.setdefault(symbol, set()).add(ticket.ticket_id)
+
+    def apply_fills(self, fills):
+        """
+        Book (order, quantity, price, commission) fills from the fill simulator in the portfolio.
+
+        A fill the portfolio refuses, e.g. for insufficient cash, rejects its order:
+        that fill and the order's later fills in the batch go back to the simulator.
+        """
+        for i, (order, quantity, price, commission) in enumerate(fills):
+            if order.status == "REJECTED":
+                continue
+            if order.action == "buy":
+                accepted = self.portfolio.buy(order.symbol, price, quantity, commission)
+            else:
+                accepted = self.portfolio.sell(order.symbol, price, quantity, commission)
+            if not accepted:
+                self.fills.reject(order, [fill for fill in fills[i:] if fill[0] is order])
+
+    def place_order(self, action, symbol, quantity=100):
+        """
+        Place a market order through the API. Blocking; run by the order gateway's workers.
+
+        Args:
+            action (str): "buy" or "sell".
+            symbol (str): Stock symbol.
+            quantity (int): Number of shares.
+
+        Returns:
+            tuple: (bool, str or None) - Whether the order was accepted, and its order ID if the API returned one.
+        """
+        order = {
+            "orderType": "MARKET",
+            "session": "NORMAL",
+            "duration": "DAY",
+            "orderStrategyType": "SINGLE",
+            "orderLegCollection": [
+                {"instruction": action.upper(), "quantity": quantity, "instrument": {"symbol": symbol, "assetType": "EQUITY"}}
+            ]
+        }
+        response = self.client.order_place(self.account_hash, order)
+        if not response.ok:
+            self.logger.error(f"Failed to place {action} order: {response.text}")
+            return False, None
+        # The new order's URL, ending in its ID, is returned in the Location header
+        location = response.headers.get("location")
+        return True, location.rsplit("/", 1)[-1] if isinstance(location, str) else None
+
+    def fetch_orders(self, lookback_hours=24):
+        """
+        States of the account's orders entered in the last lookback_hours. Blocking; run by the position tracker.
+
+        Returns:
+            dict: order ID -> (status, filled quantity), or None if the request failed.
+        """
+        now = self.clock.now(datetime.timezone.utc)
+        response = self.client.account_orders(self.account_hash, now - datetime.timedelta(hours=lookback_hours), now)
+        if not response.ok:
+            self.logger.error(f"Failed to get orders: {response.text}")
+            return None
+        orders = response.json()
+        if not isinstance(orders, list):
+            self.logger.error(f"Unexpected orders response: {orders!r:.200}")
+            return None
+        return {str(order["orderId"]): (order.get("status"), int(order.get("filledQuantity", 0))) for order in orders if "orderId" in order}
+
+    def fetch_positions(self):
+        """
+        The account's positions. Blocking; run by the position tracker.
+
+        Returns:
+            dict: symbol -> (net quantity, average price), or None if the request failed.
+        """
+        response = self.client.account_details(self.account_hash, fields="positions")
+        if not response.ok:
+            self.logger.error(f"Failed to get positions: {response.text}")
+            return None
+        details = response.json()
+        if not isinstance(details, dict):
+            self.logger.error(f"Unexpected positions response: {details!r:.200}")
+            return None
+        positions = {}
+        for position in details.get("securitiesAccount", {}).get("positions", []):
+            quantity = position.get("longQuantity", 0) - position.get("shortQuantity", 0)
+            if quantity:
+                positions[position["instrument"]["symbol"]] = (quantity, position.get("averagePrice", 0.0))
+        return positions
+
+    def _order_updates_pending(self):
+        return self.orders is not None and not (self.orders.updates.empty() and self.tracker.updates.empty())
+
+    def _stop_orders(self):
+        if self.orders:
+            self.orders.stop()
+            self.tracker.stop()
+
+    def apply_order_updates(self):
+        """Apply polled position and order deltas, then log order gateway updates and record their latencies on the trading loop."""
+        if not self.orders:
+            return
+        deltas = self.tracker.apply()
+        for kind, key, value, detail in deltas:
+            if kind == 'position':
+                self.logger.info(f"[REAL] Position {key}: {value} shares" + (f" at {detail:.2f}" if value else ""))
+        if any(delta[0] == 'order' for delta in deltas):
+            # Let the gateway move its open tickets to the newly polled states
+            self.orders.poll()
+        for ticket, status in self.orders.drain():
+            if status in TERMINAL_STATUSES:
+                tickets = self.open_tickets.get(ticket.symbol)
+                if tickets is not None:
+                    tickets.discard(ticket.ticket_id)
+                    if not tickets:
+                        del self.open_tickets[ticket.symbol]
+            if status in ("PLACED", "REJECTED", "FAILED") and ticket.submitted_ns is not None:
+                self.latency.record('order_queue', ticket.queued_ns, ticket.submitted_ns)
+                if ticket.acked_ns is not None:
+                    self.latency.record('order_ack', ticket.submitted_ns, ticket.acked_ns)
+            if status == "PLACED":
+                self.logger.info(f"[REAL] Placed {ticket.action} order for {ticket.quantity} shares of {ticket.symbol} (order {ticket.order_id})")
+            elif status == "FILLED":
+                if ticket.filled_ns is not None:
+                    self.latency.record('order_fill', ticket.queued_ns, ticket.filled_ns)
+                self.logger.info(f"[REAL] Filled {ticket.action} order for {ticket.filled_quantity} shares of {ticket.symbol} (order {ticket.order_id})")
+            elif status in ("REJECTED", "FAILED", "CANCELED", "EXPIRED"):
+                self.logger.warning(f"[REAL] {ticket.action} order for {ticket.symbol} ended as {status}")
 
     def stock_trader(self, service):
         """Process CHART_EQUITY data and execute trades."""
-        contents = service.get("content", [])
-        for content in contents:
-            symbol = content.get("key", "NO KEY")
-            close_price = content.get("4")
-            volume = content.get("5")
-            timestamp = content.get("7")
-            if close_price is None or volume is None or timestamp is None:
-                continue
+        for action, symbol, price in self.decisions(chart_updates(service)):
+            self.execute(action, symbol, price)
+
+    def is_subscribed(self, symbol):
+        return self.subscriptions.tracks(symbol)
 
-            updated = self.indicators.update_minute_data(symbol, close_price, volume, timestamp)
-            if updated:
-                action = self.buy_condition(symbol)
-                if action == "buy":
-                    if self.simulate:
-                        if not self.portfolio.get_position(symbol):
-                            self.portfolio.buy(symbol, close_price, 100)
-                    else:
-                        order = {
-                            "orderType": "MARKET",
-                            "session": "NORMAL",
-                            "duration": "DAY",
-                            "orderStrategyType": "SINGLE",
-                            "orderLegCollection": [
-                                {"instruction": "BUY", "quantity": 100, "instrument": {"symbol": symbol, "assetType": "EQUITY"}}
-                            ]
-                        }
-                        response = self.client.order_place(self.account_hash, order)
-                        if response.ok:
-                            self.logger.info(f"[REAL] Placed buy order for 100 shares of {symbol}")
-                        else:
-                            self.logger.error(f"Failed to place buy order: {response.text}")
-                elif action == "sell":
-                    if self.simulate:
-                        if self.portfolio.get_position(symbol):
-                            self.portfolio.sell(symbol, close_price, 100)
-                    else:
-                        order = {
-                            "orderType": "MARKET",
-                            "session": "NORMAL",
-                            "duration": "DAY",
-                            "orderStrategyType": "SINGLE",
-                            "orderLegCollection": [
-                                {"instruction": "SELL", "quantity": 100, "instrument": {"symbol": symbol, "assetType": "EQUITY"}}
-                            ]
-                        }
-                        response = self.client.order_place(self.account_hash, order)
-                        if response.ok:
-                            self.logger.info(f"[REAL] Placed sell order for 100 shares of {symbol}")
-                        else:
-                            self.logger.error(f"Failed to place sell order: {response.text}")
+    def holds(self, symbol):
+        """Whether a position is open, from the live tracker's last poll or the simulated portfolio; no request is made."""
+        if self.tracker:
+            return self.tracker.holds(symbol)
+        return bool(self.portfolio.get_position(symbol))
+
+    def open_positions(self):
+        """Subscribed symbols with an open position."""
+        return [symbol for symbol in self.subscriptions.current if self.holds(symbol)]
+
+    def _screen(self, symbol, min_hourly_candles=35, initial_days=5):
+        """Warm up a screener candidate and return its action, or None if its history failed to load."""
+        if not self._warm_up(symbol, min_hourly_candles, initial_days):
+            return None
+        return self.buy_condition(symbol)
 
     def stock_scanner(self, service):
-        """Process SCREENER_EQUITY data and manage subscriptions."""
+        """Process SCREENER_EQUITY data and manage subscriptions inline, without the background screener."""
         MIN_HOURLY_CANDLES = 35
         INITIAL_DAYS = 5
 
-        contents = service.get("content", [])
-        for content in contents:
-            symbol = content.get("key", "NO KEY")
-            if symbol == "NO KEY":
-                continue
-
-            if "CHART_EQUITY" in self.stream.subscriptions and symbol in self.stream.subscriptions["CHART_EQUITY"]:
+        # Best-scored candidates first; the content key is the screener id, not a symbol
+        screened = set()
+        for symbol, _ in sorted(screener_candidates(service), key=lambda candidate: -candidate[1]):
+            if symbol in screened or self.is_subscribed(symbol):
                 continue
+            screened.add(symbol)
 
-            history_response = self.client.price_history(
-                symbol=symbol,
-                periodType="day",
-                period=INITIAL_DAYS,
-                frequencyType="minute",
-                frequency=1,
-                needExtendedHoursData=False
-            )
-            if history_response.ok:
-                history_data = history_response.json()
-                candles = history_data.get('candles', [])
-                for candle in candles:
-                    close = candle['close']
-                    volume = candle['volume']
-                    timestamp = candle['datetime']
-                    self.indicators.update_minute_data(symbol, close, volume, timestamp)
-
-                if symbol in self.indicators.hourly_data and len(self.indicators.hourly_data[symbol]) < MIN_HOURLY_CANDLES:
-                    additional_days = 5
-                    history_response = self.client.price_history(
-                        symbol=symbol,
-                        periodType="day",
-                        period=INITIAL_DAYS + additional_days,
-                        frequencyType="minute",
-                        frequency=1,
-                        needExtendedHoursData=False
-                    )
-                    if history_response.ok:
-                        history_data = history_response.json()
-                        candles = history_data.get('candles', [])
-                        for candle in candles:
-                            close = candle['close']
-                            volume = candle['volume']
-                            timestamp = candle['datetime']
-                            self.indicators.update_minute_data(symbol, close, volume, timestamp)
-                    else:
-                        self.logger.error(f"Failed to fetch additional history for {symbol}: {history_response.text}")
-
-                action = self.buy_condition(symbol)
-                if action == "buy":
-                    self.stream.send(self.stream.chart_equity(symbol, "0,1,2,3,4,5,6,7,8"))
-                    self.logger.info(f"Subscribed to {symbol} based on screener data and buy condition")
-            else:
-                self.logger.error(f"Failed to fetch history for {symbol}: {history_response.text}")
-            sleep(1)
+            if self._screen(symbol, MIN_HOURLY_CANDLES, INITIAL_DAYS) == "buy":
+                self.subscriptions.want(symbol)
 
-        if "CHART_EQUITY" in self.stream.subscriptions:
-            for symbol in list(self.stream.subscriptions["CHART_EQUITY"].keys()):
-                if not self.portfolio.get_position(symbol):
-                    self.stream.send(self.stream.chart_equity(symbol, "0,1,2,3,4,5,6,7,8", command="UNSUBS"))
-                    self.logger.info(f"Unsubscribed from {symbol} as position is closed")
+        self.sync_subscriptions()
 
 # Example usage
 if __name__ == '__main__':
     load_dotenv()
     bot = TradingBot(os.getenv('app_key'), os.getenv('app_secret'), simulate=True)
-    bot.run()
\ No newline at end of file
+    bot.run()  # or asyncio.run(bot.run_async()), or bot.run_sharded()
\ No newline at end of file
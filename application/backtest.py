@@ -0,0 +1,127 @@
+import numpy as np
+from domain.entities.indicator_series import aggregate_hourly, SeriesCache
+from infrastructure.adapters.candle_store import DATETIME, CLOSE, VOLUME
+
+def prepare_series(candles):
+    """
+    Aggregates minute candles into hourly bars and wraps them in a shared series cache.
+
+    Args:
+        candles (numpy.ndarray): (n, 6) candle array as returned by load_candles.
+
+    Returns:
+        SeriesCache: Indicator series cache for the symbol.
+    """
+    bars = aggregate_hourly(candles[:, DATETIME], candles[:, CLOSE], candles[:, VOLUME])
+    return SeriesCache(bars)
+
+def simulate_trades(bars, buy, sell, quantity=100, initial_cash=100000.0, start=0, stop=None):
+    """
+    Replays buy/sell masks the way TradingBot.stock_trader does in simulation mode.
+
+    A buy opens a position only when flat and affordable; a sell closes the whole
+    position. Fills happen at the close of the minute that finalized the hour.
+
+    Args:
+        bars (HourlyBars): Hourly bars the masks are aligned with.
+        buy (numpy.ndarray): Boolean buy mask.
+        sell (numpy.ndarray): Boolean sell mask.
+        quantity (int): Shares per trade.
+        initial_cash (float): Cash available for the position.
+        start (int): First bar index to trade on.
+        stop (int, optional): Bar index to stop trading at (exclusive).
+
+    Returns:
+        dict: Realized P/L per trade (numpy.ndarray) plus entry/exit bar indices and any open position.
+    """
+    stop = len(bars) if stop is None else stop
+    events = np.flatnonzero((buy[start:stop] | sell[start:stop])) + start
+    prices = bars.trigger_price
+    entry_index = None
+    entries, exits = [], []
+    for i in events.tolist():
+        if entry_index is None and buy[i] and prices[i] * quantity <= initial_cash:
+            entry_index = i
+        elif entry_index is not None and sell[i]:
+            entries.append(entry_index)
+            exits.append(i)
+            entry_index = None
+    entries = np.array(entries, dtype=np.int64)
+    exits = np.array(exits, dtype=np.int64)
+    return {
+        'pnl': (prices[exits] - prices[entries]) * quantity,
+        'entries': entries,
+        'exits': exits,
+        'open_entry': entry_index
+    }
+
+def summarize_trades(trades):
+    pnl = trades['pnl']
+    return {
+        'trades': int(len(pnl)),
+        'wins': int(np.count_nonzero(pnl > 0)),
+        'losses': int(np.count_nonzero(pnl < 0)),
+        'pnl': float(pnl.sum()),
+        'open_position': trades['open_entry'] is not None
+    }
+
+def backtest_series(series, param_sets, quantity=100, initial_cash=100000.0, start=0, stop=None):
+    """
+    Evaluates several parameter sets against one symbol's shared indicator series.
+
+    Args:
+        series (SeriesCache): Indicator series for the symbol.
+        param_sets (list): StrategyParameters to evaluate.
+        quantity (int): Shares per trade.
+        initial_cash (float): Cash available for the position.
+        start (int): First bar index to trade on.
+        stop (int, optional): Bar index to stop trading at (exclusive).
+
+    Returns:
+        list: One summary dict per parameter set, in input order.
+    """
+    results = []
+    for params in param_sets:
+        buy, sell = series.signals(params)
+        trades = simulate_trades(series.bars, buy, sell, quantity, initial_cash, start, stop)
+        summary = summarize_trades(trades)
+        summary['params'] = params
+        results.append(summary)
+    return results
+
+def hourly_pnl(bars, trades, quantity=100):
+    """
+    Spreads each closed trade's P/L over the hours it was held.
+
+    Args:
+        bars (HourlyBars): Hourly bars the trades are aligned with.
+        trades (dict): Result of simulate_trades.
+        quantity (int): Shares per trade.
+
+    Returns:
+        tuple: (numpy.ndarray, numpy.ndarray) - Hour of every bar and the P/L earned in it (zero when flat).
+    """
+    held = np.zeros(len(bars) + 1, dtype=np.int64)
+    np.add.at(held, trades['entries'] + 1, 1)
+    np.add.at(held, trades['exits'] + 1, -1)
+    held = np.cumsum(held)[:-1] > 0
+    increments = np.zeros(len(bars))
+    increments[1:] = np.diff(bars.trigger_price) * quantity
+    return bars.hour, np.where(held, increments, 0.0)
+
+def combine_hourly(series_pnl):
+    """
+    Sums per-symbol hourly P/L into one portfolio series ordered by hour.
+
+    Args:
+        series_pnl (list): (hours, pnl) pairs as returned by hourly_pnl.
+
+    Returns:
+        tuple: (numpy.ndarray, numpy.ndarray) - Sorted unique hours and the portfolio P/L in each.
+    """
+    if not series_pnl:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    hours = np.concatenate([h for h, _ in series_pnl])
+    pnl = np.concatenate([p for _, p in series_pnl])
+    unique_hours, inverse = np.unique(hours, return_inverse=True)
+    return unique_hours, np.bincount(inverse, weights=pnl, minlength=len(unique_hours))
@@ -0,0 +1,147 @@
+import heapq
+import threading
+import time
+
+# Item fields the screener ranks by; each is scaled to 0..1 within the payload
+RANKING_FIELDS = ("averagePercentVolume", "netPercentChange", "volume")
+
+def _ranking_value(item, field):
+    value = item.get(field)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def screener_candidates(service):
+    """
+    (symbol, payload score) pairs from a SCREENER_EQUITY service, in payload order.
+
+    Symbols come from the items under field "4" of each content entry; the
+    content key is the screener id (e.g. "$SPX.X_AVERAGE_PERCENT_VOLUME_60"),
+    so it is only read as a symbol for bare entries without screener fields.
+    The score averages the item's RANKING_FIELDS, each min-max scaled across
+    the payload (an item missing a field scores 0.0 for it). Without any
+    ranking field, rank maps to a score from 1.0 (first) down towards 0.0.
+    """
+    items = []
+    for content in service.get("content", []):
+        entries = content.get("4")
+        if isinstance(entries, list):
+            items.extend(item for item in entries if isinstance(item, dict))
+        elif "2" not in content and not str(content.get("key", "")).startswith("$"):
+            items.append({"symbol": content.get("key")})
+    items = [item for item in items if item.get("symbol") and item["symbol"] != "NO KEY"]
+    scores = [0.0] * len(items)
+    fields = 0
+    for field in RANKING_FIELDS:
+        values = [_ranking_value(item, field) for item in items]
+        present = [value for value in values if value is not None]
+        if not present:
+            continue
+        fields += 1
+        low, high = min(present), max(present)
+        for i, value in enumerate(values):
+            if value is not None:
+                scores[i] += (value - low) / (high - low) if high > low else 1.0
+    if not fields:
+        return [(item["symbol"], 1.0 - rank / len(items)) for rank, item in enumerate(items)]
+    return [(item["symbol"], score / fields) for item, score in zip(items, scores)]
+
+class CandidateQueue:
+    def __init__(self, capacity=20, max_age=120.0, recheck=3600.0, clock=None, buy_bonus=0.5, reject_penalty=1.0, cache_size=1000):
+        """
+        Bounded priority queue of screener candidates awaiting warm-up.
+
+        A candidate's priority is its payload score adjusted by its last
+        evaluation: a recent "buy" ranks it higher, a recent rejection or
+        failure lower, both fading linearly over `recheck` seconds. When full,
+        the lowest-priority candidate is evicted; candidates not re-offered
+        within `max_age` seconds are dropped when popped.
+
+        Args:
+            capacity (int): Maximum number of queued candidates.
+            max_age (float): Seconds a candidate stays eligible after it was last offered.
+            recheck (float): Seconds over which a past evaluation stops affecting priority.
+            clock (RealClock or VirtualClock, optional): Time source. Defaults to wall-clock time.
+            buy_bonus (float): Priority added for a fresh "buy" evaluation.
+            reject_penalty (float): Priority removed for a fresh non-buy evaluation or failure.
+            cache_size (int): Evaluations remembered before expired ones are pruned.
+        """
+        self.capacity = capacity
+        self.max_age = max_age
+        self.recheck = recheck
+        self.clock = clock
+        self.buy_bonus = buy_bonus
+        self.reject_penalty = reject_penalty
+        self.cache_size = cache_size
+        self.queued = {}  # Symbol -> (priority, offered_at)
+        self.evaluated = {}  # Symbol -> (action, evaluated_at)
+        self.lock = threading.Lock()
+        self.offered = 0
+        self.evicted = 0
+        self.stale = 0
+
+    def time(self):
+        return self.clock.time() if self.clock else time.time()
+
+    def priority(self, symbol, payload_score, now):
+        last = self.evaluated.get(symbol)
+        if last is None:
+            return payload_score
+        action, evaluated_at = last
+        freshness = max(0.0, 1.0 - (now - evaluated_at) / self.recheck)
+        return payload_score + (self.buy_bonus if action == "buy" else -self.reject_penalty) * freshness
+
+    def offer(self, candidates):
+        """
+        Queue or refresh (symbol, payload score) candidates, evicting the lowest priorities beyond capacity.
+
+        Returns:
+            int: Number of candidates evicted.
+        """
+        with self.lock:
+            now = self.time()
+            for symbol, payload_score in candidates:
+                self.queued[symbol] = (self.priority(symbol, payload_score, now), now)
+                self.offered += 1
+            evicted = 0
+            if len(self.queued) > self.capacity:
+                keep = heapq.nlargest(self.capacity, self.queued.items(), key=lambda item: item[1][0])
+                evicted = len(self.queued) - self.capacity
+                self.queued = dict(keep)
+                self.evicted += evicted
+            return evicted
+
+    def pop(self, count):
+        """Remove and return up to `count` of the highest-priority fresh symbols, dropping stale ones."""
+        if count <= 0:
+            return []
+        with self.lock:
+            now = self.time()
+            stale = [symbol for symbol, (_, offered_at) in self.queued.items() if now - offered_at > self.max_age]
+            for symbol in stale:
+                del self.queued[symbol]
+            self.stale += len(stale)
+            top = heapq.nlargest(count, self.queued.items(), key=lambda item: item[1][0])
+            for symbol, _ in top:
+                del self.queued[symbol]
+            return [symbol for symbol, _ in top]
+
+    def record(self, symbol, action):
+        """Remember an evaluation result (None for a failed warm-up) for future priorities."""
+        with self.lock:
+            now = self.time()
+            self.evaluated[symbol] = (action, now)
+            if len(self.evaluated) > self.cache_size:
+                self.evaluated = {s: entry for s, entry in self.evaluated.items() if now - entry[1] < self.recheck}
+
+    def discard(self, symbol):
+        with self.lock:
+            self.queued.pop(symbol, None)
+
+    def __len__(self):
+        return len(self.queued)
+
+    def stats(self):
+        with self.lock:
+            return {'queued': len(self.queued), 'offered': self.offered, 'evicted': self.evicted, 'stale': self.stale}
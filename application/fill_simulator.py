@@ -0,0 +1,298 @@
+import itertools
+import math
+import random
+from collections import deque
+import numpy as np
+from infrastructure.adapters.candle_store import load_candles, DATETIME, OPEN
+
+BAR_MS = 60000  # Chart bars are one minute, stamped with their start time
+
+class FixedBps:
+    """Fill the whole order at the bar's close, moved against the order by a fixed number of basis points."""
+    next_bar = False
+
+    def __init__(self, bps=0.0):
+        self.bps = bps
+
+    def fill(self, action, quantity, symbol, close, volume, chart_time):
+        side = 1 if action == "buy" else -1
+        return quantity, close * (1 + side * self.bps / 1e4)
+
+class VolumeParticipation:
+    """
+    Fill at most max_participation of each bar's volume, with impact growing with the share of the volume taken.
+
+    Orders larger than a bar's allowance fill partially and carry the rest to
+    later bars. Impact is impact_bps when the fill takes the full allowance
+    and proportionally less for smaller fills.
+    """
+    next_bar = False
+
+    def __init__(self, max_participation=0.1, impact_bps=10.0):
+        self.max_participation = max_participation
+        self.impact_bps = impact_bps
+
+    def fill(self, action, quantity, symbol, close, volume, chart_time):
+        side = 1 if action == "buy" else -1
+        allowance = int(self.max_participation * volume) if volume else 0
+        filled = min(quantity, allowance)
+        if filled <= 0:
+            return 0, close
+        participation = filled / volume / self.max_participation
+        return filled, close * (1 + side * self.impact_bps * participation / 1e4)
+
+class NextBarOpen:
+    """
+    Fill at the open of the bar after the decision, looked up in the <ticker>.json candles of stock_data.
+
+    Bars missing from the data fill at their close.
+    """
+    next_bar = True
+
+    def __init__(self, data_path, bps=0.0, cache_dir=None):
+        self.data_path = data_path
+        self.bps = bps
+        self.cache_dir = cache_dir
+        self.candles = {}  # symbol -> (datetimes, opens), or None without data
+
+    def _candles(self, symbol):
+        if symbol not in self.candles:
+            candles = load_candles(self.data_path, symbol, self.cache_dir)
+            self.candles[symbol] = None if candles is None else (np.asarray(candles[:, DATETIME]), np.asarray(candles[:, OPEN]))
+        return self.candles[symbol]
+
+    def fill(self, action, quantity, symbol, close, volume, chart_time):
+        side = 1 if action == "buy" else -1
+        price = close
+        candles = self._candles(symbol)
+        if candles is not None:
+            datetimes, opens = candles
+            index = int(np.searchsorted(datetimes, chart_time))
+            if index < len(datetimes) and datetimes[index] == chart_time:
+                price = float(opens[index])
+        return quantity, price * (1 + side * self.bps / 1e4)
+
+class Commission:
+    def __init__(self, per_share=0.0, per_order=0.0, minimum=0.0):
+        """
+        Commission charged on simulated fills.
+
+        Args:
+            per_share (float): Charged on every share filled.
+            per_order (float): Charged once, on an order's first fill.
+            minimum (float): Least charged on an order's first fill.
+        """
+        self.per_share = per_share
+        self.per_order = per_order
+        self.minimum = minimum
+
+    def cost(self, quantity, first_fill):
+        cost = self.per_share * quantity
+        if first_fill:
+            cost = max(self.minimum, cost + self.per_order)
+        return cost
+
+class SimulatedOrder:
+    """One simulated market order; times are chart milliseconds."""
+    __slots__ = ('order_id', 'action', 'symbol', 'quantity', 'reference_price', 'decided_at', 'arrives_at',
+                 'filled_quantity', 'fills', 'bars', 'status')
+
+    def __init__(self, order_id, action, symbol, quantity, reference_price, decided_at, arrives_at):
+        self.order_id = order_id
+        self.action = action
+        self.symbol = symbol
+        self.quantity = quantity
+        self.reference_price = reference_price
+        self.decided_at = decided_at
+        self.arrives_at = arrives_at
+        self.filled_quantity = 0
+        self.fills = 0
+        self.bars = 0  # Bars the order was open for after arriving
+        self.status = "OPEN"
+
+    @property
+    def remaining(self):
+        return self.quantity - self.filled_quantity
+
+    def __repr__(self):
+        return f"SimulatedOrder({self.order_id}, {self.action} {self.quantity} {self.symbol}, {self.status}, filled={self.filled_quantity})"
+
+class FillSimulator:
+    def __init__(self, slippage=None, latency=0.0, jitter=0.0, spread_bps=0.0, commission=None, max_bars=30, seed=None):
+        """
+        Fill simulated market orders against the chart bars that follow them.
+
+        A decision is made at the close of its bar. With no latency and a
+        slippage model that prices from the decision bar, the order fills at
+        once; otherwise it arrives latency (+ up to jitter) seconds after the
+        decision bar closed and trades in the first bar still open at that
+        time. Each bar fills what the slippage model allows; buys pay and sells
+        give up half the spread on top. Orders not filled within max_bars bars
+        of arriving expire with whatever was filled.
+
+        Bars reach the simulator through on_bars() before the bot's decisions
+        for the same batch, and fills are returned to the caller to apply, so
+        the simulator never touches the portfolio itself. Fills the portfolio
+        refuses are handed back through reject().
+
+        Args:
+            slippage (optional): FixedBps, VolumeParticipation or NextBarOpen. Defaults to FixedBps(0).
+            latency (float): Seconds from the decision to the order reaching the market.
+            jitter (float): Extra latency drawn uniformly from [0, jitter) per order.
+            spread_bps (float): Quoted spread in basis points of the price.
+            commission (Commission, optional): Commission schedule. Defaults to no commission.
+            max_bars (int): Bars an order may stay open after arriving before it expires.
+            seed (int, optional): Seed for the latency jitter, for reproducible runs.
+        """
+        self.slippage = slippage or FixedBps()
+        self.latency = latency
+        self.jitter = jitter
+        self.spread_bps = spread_bps
+        self.commission = commission or Commission()
+        self.max_bars = max_bars
+        self.random = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.open = {}  # symbol -> deque of open orders, oldest first
+        self.batch = {}  # symbol -> [(chart_time, close, volume)] seen in the current batch
+        self.last_bar = {}  # symbol -> (chart_time, close, volume)
+        self.submitted = 0
+        self.filled = 0
+        self.expired = 0
+        self.rejected = 0
+        self.fill_count = 0
+        self.partial_fills = 0
+        self.commissions = 0.0
+        self.slippage_cost = 0.0  # Paid versus the decision price, spread included
+        self.delay_bars = 0
+
+    def has_open(self, symbol):
+        return bool(self.open.get(symbol))
+
+    def submit(self, action, symbol, quantity, price, decided_at=None):
+        """
+        Place a simulated market order decided at the close of the bar stamped decided_at.
+
+        Args:
+            action (str): "buy" or "sell".
+            symbol (str): Stock symbol.
+            quantity (int): Shares.
+            price (float): Decision price, the close of the decision bar.
+            decided_at (int, optional): Chart time of the decision bar in milliseconds. Defaults to the last bar seen.
+
+        Returns:
+            tuple: (SimulatedOrder, list) - The order and any (order, quantity, price, commission) fills made at once.
+        """
+        if decided_at is None:
+            decided_at = self.last_bar.get(symbol, (0,))[0]
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        immediate = delay == 0 and not self.slippage.next_bar
+        order = SimulatedOrder(next(self.ids), action, symbol, quantity, price, decided_at,
+                               decided_at + BAR_MS + math.ceil(delay * 1000))
+        self.submitted += 1
+        fills = []
+        if immediate:
+            volume = next((v for t, _, v in self.batch.get(symbol, ()) if t == decided_at), self.last_bar.get(symbol, (0, 0, 0))[2])
+            self._fill(order, price, volume, decided_at, fills)
+        # Bars of this batch after the decision bar already went by; trade them now
+        for chart_time, close, volume in self.batch.get(symbol, ()):
+            if order.status != "OPEN":
+                break
+            if chart_time > decided_at:
+                self._trade(order, close, volume, chart_time, fills)
+        if order.status == "OPEN":
+            self.open.setdefault(symbol, deque()).append(order)
+        return order, fills
+
+    def on_bars(self, updates):
+        """
+        Trade open orders against a batch of chart updates, in order.
+
+        Args:
+            updates (list): (symbol, close, volume, chart_time, ...) tuples, e.g. from chart_updates().
+
+        Returns:
+            list: (order, quantity, price, commission) fills to apply to the portfolio.
+        """
+        self.batch = {}
+        fills = []
+        for symbol, close, volume, chart_time, *_ in updates:
+            self.batch.setdefault(symbol, []).append((chart_time, close, volume))
+            self.last_bar[symbol] = (chart_time, close, volume)
+            orders = self.open.get(symbol)
+            if not orders:
+                continue
+            for order in list(orders):
+                self._trade(order, close, volume, chart_time, fills)
+                if order.status != "OPEN":
+                    orders.remove(order)
+            if not orders:
+                del self.open[symbol]
+        return fills
+
+    def _trade(self, order, close, volume, chart_time, fills):
+        """Let an order trade in one bar if it has reached the market by the bar's close."""
+        if chart_time + BAR_MS <= order.arrives_at:
+            return
+        order.bars += 1
+        self._fill(order, close, volume, chart_time, fills)
+        if order.status == "OPEN" and order.bars >= self.max_bars:
+            order.status = "EXPIRED"
+            self.expired += 1
+
+    def _fill(self, order, close, volume, chart_time, fills):
+        quantity, price = self.slippage.fill(order.action, order.remaining, order.symbol, close, volume, chart_time)
+        if quantity <= 0:
+            return
+        side = 1 if order.action == "buy" else -1
+        price *= 1 + side * self.spread_bps / 2e4
+        commission = self.commission.cost(quantity, order.fills == 0)
+        order.filled_quantity += quantity
+        order.fills += 1
+        self.fill_count += 1
+        self.commissions += commission
+        self.slippage_cost += side * (price - order.reference_price) * quantity
+        if order.remaining == 0:
+            order.status = "FILLED"
+            self.filled += 1
+            self.delay_bars += order.bars
+        else:
+            self.partial_fills += 1
+        fills.append((order, quantity, price, commission))
+
+    def reject(self, order, fills):
+        """
+        Undo fills the portfolio refused and cancel the rest of their order.
+
+        Args:
+            order (SimulatedOrder): The order the fills belong to.
+            fills (list): Its (order, quantity, price, commission) fills from one batch, from the first refused one on.
+        """
+        side = 1 if order.action == "buy" else -1
+        for _, quantity, price, commission in fills:
+            order.filled_quantity -= quantity
+            order.fills -= 1
+            self.fill_count -= 1
+            self.commissions -= commission
+            self.slippage_cost -= side * (price - order.reference_price) * quantity
+        # A completing fill is always the last of its order, so it is among the refused ones
+        if order.status == "FILLED":
+            self.filled -= 1
+            self.delay_bars -= order.bars
+            self.partial_fills -= len(fills) - 1
+        else:
+            self.partial_fills -= len(fills)
+            if order.status == "EXPIRED":
+                self.expired -= 1
+        orders = self.open.get(order.symbol)
+        if orders and order in orders:
+            orders.remove(order)
+            if not orders:
+                del self.open[order.symbol]
+        order.status = "REJECTED"
+        self.rejected += 1
+
+    def stats(self):
+        return {'submitted': self.submitted, 'filled': self.filled, 'expired': self.expired, 'rejected': self.rejected,
+                'open': sum(len(orders) for orders in self.open.values()), 'fills': self.fill_count,
+                'partial_fills': self.partial_fills, 'commissions': self.commissions, 'slippage_cost': self.slippage_cost,
+                'mean_delay_bars': self.delay_bars / self.filled if self.filled else 0.0}
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 42  # Values are clamped at 2**42 ns, about 73 minutes
+BUCKETS = (MAX_EXPONENT - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+MAX_VALUE = (1 << MAX_EXPONENT) - 1
+PERCENTILES = {'p50_us': 0.5, 'p99_us': 0.99, 'p999_us': 0.999}
+
+def bucket_index(value):
+    """Log-linear bucket of a non-negative integer: exact below 16, then 16 buckets per power of two."""
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+def bucket_upper_bound(index):
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+class LatencyHistogram:
+    """
+    Fixed-memory streaming histogram of nanosecond durations.
+
+    Recording is one bucket increment; percentiles are accurate to within
+    1/16 (about 6%) of the value and are resolved only when reported.
+    """
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, nanoseconds):
+        if nanoseconds < 0:
+            nanoseconds = 0
+        elif nanoseconds > MAX_VALUE:
+            nanoseconds = MAX_VALUE
+        self.counts[bucket_index(nanoseconds)] += 1
+        self.count += 1
+        self.total += nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th quantile, capped at the largest recorded value."""
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.999999))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(bucket_upper_bound(index), self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        """Microsecond summary: count, mean, p50, p99, p999 and max."""
+        summary = {'count': self.count, 'mean_us': self.total / self.count / 1000 if self.count else 0.0}
+        for name, q in PERCENTILES.items():
+            summary[name] = self.percentile(q) / 1000
+        summary['max_us'] = self.max / 1000
+        return summary
+
+class LatencyRecorder:
+    """Named per-stage histograms for the tick-to-decision path."""
+    def __init__(self, stages=()):
+        self.stages = {stage: LatencyHistogram() for stage in stages}
+
+    def histogram(self, stage):
+        if stage not in self.stages:
+            self.stages[stage] = LatencyHistogram()
+        return self.stages[stage]
+
+    def record(self, stage, start_ns, end_ns=None):
+        """Record end_ns - start_ns (end defaults to now) under stage."""
+        self.histogram(stage).record((end_ns if end_ns is not None else time.perf_counter_ns()) - start_ns)
+
+    def snapshot(self):
+        return {stage: histogram.summary() for stage, histogram in self.stages.items()}
+
+    def format_report(self):
+        parts = []
+        for stage, summary in self.snapshot().items():
+            if summary['count']:
+                parts.append(f"{stage} p50 {summary['p50_us']:.1f} / p99 {summary['p99_us']:.1f} / p999 {summary['p999_us']:.1f} us (n={summary['count']})")
+        return "; ".join(parts)
+
+    def dump(self, path):
+        """
+        Write the per-stage summaries as JSON, atomically replacing any previous dump.
+
+        Args:
+            path (str): Destination file.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({'generated_at': time.time(), 'stages': self.snapshot()}, f, indent=2)
+        os.replace(tmp_path, path)
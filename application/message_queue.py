@@ -0,0 +1,175 @@
+import collections
+import threading
+import time
+from application.latency import LatencyHistogram
+
+HIGH, LOW = 0, 1
+
+def message_lane(message):
+    """SCREENER_EQUITY-only messages are shed first; everything else (charts, heartbeats) is high priority."""
+    if isinstance(message, str) and '"SCREENER_EQUITY"' in message and '"CHART_EQUITY"' not in message:
+        return LOW
+    return HIGH
+
+class BackpressurePolicy:
+    def __init__(self, overflow="shed", collapse_lag=None, lag_alert=5.0, alert_interval=60.0):
+        """
+        How the stream consumer degrades when it falls behind.
+
+        Args:
+            overflow (str): "block" makes the receiver wait for space; "shed" evicts
+                the oldest SCREENER_EQUITY message, then the oldest message overall.
+            collapse_lag (float, optional): Consumer lag in seconds above which a batch keeps
+                only the latest chart update per symbol and the latest screener. None (the
+                default) disables it: the minute volumes and closes it drops never reach the
+                hourly aggregation, so only opt in where approximate indicators are acceptable.
+            lag_alert (float, optional): Consumer lag in seconds that triggers a warning. None disables.
+            alert_interval (float): Minimum seconds between lag warnings.
+        """
+        self.overflow = overflow
+        self.collapse_lag = collapse_lag
+        self.lag_alert = lag_alert
+        self.alert_interval = alert_interval
+
+    @classmethod
+    def lossless(cls):
+        """Never drop or collapse, e.g. for replays that must see every candle."""
+        return cls(overflow="block", collapse_lag=None, lag_alert=None)
+
+class MessageQueue:
+    """
+    Bounded, thread-safe FIFO between the streamer thread and the trading loop.
+
+    get() blocks until a message arrives (or the timeout passes), so the
+    consumer wakes as soon as the receiver enqueues instead of polling.
+    Each entry carries its perf_counter_ns enqueue time; waits feed a
+    fixed-memory histogram, and the enqueue time of the oldest message
+    handed out by the last get() or drain() marks when its batch arrived.
+    Messages are kept in two lanes so that, when shedding, low-priority
+    messages can be evicted in O(1) while delivery stays in arrival order.
+    """
+    def __init__(self, maxsize=10000, overflow="block", classify=None):
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.classify = classify or message_lane
+        self.lanes = (collections.deque(), collections.deque())
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.closed = False
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = [0, 0]
+        self.max_depth = 0
+        self.wait_histogram = LatencyHistogram()
+        self.last_received_ns = None
+        self.consumer_idle = 0.0
+
+    def __len__(self):
+        return len(self.lanes[HIGH]) + len(self.lanes[LOW])
+
+    def put(self, message, timeout=None):
+        """
+        Enqueue a message. When full, blocks or sheds depending on the overflow policy.
+
+        Args:
+            message: Raw streamer message.
+            timeout (float, optional): Seconds to wait for space when blocking. None waits indefinitely.
+
+        Returns:
+            bool: True if enqueued, False if it was shed, the queue stayed full, or the queue was closed.
+        """
+        lane = self.classify(message)
+        with self.not_full:
+            if self.overflow == "shed":
+                if self.closed:
+                    return False
+                if len(self) >= self.maxsize:
+                    if self.lanes[LOW]:
+                        self.lanes[LOW].popleft()
+                        self.dropped[LOW] += 1
+                    elif lane == LOW:
+                        self.dropped[LOW] += 1
+                        return False
+                    else:
+                        self.lanes[HIGH].popleft()
+                        self.dropped[HIGH] += 1
+            else:
+                if not self.not_full.wait_for(lambda: len(self) < self.maxsize or self.closed, timeout):
+                    return False
+                if self.closed:
+                    return False
+            self.lanes[lane].append((self.sequence, time.perf_counter_ns(), message))
+            self.sequence += 1
+            self.enqueued += 1
+            if len(self) > self.max_depth:
+                self.max_depth = len(self)
+            self.not_empty.notify()
+            return True
+
+    def _pop(self):
+        high, low = self.lanes
+        lane = high if not low or (high and high[0][0] < low[0][0]) else low
+        _, enqueued_at, message = lane.popleft()
+        self.wait_histogram.record(time.perf_counter_ns() - enqueued_at)
+        self.dequeued += 1
+        return enqueued_at, message
+
+    def get(self, timeout=None):
+        """
+        Dequeue the oldest message, blocking until one arrives.
+
+        Args:
+            timeout (float, optional): Seconds to wait. None waits indefinitely.
+
+        Returns:
+            The message, or None on timeout or after close().
+        """
+        with self.not_empty:
+            if not len(self):
+                started = time.perf_counter()
+                self.not_empty.wait_for(lambda: len(self) or self.closed, timeout)
+                self.consumer_idle += time.perf_counter() - started
+            if not len(self):
+                return None
+            self.last_received_ns, message = self._pop()
+            self.not_full.notify()
+            return message
+
+    def drain(self, max_items=None):
+        """Dequeue every pending message (up to max_items) without blocking."""
+        with self.lock:
+            count = len(self) if max_items is None else min(max_items, len(self))
+            entries = [self._pop() for _ in range(count)]
+            if entries:
+                self.last_received_ns = entries[0][0]
+                self.not_full.notify_all()
+            return [message for _, message in entries]
+
+    def lag(self):
+        """Seconds the oldest pending message has been waiting, or 0.0 when empty."""
+        with self.lock:
+            heads = [lane[0][1] for lane in self.lanes if lane]
+            return (time.perf_counter_ns() - min(heads)) / 1e9 if heads else 0.0
+
+    def close(self):
+        """Wake all waiting producers and consumers; later puts are rejected."""
+        with self.lock:
+            self.closed = True
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'depth': len(self),
+                'max_depth': self.max_depth,
+                'enqueued': self.enqueued,
+                'dequeued': self.dequeued,
+                'dropped_chart': self.dropped[HIGH],
+                'dropped_screener': self.dropped[LOW],
+                'mean_wait_ms': self.wait_histogram.total / self.wait_histogram.count / 1e6 if self.wait_histogram.count else 0.0,
+                'max_wait_ms': self.wait_histogram.max / 1e6,
+                'consumer_idle_s': self.consumer_idle
+            }
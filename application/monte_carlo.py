@@ -0,0 +1,135 @@
+import os
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from domain.entities.strategy import StrategyParameters
+from application.backtest import prepare_series, simulate_trades, hourly_pnl, combine_hourly
+from infrastructure.adapters.candle_store import load_candles
+
+PERCENTILES = (2.5, 50.0, 97.5)
+
+def bootstrap_indices(n, n_paths, rng):
+    """Independent resampling of individual observations."""
+    return rng.integers(0, n, size=(n_paths, n))
+
+def block_bootstrap_indices(n, n_paths, block_size, rng):
+    """Moving-block resampling that keeps runs of block_size consecutive observations together."""
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n - block_size + 1, size=(n_paths, n_blocks))
+    return (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n]
+
+def path_statistics(pnl_paths, initial_equity):
+    """
+    Final equity and max drawdown of every resampled path.
+
+    Args:
+        pnl_paths (numpy.ndarray): (paths, steps) P/L increments.
+        initial_equity (float): Starting equity of every path.
+
+    Returns:
+        tuple: (numpy.ndarray, numpy.ndarray) - Final equity and max drawdown (fraction of peak) per path.
+    """
+    equity = initial_equity + np.cumsum(pnl_paths, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_equity)
+    drawdown = (1.0 - equity / peak).max(axis=1, initial=0.0)
+    return equity[:, -1], drawdown
+
+def _simulate_batch(seed, n_paths, trade_pnl, period_pnl, block_size, initial_equity):
+    rng = np.random.default_rng(seed)
+    results = {}
+    if len(trade_pnl):
+        results['trades'] = path_statistics(trade_pnl[bootstrap_indices(len(trade_pnl), n_paths, rng)], initial_equity)
+    if len(period_pnl):
+        results['hourly'] = path_statistics(period_pnl[block_bootstrap_indices(len(period_pnl), n_paths, block_size, rng)], initial_equity)
+    return results
+
+def confidence_intervals(values, percentiles=PERCENTILES):
+    return dict(zip(percentiles, np.percentile(values, percentiles).tolist())) if len(values) else {}
+
+class MonteCarlo:
+    def __init__(self, trade_pnl, period_pnl, initial_equity=100000.0, n_paths=10000, batch_size=1000, block_size=7, seed=0, workers=None):
+        """
+        Initialize a Monte Carlo robustness analysis of a backtest.
+
+        Args:
+            trade_pnl (array-like): Realized P/L of each closed trade, in time order.
+            period_pnl (array-like): Portfolio P/L per hour, in time order.
+            initial_equity (float): Starting equity of every path.
+            n_paths (int): Number of resampled paths per method.
+            batch_size (int): Paths generated per vectorized batch (one pool task).
+            block_size (int): Hours per block when block-resampling; 7 is roughly one session.
+            seed (int): Root seed; each batch gets its own spawned stream, so results do not depend on worker count.
+            workers (int, optional): Process pool size. Defaults to the CPU count.
+        """
+        self.trade_pnl = np.asarray(trade_pnl, dtype=np.float64)
+        self.period_pnl = np.asarray(period_pnl, dtype=np.float64)
+        self.initial_equity = initial_equity
+        self.n_paths = n_paths
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.seed = seed
+        self.workers = workers or os.cpu_count()
+
+    def run(self):
+        """
+        Resample trade and hourly P/L sequences on a process pool.
+
+        Returns:
+            dict: For 'trades' (bootstrap) and 'hourly' (block bootstrap), percentile
+            confidence intervals of final equity and max drawdown.
+        """
+        batches = [min(self.batch_size, self.n_paths - start) for start in range(0, self.n_paths, self.batch_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(batches))
+        n = len(batches)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            outputs = list(pool.map(_simulate_batch, seeds, batches, [self.trade_pnl] * n, [self.period_pnl] * n,
+                                    [self.block_size] * n, [self.initial_equity] * n))
+        report = {}
+        for method in ('trades', 'hourly'):
+            parts = [output[method] for output in outputs if method in output]
+            if not parts:
+                continue
+            final_equity = np.concatenate([final for final, _ in parts])
+            drawdown = np.concatenate([dd for _, dd in parts])
+            report[method] = {
+                'paths': len(final_equity),
+                'final_equity': confidence_intervals(final_equity),
+                'max_drawdown': confidence_intervals(drawdown),
+                'probability_of_loss': float(np.mean(final_equity < self.initial_equity))
+            }
+        return report
+
+def backtest_pnl(data_path, symbols, params=None, cache_dir=None, quantity=100, initial_cash=100000.0):
+    """
+    Backtests one parameter set over several symbols and returns the inputs for MonteCarlo.
+
+    Returns:
+        tuple: (numpy.ndarray, numpy.ndarray) - Trade P/L ordered by exit time, and portfolio P/L per hour.
+    """
+    params = params or StrategyParameters()
+    exits, pnl, hourly = [], [], []
+    for symbol in symbols:
+        candles = load_candles(data_path, symbol, cache_dir)
+        if candles is None or not len(candles):
+            continue
+        series = prepare_series(candles)
+        buy, sell = series.signals(params)
+        trades = simulate_trades(series.bars, buy, sell, quantity, initial_cash)
+        exits.append(series.bars.trigger_time[trades['exits']])
+        pnl.append(trades['pnl'])
+        hourly.append(hourly_pnl(series.bars, trades, quantity))
+    if not pnl:
+        return np.empty(0), np.empty(0)
+    order = np.argsort(np.concatenate(exits), kind='stable')
+    return np.concatenate(pnl)[order], combine_hourly(hourly)[1]
+
+# Example usage
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    data_path = os.path.join("Data Collection", "stock_data")
+    symbols = sorted(name[:-5] for name in os.listdir(data_path) if name.endswith(".json"))
+    trade_pnl, period_pnl = backtest_pnl(data_path, symbols)
+    report = MonteCarlo(trade_pnl, period_pnl).run()
+    for method, stats in report.items():
+        logging.info(f"[Monte Carlo] {method}: {stats}")
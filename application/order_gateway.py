@@ -0,0 +1,153 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from application.partitioning import shard_for
+
+TERMINAL_STATUSES = ("FILLED", "CANCELED", "REJECTED", "EXPIRED", "FAILED")
+
+class OrderTicket:
+    """One order intent and its progress through placement and fills; timestamps are perf_counter_ns."""
+    def __init__(self, ticket_id, action, symbol, quantity, received_ns=None):
+        self.ticket_id = ticket_id
+        self.action = action
+        self.symbol = symbol
+        self.quantity = quantity
+        self.received_ns = received_ns  # Arrival of the tick that triggered the order
+        self.queued_ns = time.perf_counter_ns()
+        self.submitted_ns = None
+        self.acked_ns = None
+        self.filled_ns = None
+        self.order_id = None
+        self.status = "QUEUED"
+        self.filled_quantity = 0
+
+    @property
+    def done(self):
+        return self.status in TERMINAL_STATUSES
+
+    def __repr__(self):
+        return f"OrderTicket({self.ticket_id}, {self.action} {self.quantity} {self.symbol}, {self.status}, order_id={self.order_id})"
+
+class OrderGateway:
+    def __init__(self, place, status=None, workers=2, on_update=None):
+        """
+        Place orders from worker threads so the trading loop never waits on a round-trip.
+
+        Orders for a symbol always go to the same worker, so they reach the
+        broker in the order they were decided. Every state change of a ticket
+        (placed, rejected, filled, ...) is published to the updates queue as
+        (ticket, status), for the trading loop to apply.
+
+        Args:
+            place (callable): (action, symbol, quantity) -> (accepted, order_id). Blocking.
+            status (callable, optional): order_id -> (status, filled_quantity), e.g. from order details. Blocking.
+            workers (int): Worker threads placing orders.
+            on_update (callable, optional): Called after each update is published, e.g. to wake the trading loop.
+        """
+        self.place = place
+        self.status = status
+        self.on_update = on_update
+        self.updates = queue.Queue()
+        self.queues = [queue.Queue() for _ in range(workers)]
+        self.threads = [threading.Thread(target=self._work, args=(q,), name=f"OrderGateway-{i}", daemon=True) for i, q in enumerate(self.queues)]
+        self.ids = itertools.count(1)
+        self.open = {}  # ticket_id -> ticket placed and not yet in a terminal status
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.placed = 0
+        self.rejected = 0
+        self.filled = 0
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, action, symbol, quantity, received_ns=None):
+        """Queue an order intent and return its ticket immediately."""
+        ticket = OrderTicket(next(self.ids), action, symbol, quantity, received_ns)
+        with self.lock:
+            self.submitted += 1
+        self.queues[shard_for(symbol, len(self.queues))].put((self._place, ticket))
+        return ticket
+
+    def poll(self):
+        """Queue a status check for every open order; no-op without a status function."""
+        if self.status is None:
+            return
+        with self.lock:
+            tickets = list(self.open.values())
+        for ticket in tickets:
+            self.queues[shard_for(ticket.symbol, len(self.queues))].put((self._check, ticket))
+
+    def _work(self, tasks):
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            function, ticket = task
+            try:
+                function(ticket)
+            except Exception:
+                logging.exception(f"Order gateway failed on {ticket}")
+                if ticket.status in ("QUEUED", "SUBMITTING"):
+                    ticket.status = "FAILED"
+                    self._publish(ticket)
+
+    def _place(self, ticket):
+        ticket.status = "SUBMITTING"
+        ticket.submitted_ns = time.perf_counter_ns()
+        accepted, order_id = self.place(ticket.action, ticket.symbol, ticket.quantity)
+        ticket.acked_ns = time.perf_counter_ns()
+        ticket.order_id = order_id
+        with self.lock:
+            if accepted:
+                self.placed += 1
+                if self.status is not None and order_id is not None:
+                    self.open[ticket.ticket_id] = ticket
+            else:
+                self.rejected += 1
+        ticket.status = "PLACED" if accepted else "REJECTED"
+        self._publish(ticket)
+
+    def _check(self, ticket):
+        if ticket.done:
+            return
+        status, filled_quantity = self.status(ticket.order_id)
+        if status is None or (status == ticket.status and filled_quantity == ticket.filled_quantity):
+            return
+        ticket.status = status
+        ticket.filled_quantity = filled_quantity
+        if status == "FILLED":
+            ticket.filled_ns = time.perf_counter_ns()
+        if ticket.done:
+            with self.lock:
+                self.open.pop(ticket.ticket_id, None)
+                if status == "FILLED":
+                    self.filled += 1
+        self._publish(ticket)
+
+    def _publish(self, ticket):
+        self.updates.put((ticket, ticket.status))
+        if self.on_update:
+            self.on_update()
+
+    def drain(self):
+        """Every (ticket, status) update published since the last drain, without blocking."""
+        updates = []
+        while True:
+            try:
+                updates.append(self.updates.get_nowait())
+            except queue.Empty:
+                return updates
+
+    def stop(self, timeout=5):
+        """Finish queued work and stop the workers."""
+        for tasks in self.queues:
+            tasks.put(None)
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    def stats(self):
+        with self.lock:
+            return {'submitted': self.submitted, 'placed': self.placed, 'rejected': self.rejected, 'filled': self.filled,
+                    'open': len(self.open), 'pending': sum(tasks.qsize() for tasks in self.queues)}
@@ -0,0 +1,135 @@
+import os
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from domain.entities.strategy import StrategyParameters
+from application.backtest import prepare_series, backtest_series
+from infrastructure.adapters.candle_store import build_candle_cache, load_candles
+
+# Per-process memo of the last symbol's series, so consecutive chunks reuse it
+_worker_series = {'symbol': None, 'series': None}
+
+def expand_grid(grid):
+    """
+    Expands a parameter grid into every StrategyParameters combination.
+
+    Args:
+        grid (dict): Maps StrategyParameters argument names to lists of values.
+
+    Returns:
+        list: StrategyParameters for the Cartesian product of the grid.
+    """
+    names = list(grid.keys())
+    return [StrategyParameters(**dict(zip(names, values))) for values in itertools.product(*(grid[name] for name in names))]
+
+def _symbol_series(data_path, symbol, cache_dir):
+    if _worker_series['symbol'] != symbol:
+        candles = load_candles(data_path, symbol, cache_dir)
+        _worker_series['symbol'] = symbol
+        _worker_series['series'] = prepare_series(candles) if candles is not None and len(candles) else None
+    return _worker_series['series']
+
+def _sweep_task(data_path, cache_dir, symbol, param_sets, quantity, initial_cash):
+    series = _symbol_series(data_path, symbol, cache_dir)
+    if series is None:
+        return symbol, []
+    return symbol, backtest_series(series, param_sets, quantity, initial_cash)
+
+class SweepSummary:
+    """Aggregates per-(parameter set, symbol) results into per-parameter-set totals as they arrive."""
+    def __init__(self):
+        self.totals = {}
+        self.results = 0
+
+    def add(self, symbol, result):
+        params = result['params']
+        row = self.totals.get(params)
+        if row is None:
+            row = self.totals[params] = {'params': params, 'symbols': 0, 'trades': 0, 'wins': 0, 'losses': 0, 'pnl': 0.0}
+        row['symbols'] += 1
+        row['trades'] += result['trades']
+        row['wins'] += result['wins']
+        row['losses'] += result['losses']
+        row['pnl'] += result['pnl']
+        self.results += 1
+
+    def table(self, sort_by='pnl'):
+        return sorted(self.totals.values(), key=lambda row: row[sort_by], reverse=True)
+
+    def format_table(self, top=None):
+        rows = self.table()[:top]
+        names = list(StrategyParameters().as_dict().keys())
+        lines = ["  ".join(names + ['symbols', 'trades', 'win_rate', 'pnl'])]
+        for row in rows:
+            win_rate = row['wins'] / row['trades'] if row['trades'] else 0.0
+            values = [str(value) for value in row['params'].as_dict().values()]
+            lines.append("  ".join(values + [str(row['symbols']), str(row['trades']), f"{win_rate:.2%}", f"{row['pnl']:.2f}"]))
+        return "\n".join(lines)
+
+class ParameterSweep:
+    def __init__(self, data_path, symbols, grid, cache_dir=None, workers=None, chunk_size=16, quantity=100, initial_cash=100000.0):
+        """
+        Initialize a sweep of strategy thresholds over historical minute data.
+
+        Args:
+            data_path (str): Directory holding the <symbol>.json candle files.
+            symbols (list): Symbols to backtest.
+            grid (dict): Maps StrategyParameters argument names to lists of values.
+            cache_dir (str, optional): Directory for memory-mapped .npy candle caches.
+            workers (int, optional): Process pool size. Defaults to the CPU count.
+            chunk_size (int): Parameter sets evaluated per task; a task shares one symbol's series.
+            quantity (int): Shares per trade.
+            initial_cash (float): Cash available per symbol.
+        """
+        self.data_path = data_path
+        self.symbols = list(symbols)
+        self.param_sets = expand_grid(grid)
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.quantity = quantity
+        self.initial_cash = initial_cash
+
+    def run(self, on_result=None):
+        """
+        Run every (parameter chunk x symbol) task on a process pool.
+
+        Args:
+            on_result (callable, optional): Called as on_result(symbol, result) for each result as it arrives.
+
+        Returns:
+            SweepSummary: Totals per parameter set.
+        """
+        summary = SweepSummary()
+        chunks = [self.param_sets[i:i + self.chunk_size] for i in range(0, len(self.param_sets), self.chunk_size)]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # Parse each JSON file once up front; workers only memory-map the caches
+            list(pool.map(build_candle_cache, itertools.repeat(self.data_path), self.symbols, itertools.repeat(self.cache_dir)))
+            futures = [
+                pool.submit(_sweep_task, self.data_path, self.cache_dir, symbol, chunk, self.quantity, self.initial_cash)
+                for symbol in self.symbols for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                symbol, results = future.result()
+                for result in results:
+                    summary.add(symbol, result)
+                    if on_result:
+                        on_result(symbol, result)
+        logging.info(f"Parameter sweep finished: {len(self.param_sets)} parameter sets x {len(self.symbols)} symbols")
+        return summary
+
+# Example usage
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    data_path = os.path.join("Data Collection", "stock_data")
+    symbols = sorted(name[:-5] for name in os.listdir(data_path) if name.endswith(".json"))
+    grid = {
+        'sma_short': [5, 10],
+        'sma_long': [20, 30],
+        'rsi_threshold': [60, 70],
+        'bollinger_width': [0.05, 0.1],
+        'volume_lookback': [4, 6],
+        'macd_lookback': [3]
+    }
+    sweep = ParameterSweep(data_path, symbols, grid)
+    print(sweep.run().format_table(top=10))
@@ -0,0 +1,5 @@
+import zlib
+
+def shard_for(symbol, shards):
+    """Stable across processes and runs, unlike the salted built-in hash() of a str."""
+    return zlib.crc32(symbol.encode()) % shards
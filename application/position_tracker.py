@@ -0,0 +1,139 @@
+import logging
+import queue
+import threading
+import time
+from application.order_gateway import TERMINAL_STATUSES
+
+class PositionTracker:
+    def __init__(self, fetch_positions, fetch_orders, on_update=None):
+        """
+        Live positions and order states, polled off the trading loop and applied as deltas.
+
+        Each poll makes one positions request and one orders request on a
+        worker thread and compares them with the previous snapshot. Only what
+        changed is published to the updates queue, as ('position', symbol,
+        quantity, average_price) or ('order', order_id, status,
+        filled_quantity); the trading loop applies them with apply(), so
+        holds() answers from memory. Order states are also readable from any
+        thread through order_status(), which lets the order gateway check
+        open orders without a request per order.
+
+        Args:
+            fetch_positions (callable): () -> {symbol: (quantity, average_price)}, or None if the request failed. Blocking.
+            fetch_orders (callable): () -> {order_id: (status, filled_quantity)}, or None if the request failed. Blocking.
+            on_update (callable, optional): Called after a poll published deltas, e.g. to wake the trading loop.
+        """
+        self.fetch_positions = fetch_positions
+        self.fetch_orders = fetch_orders
+        self.on_update = on_update
+        self.updates = queue.Queue()
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._work, name="PositionTracker", daemon=True)
+        self.polling = threading.Event()  # Set while a poll is queued or running
+        self.positions = {}  # symbol -> (quantity, average_price); written only by apply()
+        self.order_states = {}  # order_id -> (status, filled_quantity) in the latest window, plus older open orders; replaced whole by the worker
+        self.snapshot = {}  # Worker's last positions snapshot
+        self.polls = 0
+        self.failures = 0
+        self.position_deltas = 0
+        self.order_deltas = 0
+        self.poll_seconds = 0.0
+        self.thread.start()
+
+    def poll(self):
+        """Queue a poll unless one is already pending; never blocks."""
+        if not self.polling.is_set():
+            self.polling.set()
+            self.requests.put(True)
+
+    def _work(self):
+        while self.requests.get() is not None:
+            started = time.perf_counter()
+            try:
+                published = self._poll()
+            except Exception:
+                logging.exception("Position tracker poll failed")
+                self.failures += 1
+                published = False
+            finally:
+                self.polling.clear()
+            self.poll_seconds = time.perf_counter() - started
+            self.polls += 1
+            if published and self.on_update:
+                self.on_update()
+
+    def _poll(self):
+        published = False
+        # Orders first, so the positions are at least as fresh as any fill they report
+        orders = self.fetch_orders()
+        if orders is None:
+            self.failures += 1
+        else:
+            previous = self.order_states
+            for order_id, state in orders.items():
+                if previous.get(order_id) != state:
+                    self.updates.put(('order', order_id) + tuple(state))
+                    self.order_deltas += 1
+                    published = True
+            # Open orders that fell out of the request window keep their last known state; finished ones are dropped
+            states = dict(orders)
+            for order_id, state in previous.items():
+                if order_id not in states and state[0] not in TERMINAL_STATUSES:
+                    states[order_id] = state
+            self.order_states = states
+        positions = self.fetch_positions()
+        if positions is None:
+            self.failures += 1
+        else:
+            changed = [(symbol, 0, 0.0) for symbol in self.snapshot.keys() - positions.keys()]
+            changed += [(symbol,) + tuple(position) for symbol, position in positions.items() if self.snapshot.get(symbol) != position]
+            for delta in changed:
+                self.updates.put(('position',) + delta)
+            self.position_deltas += len(changed)
+            published = published or bool(changed)
+            self.snapshot = positions
+        return published
+
+    def order_status(self, order_id):
+        """
+        Latest polled state of an order; safe to call from any thread.
+
+        Returns:
+            tuple: (str or None, int) - Status (None until a poll has seen the order) and filled quantity.
+        """
+        return self.order_states.get(str(order_id), (None, 0))
+
+    def apply(self):
+        """
+        Apply every published delta to the positions on the trading loop, without blocking.
+
+        Returns:
+            list: The applied deltas.
+        """
+        deltas = []
+        while True:
+            try:
+                delta = self.updates.get_nowait()
+            except queue.Empty:
+                return deltas
+            if delta[0] == 'position':
+                _, symbol, quantity, average_price = delta
+                if quantity:
+                    self.positions[symbol] = (quantity, average_price)
+                else:
+                    self.positions.pop(symbol, None)
+            deltas.append(delta)
+
+    def holds(self, symbol):
+        return symbol in self.positions
+
+    def quantity(self, symbol):
+        return self.positions.get(symbol, (0, 0.0))[0]
+
+    def stop(self, timeout=5):
+        self.requests.put(None)
+        self.thread.join(timeout=timeout)
+
+    def stats(self):
+        return {'positions': len(self.positions), 'orders': len(self.order_states), 'polls': self.polls, 'failures': self.failures,
+                'position_deltas': self.position_deltas, 'order_deltas': self.order_deltas, 'poll_ms': self.poll_seconds * 1000}
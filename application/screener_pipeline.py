@@ -0,0 +1,101 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from application.candidate_queue import CandidateQueue
+
+class ScreenerPipeline:
+    def __init__(self, fetch_history, screen, workers=4, on_result=None, candidates=None):
+        """
+        Evaluate screener candidates concurrently, off the trading loop.
+
+        Submitted candidates wait in a bounded priority queue; whenever a
+        worker is free, the highest-priority fresh candidate is evaluated
+        next. Workers call screen(symbol, fetch) where fetch is fetch_history;
+        request rates are left to the client's PriorityRateLimiter, which
+        every other API caller in the process shares. Each result is published
+        to the results queue as (symbol, action, state) for the trading loop
+        to apply.
+
+        Args:
+            fetch_history (callable): Blocking history request, (symbol, days, label) -> candles or None.
+            screen (callable): (symbol, fetch) -> (action or None on failure, state handed to the trading loop).
+            workers (int): Threads evaluating candidates.
+            on_result (callable, optional): Called after each result is published, e.g. to wake the trading loop.
+            candidates (CandidateQueue, optional): Priority queue of pending candidates. Defaults to CandidateQueue().
+        """
+        self.fetch_history = fetch_history
+        self.screen = screen
+        self.on_result = on_result
+        self.results = queue.Queue()
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Screener")
+        self.candidates = candidates or CandidateQueue()
+        self.in_flight = set()
+        self.stopped = False
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+
+    def submit(self, candidates):
+        """
+        Queue candidates for evaluation; symbols already being evaluated are skipped.
+
+        Args:
+            candidates (list): (symbol, payload score) pairs, e.g. from screener_candidates(), or bare symbols.
+
+        Returns:
+            list: The symbols that were queued.
+        """
+        candidates = [(item, 0.0) if isinstance(item, str) else item for item in candidates]
+        with self.lock:
+            queued = [(symbol, score) for symbol, score in candidates if symbol not in self.in_flight]
+            self.submitted += len(queued)
+        self.candidates.offer(queued)
+        self._dispatch()
+        return [symbol for symbol, _ in queued]
+
+    def _dispatch(self):
+        """Hand the best pending candidates to free workers."""
+        with self.lock:
+            if self.stopped:
+                return
+            symbols = self.candidates.pop(self.workers - len(self.in_flight))
+            self.in_flight.update(symbols)
+            for symbol in symbols:
+                self.executor.submit(self._evaluate, symbol)
+
+    def _evaluate(self, symbol):
+        try:
+            action, state = self.screen(symbol, self.fetch_history)
+        except Exception:
+            logging.exception(f"Failed to screen {symbol}")
+            action, state = None, None
+        self.candidates.record(symbol, action)
+        with self.lock:
+            self.in_flight.discard(symbol)
+            self.completed += 1
+        self.results.put((symbol, action, state))
+        if self.on_result:
+            self.on_result()
+        self._dispatch()
+
+    def drain(self):
+        """Every published (symbol, action, state) result, without blocking."""
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        candidates = self.candidates.stats()
+        with self.lock:
+            return {'submitted': self.submitted, 'completed': self.completed, 'in_flight': len(self.in_flight),
+                    'queued': candidates['queued'], 'evicted': candidates['evicted'], 'stale': candidates['stale']}
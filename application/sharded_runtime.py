@@ -0,0 +1,176 @@
+import os
+import logging
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import Future
+from application.partitioning import shard_for
+from domain.entities.strategy import evaluate_signal
+
+def _shard_worker(shard, strategy, inbox, outbox):
+    """
+    Owns the Indicators state for one slice of the symbols.
+
+    Records on the inbox:
+        ('bars', [(symbol, close, volume, timestamp), ...], received_ns)
+        ('history', request_id, symbol, [(symbol, close, volume, timestamp), ...])
+        None to stop.
+    """
+    indicators = strategy.create_indicators()
+    while True:
+        record = inbox.get()
+        if record is None:
+            break
+        if record[0] == 'bars':
+            decisions = []
+            bar_time = None
+
+            def evaluate(symbol, close):
+                action = evaluate_signal(indicators.indicators.get(symbol, {}), strategy)
+                if action in ("buy", "sell"):
+                    decisions.append((action, symbol, close, bar_time))
+
+            def feed():
+                nonlocal bar_time
+                for bar in record[1]:
+                    bar_time = bar[3]
+                    yield bar
+
+            indicators.update_minute_batch(feed(), evaluate)
+            if decisions:
+                outbox.put(('decisions', decisions, record[2]))
+        elif record[0] == 'history':
+            _, request_id, symbol, bars = record
+            indicators.update_minute_batch(bars)
+            hourly = len(indicators.hourly_data[symbol]) if symbol in indicators.hourly_data else None
+            outbox.put(('history', request_id, hourly, evaluate_signal(indicators.indicators.get(symbol, {}), strategy)))
+
+class ShardedRuntime:
+    def __init__(self, strategy, shards=None, on_result=None):
+        """
+        Hash-partitions symbols across worker processes that each own their slice of indicator state.
+
+        The calling process routes compact (symbol, close, volume, timestamp) records
+        to the shards. Every decision comes back on one queue and is published to the
+        results queue as (action, symbol, price, chart_time, received_ns); the trading
+        loop drains it and executes the decisions on its own thread, so the portfolio
+        and order placement keep a single writer.
+
+        Args:
+            strategy (StrategyParameters): Strategy thresholds used by every shard.
+            shards (int, optional): Number of worker processes. Defaults to the CPU count.
+            on_result (callable, optional): Called after decisions are published, e.g. to wake the trading loop.
+        """
+        self.strategy = strategy
+        self.shards = shards or os.cpu_count()
+        self.on_result = on_result
+        self.results = queue.Queue()
+        self.inboxes = [multiprocessing.Queue() for _ in range(self.shards)]
+        self.outbox = multiprocessing.Queue()
+        self.processes = []
+        self.executor = None
+        self.shard_of = {}
+        self.pending = {}
+        self.next_request = 0
+        self.lock = threading.Lock()
+        self.routed = [0] * self.shards
+        self.decisions = 0
+
+    def shard(self, symbol):
+        if symbol not in self.shard_of:
+            self.shard_of[symbol] = shard_for(symbol, self.shards)
+        return self.shard_of[symbol]
+
+    def start(self):
+        for shard, inbox in enumerate(self.inboxes):
+            process = multiprocessing.Process(target=_shard_worker, args=(shard, self.strategy, inbox, self.outbox), daemon=True)
+            process.start()
+            self.processes.append(process)
+        self.executor = threading.Thread(target=self._execute, name="ShardedRuntimeExecutor", daemon=True)
+        self.executor.start()
+
+    def route(self, updates, received_ns=None):
+        """
+        Forward chart updates to their shards, one queue put per shard.
+
+        Args:
+            updates (list): (symbol, close, volume, chart_time, service_time) tuples from the stream decoder.
+            received_ns (int, optional): perf_counter_ns() when the batch arrived, handed back with its decisions.
+        """
+        parts = [[] for _ in range(self.shards)]
+        for symbol, close, volume, chart_time, _ in updates:
+            parts[self.shard(symbol)].append((symbol, close, volume, chart_time))
+        for shard, part in enumerate(parts):
+            if part:
+                self.inboxes[shard].put(('bars', part, received_ns))
+                self.routed[shard] += len(part)
+
+    def load_history(self, symbol, candles):
+        """
+        Feed history candles to the symbol's shard.
+
+        Returns:
+            Future: Resolves to (hourly candle count or None, current strategy action).
+        """
+        future = Future()
+        with self.lock:
+            request_id = self.next_request
+            self.next_request += 1
+            self.pending[request_id] = future
+        bars = [(symbol, candle['close'], candle['volume'], candle['datetime']) for candle in candles]
+        self.inboxes[self.shard(symbol)].put(('history', request_id, symbol, bars))
+        return future
+
+    def _execute(self):
+        while True:
+            record = self.outbox.get()
+            if record is None:
+                break
+            if record[0] == 'decisions':
+                received_ns = record[2]
+                for action, symbol, price, chart_time in record[1]:
+                    self.decisions += 1
+                    self.results.put((action, symbol, price, chart_time, received_ns))
+                if self.on_result:
+                    self.on_result()
+            elif record[0] == 'history':
+                with self.lock:
+                    future = self.pending.pop(record[1], None)
+                if future:
+                    future.set_result((record[2], record[3]))
+
+    def drain(self):
+        """Every published (action, symbol, price, chart_time, received_ns) decision, without blocking."""
+        decisions = []
+        while True:
+            try:
+                decisions.append(self.results.get_nowait())
+            except queue.Empty:
+                return decisions
+
+    def stop(self, timeout=5.0):
+        """
+        Let the shards finish queued work, then stop them and the executor.
+
+        A shard still alive after timeout seconds is terminated, so one hung or
+        dead worker cannot block shutdown; history requests it never answered fail.
+        """
+        for inbox in self.inboxes:
+            inbox.put(None)
+        for shard, process in enumerate(self.processes):
+            process.join(timeout)
+            if process.is_alive():
+                logging.warning(f"Shard {shard} did not stop within {timeout} s; terminating it")
+                process.terminate()
+                process.join(timeout)
+        if self.executor:
+            # Shards that exited have flushed their results, so the sentinel is read after them
+            self.outbox.put(None)
+            self.executor.join(timeout)
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError("Sharded runtime stopped before the shard answered"))
+
+    def stats(self):
+        return {'shards': self.shards, 'routed': list(self.routed), 'decisions': self.decisions}
@@ -0,0 +1,85 @@
+import json
+import logging
+
+class StreamBatch:
+    def __init__(self):
+        self.chart = []        # (symbol, close, volume, chart_time, service_time), latest per (symbol, minute), in first-arrival order
+        self.screener = []     # SCREENER_EQUITY services in arrival order
+        self.heartbeats = []   # Heartbeat timestamps in milliseconds
+        self.timestamp = None  # Latest service timestamp in milliseconds
+
+def chart_updates(service):
+    """
+    Extracts (symbol, close, volume, chart_time, service_time) tuples from a CHART_EQUITY service.
+
+    Entries missing a close, volume or chart time are skipped.
+    """
+    updates = []
+    service_time = service.get("timestamp")
+    for content in service.get("content", []):
+        close = content.get("4")
+        volume = content.get("5")
+        chart_time = content.get("7")
+        if close is None or volume is None or chart_time is None:
+            continue
+        updates.append((content.get("key", "NO KEY"), close, volume, chart_time, service_time if service_time is not None else chart_time))
+    return updates
+
+class StreamDecoder:
+    """
+    Parses a burst of raw streamer messages in one pass.
+
+    CHART_EQUITY updates are coalesced so only the latest update for each
+    (symbol, minute) survives. A correction overwrites the values at the
+    position of the first update for that minute, so each symbol's minutes
+    stay in chart-time order even across an hour boundary. During catch-up after a reconnect or in a fast
+    replay, the work that follows is bounded by the number of distinct
+    symbol-minutes rather than the number of messages. When collapsing under
+    overload, only the latest update per symbol and the latest screener
+    survive, trading completeness of the hourly bars for fresh decisions.
+    """
+    def __init__(self):
+        self.messages = 0
+        self.updates = 0
+        self.kept = 0
+        self.collapsed = 0
+
+    def decode(self, raw_messages, collapse=False):
+        """
+        Args:
+            raw_messages (list): JSON strings received from the streamer.
+            collapse (bool): Keep only the latest chart update per symbol and the latest screener.
+
+        Returns:
+            StreamBatch: The decoded batch.
+        """
+        batch = StreamBatch()
+        latest = {}
+        for raw_message in raw_messages:
+            try:
+                message = json.loads(raw_message)
+            except json.JSONDecodeError:
+                logging.warning(f"Dropping malformed streamer message: {raw_message[:200]}")
+                continue
+            self.messages += 1
+            for service in message.get("data", []):
+                if "timestamp" in service and (batch.timestamp is None or service["timestamp"] > batch.timestamp):
+                    batch.timestamp = service["timestamp"]
+                if service.get("service") == "CHART_EQUITY":
+                    for update in chart_updates(service):
+                        self.updates += 1
+                        key = update[0] if collapse else (update[0], update[3] // 60000)
+                        latest[key] = update  # Keeps the first occurrence's position
+                elif service.get("service") == "SCREENER_EQUITY":
+                    batch.screener.append(service)
+            for service in message.get("notify", []):
+                batch.heartbeats.append(int(service.get("heartbeat", 0)))
+        batch.chart = list(latest.values())
+        self.kept += len(batch.chart)
+        if collapse:
+            self.collapsed += 1
+            batch.screener = batch.screener[-1:]
+        return batch
+
+    def stats(self):
+        return {'messages': self.messages, 'updates': self.updates, 'kept': self.kept, 'collapsed_batches': self.collapsed}
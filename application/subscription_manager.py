@@ -0,0 +1,83 @@
+CHART_FIELDS = "0,1,2,3,4,5,6,7,8"
+
+class SubscriptionManager:
+    def __init__(self, stream, clock, hold=7200.0, fields=CHART_FIELDS):
+        """
+        Reconcile desired CHART_EQUITY subscriptions against the current ones.
+
+        Symbols are wanted with want() and stay desired for `hold` seconds after
+        they were last wanted, so a symbol that just qualified is not dropped
+        before it had a chance to trade and one that drifts in and out of the
+        screener is not churned. Each sync() emits at most one ADD and one
+        UNSUBS request, with comma-joined keys.
+
+        Args:
+            stream: Streamer whose chart_equity() builds the requests.
+            clock (RealClock or VirtualClock): Time source for the hold period.
+            hold (float): Seconds a symbol stays subscribed after it was last wanted.
+            fields (str): CHART_EQUITY fields requested for added symbols.
+        """
+        self.stream = stream
+        self.clock = clock
+        self.hold = hold
+        self.fields = fields
+        self.current = set()  # Symbols the streamer was asked to send
+        self.wanted = {}  # Symbol -> clock time it was last wanted
+        self.requests = 0
+        self.added = 0
+        self.dropped = 0
+
+    def track(self, symbol):
+        """Record a symbol that is already subscribed, e.g. one sent with the initial request."""
+        self.current.add(symbol)
+        self.want(symbol)
+
+    def want(self, symbol):
+        self.wanted[symbol] = self.clock.time()
+
+    def tracks(self, symbol):
+        """Whether the symbol is subscribed or about to be."""
+        return symbol in self.current or symbol in self.wanted
+
+    def diff(self, keep=()):
+        """
+        Refresh `keep` (e.g. symbols with open positions) and expire stale wants.
+
+        Returns:
+            tuple: (symbols to add, symbols to drop), both sorted.
+        """
+        now = self.clock.time()
+        for symbol in keep:
+            self.wanted[symbol] = now
+        for symbol in [symbol for symbol, wanted_at in self.wanted.items() if now - wanted_at >= self.hold]:
+            del self.wanted[symbol]
+        return sorted(self.wanted.keys() - self.current), sorted(self.current - self.wanted.keys())
+
+    def sync(self, send, keep=()):
+        """
+        Send the ADD and UNSUBS needed to reach the desired subscriptions.
+
+        Args:
+            send (callable): Sends a request or a list of requests, e.g. Stream.send.
+            keep (iterable): Symbols to keep wanted as of now.
+
+        Returns:
+            tuple: (added symbols, dropped symbols).
+        """
+        add, drop = self.diff(keep)
+        requests = []
+        if add:
+            requests.append(self.stream.chart_equity(",".join(add), self.fields))
+        if drop:
+            requests.append(self.stream.chart_equity(",".join(drop), self.fields, command="UNSUBS"))
+        if requests:
+            send(requests)
+            self.current.update(add)
+            self.current.difference_update(drop)
+            self.requests += len(requests)
+            self.added += len(add)
+            self.dropped += len(drop)
+        return add, drop
+
+    def stats(self):
+        return {'subscribed': len(self.current), 'requests': self.requests, 'added': self.added, 'dropped': self.dropped}
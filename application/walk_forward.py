@@ -0,0 +1,164 @@
+import os
+import logging
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from application.backtest import prepare_series, simulate_trades, summarize_trades
+from application.parameter_sweep import expand_grid
+from infrastructure.adapters.candle_store import build_candle_cache, load_candles, DATETIME
+
+DAY_MS = 86_400_000
+
+# Per-process state set by _init_worker; series stay cached across every fold a worker runs
+_worker = {'data_path': None, 'cache_dir': None, 'symbols': [], 'param_sets': [], 'series': {}}
+
+def fold_windows(session_days, in_sample_days, out_of_sample_days, step_days=None):
+    """
+    Precomputes rolling walk-forward fold windows over trading sessions.
+
+    Args:
+        session_days (list): Sorted session day numbers (milliseconds // DAY_MS).
+        in_sample_days (int): Sessions in each fitting window.
+        out_of_sample_days (int): Sessions in each evaluation window that follows it.
+        step_days (int, optional): Sessions to roll forward per fold. Defaults to out_of_sample_days.
+
+    Returns:
+        list: (train_start, train_stop, test_stop) timestamps in milliseconds; the test window starts at train_stop.
+    """
+    step_days = step_days or out_of_sample_days
+    folds = []
+    start = 0
+    while start + in_sample_days + out_of_sample_days <= len(session_days):
+        train_start = session_days[start] * DAY_MS
+        train_stop = session_days[start + in_sample_days] * DAY_MS
+        last_test = start + in_sample_days + out_of_sample_days
+        test_stop = session_days[last_test] * DAY_MS if last_test < len(session_days) else (session_days[-1] + 1) * DAY_MS
+        folds.append((train_start, train_stop, test_stop))
+        start += step_days
+    return folds
+
+def _init_worker(data_path, cache_dir, symbols, param_sets):
+    _worker.update(data_path=data_path, cache_dir=cache_dir, symbols=symbols, param_sets=param_sets, series={})
+
+def _series(symbol):
+    if symbol not in _worker['series']:
+        candles = load_candles(_worker['data_path'], symbol, _worker['cache_dir'])
+        _worker['series'][symbol] = prepare_series(candles) if candles is not None and len(candles) else None
+    return _worker['series'][symbol]
+
+def _evaluate(params, start_ms, stop_ms, quantity, initial_cash):
+    """Totals one parameter set over every symbol between two timestamps."""
+    totals = {'trades': 0, 'wins': 0, 'losses': 0, 'pnl': 0.0}
+    for symbol in _worker['symbols']:
+        series = _series(symbol)
+        if series is None:
+            continue
+        # Indicator series cover the full history, so a fold's window is a slice
+        # whose indicators are already warmed up by everything before it.
+        start, stop = np.searchsorted(series.bars.trigger_time, [start_ms, stop_ms])
+        buy, sell = series.signals(params)
+        summary = summarize_trades(simulate_trades(series.bars, buy, sell, quantity, initial_cash, start, stop))
+        for key in totals:
+            totals[key] += summary[key]
+    return totals
+
+def _fold_task(index, window, quantity, initial_cash):
+    train_start, train_stop, test_stop = window
+    best_params, best_in_sample = None, None
+    for params in _worker['param_sets']:
+        in_sample = _evaluate(params, train_start, train_stop, quantity, initial_cash)
+        if best_in_sample is None or in_sample['pnl'] > best_in_sample['pnl']:
+            best_params, best_in_sample = params, in_sample
+    out_of_sample = _evaluate(best_params, train_stop, test_stop, quantity, initial_cash)
+    return {
+        'fold': index,
+        'window': window,
+        'params': best_params,
+        'in_sample': best_in_sample,
+        'out_of_sample': out_of_sample
+    }
+
+class WalkForward:
+    def __init__(self, data_path, symbols, grid, in_sample_days=20, out_of_sample_days=5, step_days=None,
+                 cache_dir=None, workers=None, quantity=100, initial_cash=100000.0):
+        """
+        Initialize a walk-forward optimization over historical minute data.
+
+        Args:
+            data_path (str): Directory holding the <symbol>.json candle files.
+            symbols (list): Symbols traded together in every fold.
+            grid (dict): Maps StrategyParameters argument names to non-empty lists of values.
+            in_sample_days (int): Sessions used to fit parameters in each fold.
+            out_of_sample_days (int): Sessions used to evaluate the fitted parameters.
+            step_days (int, optional): Sessions to roll forward per fold. Defaults to out_of_sample_days.
+            cache_dir (str, optional): Directory for memory-mapped .npy candle caches.
+            workers (int, optional): Process pool size. Defaults to the CPU count.
+            quantity (int): Shares per trade.
+            initial_cash (float): Cash available per symbol.
+        """
+        self.data_path = data_path
+        self.symbols = list(symbols)
+        self.param_sets = expand_grid(grid)
+        if not self.param_sets:
+            raise ValueError("Walk-forward grid has no parameter sets; every grid entry needs at least one value")
+        self.in_sample_days = in_sample_days
+        self.out_of_sample_days = out_of_sample_days
+        self.step_days = step_days
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count()
+        self.quantity = quantity
+        self.initial_cash = initial_cash
+
+    def session_days(self):
+        days = set()
+        for symbol in self.symbols:
+            candles = load_candles(self.data_path, symbol, self.cache_dir)
+            if candles is not None and len(candles):
+                days.update(np.unique(candles[:, DATETIME].astype(np.int64) // DAY_MS).tolist())
+        return sorted(days)
+
+    def run(self, on_fold=None):
+        """
+        Fit and evaluate every fold in parallel.
+
+        Args:
+            on_fold (callable, optional): Called with each fold result as it completes.
+
+        Returns:
+            dict: Fold results ordered by fold plus combined out-of-sample totals.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.data_path, self.cache_dir, self.symbols, self.param_sets)) as pool:
+            list(pool.map(build_candle_cache, itertools.repeat(self.data_path), self.symbols, itertools.repeat(self.cache_dir)))
+            windows = fold_windows(self.session_days(), self.in_sample_days, self.out_of_sample_days, self.step_days)
+            futures = [pool.submit(_fold_task, i, window, self.quantity, self.initial_cash) for i, window in enumerate(windows)]
+            folds = []
+            for future in as_completed(futures):
+                fold = future.result()
+                folds.append(fold)
+                logging.info(f"[Walk-Forward] Fold {fold['fold']}: {fold['params']} in-sample P/L {fold['in_sample']['pnl']:.2f}, "
+                             f"out-of-sample P/L {fold['out_of_sample']['pnl']:.2f}")
+                if on_fold:
+                    on_fold(fold)
+        folds.sort(key=lambda fold: fold['fold'])
+        combined = {'trades': 0, 'wins': 0, 'losses': 0, 'pnl': 0.0}
+        for fold in folds:
+            for key in combined:
+                combined[key] += fold['out_of_sample'][key]
+        return {'folds': folds, 'out_of_sample': combined}
+
+# Example usage
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    data_path = os.path.join("Data Collection", "stock_data")
+    symbols = sorted(name[:-5] for name in os.listdir(data_path) if name.endswith(".json"))
+    grid = {
+        'sma_short': [5, 10],
+        'sma_long': [20, 30],
+        'rsi_threshold': [60, 70],
+        'bollinger_width': [0.05, 0.1],
+        'volume_lookback': [4, 6],
+        'macd_lookback': [3]
+    }
+    report = WalkForward(data_path, symbols, grid).run()
+    print(f"Out-of-sample totals: {report['out_of_sample']}")
@@ -0,0 +1,172 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from domain.entities.indicators import Indicators
+from domain.entities.strategy import signal_arrays
+
+HOUR_MS = 3_600_000
+
+class HourlyBars:
+    def __init__(self, close, volume, hour, trigger_index, trigger_price, trigger_time):
+        self.close = close                  # Close of each finalized hour
+        self.volume = volume                # Accumulated volume of each finalized hour
+        self.hour = hour                    # Hour start in milliseconds since epoch
+        self.trigger_index = trigger_index  # Index of the minute candle that finalized the hour
+        self.trigger_price = trigger_price  # Close of that minute, the price stock_trader trades at
+        self.trigger_time = trigger_time    # Timestamp of that minute in milliseconds
+
+    def __len__(self):
+        return len(self.close)
+
+def aggregate_hourly(timestamps, closes, volumes):
+    """
+    Vectorized equivalent of feeding minute candles through Indicators.update_minute_data.
+
+    An hour is finalized when the first candle of the next hour arrives, so the
+    trailing in-progress hour is not included. Hours are bucketed on the epoch,
+    which matches local-time buckets for every whole-hour UTC offset.
+
+    Args:
+        timestamps (numpy.ndarray): Minute timestamps in milliseconds, ascending.
+        closes (numpy.ndarray): Minute close prices.
+        volumes (numpy.ndarray): Minute volumes.
+
+    Returns:
+        HourlyBars: Finalized hourly bars.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    closes = np.asarray(closes, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    if len(timestamps) == 0:
+        empty = np.empty(0)
+        return HourlyBars(empty, empty, empty.astype(np.int64), empty.astype(np.int64), empty, empty.astype(np.int64))
+    hours = timestamps // HOUR_MS
+    starts = np.flatnonzero(np.r_[True, hours[1:] != hours[:-1]])
+    ends = np.r_[starts[1:], len(hours)]
+    trigger_index = starts[1:]
+    return HourlyBars(
+        close=closes[ends[:-1] - 1],
+        volume=np.add.reduceat(volumes, starts)[:-1],
+        hour=hours[starts[:-1]] * HOUR_MS,
+        trigger_index=trigger_index,
+        trigger_price=closes[trigger_index],
+        trigger_time=timestamps[trigger_index]
+    )
+
+class SeriesCache:
+    """
+    Per-symbol indicator series over hourly bars, computed once and shared.
+
+    Each series is aligned with the bars (NaN or False where Indicators would
+    not have a value yet) and memoized by name and parameters, so parameter
+    sets sharing a period reuse the same array.
+    """
+    def __init__(self, bars):
+        self.bars = bars
+        self.series = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _memo(self, key, compute):
+        if key in self.series:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.series[key] = compute()
+        return self.series[key]
+
+    def _windows(self, values, length):
+        out = np.full(len(values), np.nan)
+        if length <= 0 or len(values) < length:
+            return out, None
+        return out, sliding_window_view(values, length)
+
+    def sma(self, length):
+        def compute():
+            out, windows = self._windows(self.bars.close, length)
+            if windows is not None:
+                out[length - 1:] = windows.mean(axis=1)
+            return out
+        return self._memo(('sma', length), compute)
+
+    def bollinger_width(self, period=20, std_dev=2):
+        def compute():
+            out, windows = self._windows(self.bars.close, period)
+            if windows is not None:
+                out[period - 1:] = 2 * std_dev * windows.std(axis=1) / windows.mean(axis=1)
+            return out
+        return self._memo(('bollinger_width', period, std_dev), compute)
+
+    def rsi(self, length=14):
+        def compute():
+            out = np.full(len(self.bars), np.nan)
+            if len(self.bars) < length + 1:
+                return out
+            changes = sliding_window_view(np.diff(self.bars.close), length)
+            gain_mask = changes > 0
+            gain_count = gain_mask.sum(axis=1)
+            loss_count = length - gain_count
+            gain_sum = np.where(gain_mask, changes, 0.0).sum(axis=1)
+            loss_sum = np.where(gain_mask, 0.0, -changes).sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                avg_gain = gain_sum / gain_count
+                avg_loss = loss_sum / loss_count
+                rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+            rsi = np.where(avg_loss == 0, 100.0, rsi)
+            rsi = np.where(loss_count == 0, 100.0, rsi)
+            rsi = np.where(gain_count == 0, 0.0, rsi)
+            out[length:] = rsi
+            return out
+        return self._memo(('rsi', length), compute)
+
+    def macd(self):
+        def compute():
+            # The EMA seeding in Indicators.calculate_MACD is path dependent, so
+            # the series is produced by the same code the live bot runs.
+            engine = Indicators()
+            history = engine.hourly_data.setdefault('series', [])
+            macd_line = np.full(len(self.bars), np.nan)
+            signal_line = np.full(len(self.bars), np.nan)
+            for i, close in enumerate(self.bars.close.tolist()):
+                history.append((close, 0, None))
+                macd_value, signal_value = engine.calculate_MACD('series')
+                if macd_value is not None and signal_value is not None:
+                    macd_line[i] = macd_value
+                    signal_line[i] = signal_value
+            return macd_line, signal_line
+        return self._memo(('macd',), compute)
+
+    def macd_crossover(self, direction="above", lookback=3):
+        def compute():
+            macd_line, signal_line = self.macd()
+            out = np.zeros(len(self.bars), dtype=bool)
+            valid = np.flatnonzero(~np.isnan(signal_line))
+            if len(valid) < 2:
+                return out
+            m, s = macd_line[valid], signal_line[valid]
+            crossed = np.zeros(len(valid), dtype=np.int64)
+            if direction == "above":
+                crossed[1:] = (m[:-1] <= s[:-1]) & (m[1:] > s[1:])
+            else:
+                crossed[1:] = (m[:-1] >= s[:-1]) & (m[1:] < s[1:])
+            totals = np.cumsum(crossed)
+            shifted = np.r_[np.zeros(lookback, dtype=np.int64), totals[:-lookback]] if lookback < len(totals) else np.zeros(len(totals), dtype=np.int64)
+            out[valid] = (totals - shifted) > 0
+            return out
+        return self._memo(('macd_crossover', direction, lookback), compute)
+
+    def volume_breakout(self, lookback=6):
+        def compute():
+            out = np.zeros(len(self.bars), dtype=bool)
+            volume = self.bars.volume
+            if len(volume) < lookback:
+                return out
+            if lookback <= 1:
+                out[:] = True
+                return out
+            previous = sliding_window_view(volume, lookback)[:, :-1].max(axis=1)
+            out[lookback - 1:] = volume[lookback - 1:] > previous
+            return out
+        return self._memo(('volume_breakout', lookback), compute)
+
+    def signals(self, params):
+        return self._memo(('signals', params.key()), lambda: signal_arrays(self, params))
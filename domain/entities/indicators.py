@@ -2,7 +2,11 @@ import datetime
 import math
 
 class Indicators:
-    def __init__(self):
+    def __init__(self, sma_short=10, sma_long=20, volume_lookback=6, macd_lookback=3):
+        self.sma_short = sma_short
+        self.sma_long = sma_long
+        self.volume_lookback = volume_lookback
+        self.macd_history_length = max(5, macd_lookback + 1)
         self.current_hour = {}
         self.accum_volume = {}
         self.last_close = {}
@@ -30,6 +34,29 @@ class Indicators:
             self.last_close[symbol] = close
             return False
 
+    def update_minute_batch(self, updates, on_update=None):
+        """
+        Applies (symbol, close, volume, timestamp) updates in order.
+
+        on_update(symbol, close) is called after every update for which
+        update_minute_data returns True, while the indicators reflect exactly
+        that point in the sequence. Returns the number of such updates.
+        """
+        count = 0
+        for symbol, close, volume, timestamp in updates:
+            if self.update_minute_data(symbol, close, volume, timestamp):
+                count += 1
+                if on_update:
+                    on_update(symbol, close)
+        return count
+
+    def adopt_symbol(self, symbol, other):
+        """Takes over one symbol's state from another instance, e.g. one warmed up on a worker thread."""
+        for name in ('current_hour', 'accum_volume', 'last_close', 'hourly_data', 'indicators', 'ema_values'):
+            source = getattr(other, name)
+            if symbol in source:
+                getattr(self, name)[symbol] = source[symbol]
+
     def calculate_indicators(self, symbol):
         if symbol not in self.indicators:
             self.indicators[symbol] = {
@@ -40,8 +67,8 @@ class Indicators:
                 'bollinger_history': [],
                 'volume_history': []
             }
-        ma_short = self.calculate_SMA(symbol, 10)
-        ma_long = self.calculate_SMA(symbol, 20)
+        ma_short = self.calculate_SMA(symbol, self.sma_short)
+        ma_long = self.calculate_SMA(symbol, self.sma_long)
         if ma_short is not None and ma_long is not None:
             self.indicators[symbol]['ma_short_history'].append(ma_short)
             self.indicators[symbol]['ma_long_history'].append(ma_long)
@@ -56,7 +83,7 @@ class Indicators:
         macd_line, signal_line = self.calculate_MACD(symbol)
         if macd_line is not None and signal_line is not None:
             self.indicators[symbol]['macd_history'].append((macd_line, signal_line))
-            if len(self.indicators[symbol]['macd_history']) > 5:
+            if len(self.indicators[symbol]['macd_history']) > self.macd_history_length:
                 self.indicators[symbol]['macd_history'].pop(0)
         bollinger = self.calculate_Bollinger_Bands(symbol, 20, 2)
         if bollinger[0] is not None:
@@ -65,7 +92,7 @@ class Indicators:
                 self.indicators[symbol]['bollinger_history'].pop(0)
         hourly_volume = self.hourly_data[symbol][-1][1]
         self.indicators[symbol]['volume_history'].append(hourly_volume)
-        if len(self.indicators[symbol]['volume_history']) > 6:
+        if len(self.indicators[symbol]['volume_history']) > self.volume_lookback:
             self.indicators[symbol]['volume_history'].pop(0)
 
     def calculate_SMA(self, symbol, length):
@@ -0,0 +1,97 @@
+import numpy as np
+
+class Marks:
+    def __init__(self, symbols, quantity, entry_price, price, unrealized, gross_exposure, net_exposure):
+        self.symbols = symbols                # Symbol of each open position, aligned with the arrays below
+        self.quantity = quantity              # Signed quantity; negative for shorts
+        self.entry_price = entry_price
+        self.price = price                    # Last traded price, or the entry price before the first tick
+        self.unrealized = unrealized          # Unrealized P/L per position
+        self.gross_exposure = gross_exposure  # Sum of absolute position values
+        self.net_exposure = net_exposure      # Long minus short value
+
+    @property
+    def market_value(self):
+        return self.net_exposure
+
+    @property
+    def unrealized_pnl(self):
+        return float(self.unrealized.sum())
+
+    def by_symbol(self):
+        return dict(zip(self.symbols, self.unrealized.tolist()))
+
+class MarkToMarket:
+    """
+    Open positions in arrays aligned with a last-price array, so marking every position is one vectorized step.
+
+    Symbols keep their slot while the position is open; closed slots are
+    reused. Prices of symbols without a position are ignored, so feeding
+    every chart update costs one dict lookup per update.
+    """
+    def __init__(self, capacity=64):
+        self.slots = {}  # symbol -> index into the arrays
+        self.symbols = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.quantity = np.zeros(capacity)
+        self.entry_price = np.zeros(capacity)
+        self.last_price = np.full(capacity, np.nan)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _grow(self):
+        capacity = len(self.quantity)
+        self.symbols.extend([None] * capacity)
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+        self.quantity = np.concatenate([self.quantity, np.zeros(capacity)])
+        self.entry_price = np.concatenate([self.entry_price, np.zeros(capacity)])
+        self.last_price = np.concatenate([self.last_price, np.full(capacity, np.nan)])
+
+    def set_position(self, symbol, quantity, entry_price):
+        index = self.slots.get(symbol)
+        if not quantity:
+            if index is not None:
+                del self.slots[symbol]
+                self.symbols[index] = None
+                self.quantity[index] = 0.0
+                self.last_price[index] = np.nan
+                self.free.append(index)
+            return
+        if index is None:
+            if not self.free:
+                self._grow()
+            index = self.free.pop()
+            self.slots[symbol] = index
+            self.symbols[index] = symbol
+        self.quantity[index] = quantity
+        self.entry_price[index] = entry_price
+
+    def update_price(self, symbol, price):
+        index = self.slots.get(symbol)
+        if index is not None:
+            self.last_price[index] = price
+
+    def update_prices(self, updates):
+        """Take the last price of every (symbol, close, ...) chart update, in order."""
+        slots = self.slots
+        if not slots:
+            return
+        last_price = self.last_price
+        for symbol, close, *_ in updates:
+            index = slots.get(symbol)
+            if index is not None:
+                last_price[index] = close
+
+    def mark(self):
+        """Every open position marked at its last price, with portfolio totals."""
+        open_slots = np.flatnonzero(self.quantity)
+        quantity = self.quantity[open_slots]
+        entry_price = self.entry_price[open_slots]
+        price = self.last_price[open_slots]
+        price = np.where(np.isnan(price), entry_price, price)
+        value = quantity * price
+        # Slots are reused after a close, so the symbols are captured with the snapshot
+        symbols = [self.symbols[i] for i in open_slots.tolist()]
+        return Marks(symbols, quantity, entry_price, price,
+                     (price - entry_price) * quantity, float(np.abs(value).sum()), float(value.sum()))
@@ -0,0 +1,175 @@
+import math
+import numpy as np
+
+def period_returns(equity):
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) < 2:
+        return np.empty(0)
+    return np.diff(equity) / equity[:-1]
+
+def sharpe_ratio(returns, periods_per_year=1):
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) < 2:
+        return 0.0
+    std = returns.std(ddof=1)
+    if std == 0:
+        return 0.0
+    return float(returns.mean() / std * math.sqrt(periods_per_year))
+
+def sortino_ratio(returns, periods_per_year=1):
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) < 2:
+        return 0.0
+    downside = math.sqrt(np.square(np.minimum(returns, 0.0)).mean())
+    if downside == 0:
+        return 0.0
+    return float(returns.mean() / downside * math.sqrt(periods_per_year))
+
+def max_drawdown(equity):
+    """
+    Largest peak-to-trough decline of an equity curve and the longest time spent below a peak.
+
+    Args:
+        equity (array-like): Equity values in time order.
+
+    Returns:
+        tuple: (float, int) - Max drawdown as a fraction of the peak, and the longest drawdown duration in periods.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) == 0:
+        return 0.0, 0
+    peak = np.maximum.accumulate(equity)
+    drawdown = 1.0 - equity / peak
+    index = np.arange(len(equity))
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, index, 0))
+    return float(drawdown.max()), int((index - last_peak).max())
+
+def trade_statistics(trade_pnl):
+    pnl = np.asarray(trade_pnl, dtype=np.float64)
+    gross_profit = float(pnl[pnl > 0].sum())
+    gross_loss = float(-pnl[pnl < 0].sum())
+    return {
+        'trades': int(len(pnl)),
+        'wins': int(np.count_nonzero(pnl > 0)),
+        'losses': int(np.count_nonzero(pnl < 0)),
+        'win_rate': float(np.count_nonzero(pnl > 0) / len(pnl)) if len(pnl) else 0.0,
+        'profit_factor': gross_profit / gross_loss if gross_loss else (math.inf if gross_profit else 0.0),
+        'total_pnl': float(pnl.sum())
+    }
+
+def performance_report(equity, trade_pnl=(), exposure=None, traded_notional=None, periods_per_year=1):
+    """
+    Computes end-of-run performance metrics from an equity curve and trade log.
+
+    Args:
+        equity (array-like): Equity sampled at regular periods.
+        trade_pnl (array-like): Realized P/L of each closed trade.
+        exposure (array-like, optional): Gross position value per period, aligned with equity.
+        traded_notional (array-like, optional): Notional value of every fill.
+        periods_per_year (int): Equity samples per year, used to annualize Sharpe and Sortino.
+
+    Returns:
+        dict: Sharpe, Sortino, max drawdown and duration, trade statistics, exposure and turnover.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    returns = period_returns(equity)
+    drawdown, duration = max_drawdown(equity)
+    report = trade_statistics(trade_pnl)
+    report.update({
+        'sharpe': sharpe_ratio(returns, periods_per_year),
+        'sortino': sortino_ratio(returns, periods_per_year),
+        'max_drawdown': drawdown,
+        'max_drawdown_duration': duration,
+        'exposure': float(np.count_nonzero(np.asarray(exposure)) / len(equity)) if exposure is not None and len(equity) else 0.0,
+        'turnover': float(np.sum(np.abs(traded_notional)) / equity.mean()) if traded_notional is not None and len(equity) else 0.0
+    })
+    return report
+
+class RunningPerformance:
+    """
+    Incremental counterpart of performance_report for live sessions.
+
+    Every update is O(1): drawdown uses a running peak, Sharpe uses Welford
+    running moments of period returns, and trade statistics are counters.
+    """
+    def __init__(self, periods_per_year=1):
+        self.periods_per_year = periods_per_year
+        self.periods = 0
+        self.last_equity = None
+        self.peak = None
+        self.peak_period = 0
+        self.max_drawdown = 0.0
+        self.max_drawdown_duration = 0
+        self.equity_sum = 0.0
+        self.exposed_periods = 0
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+        self.downside_sq_sum = 0.0
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.traded_notional = 0.0
+
+    def update_equity(self, equity, exposure=0.0):
+        if self.last_equity:
+            r = equity / self.last_equity - 1.0
+            self.return_count += 1
+            delta = r - self.return_mean
+            self.return_mean += delta / self.return_count
+            self.return_m2 += delta * (r - self.return_mean)
+            if r < 0:
+                self.downside_sq_sum += r * r
+        if self.peak is None or equity >= self.peak:
+            self.peak = equity
+            self.peak_period = self.periods
+        elif self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, 1.0 - equity / self.peak)
+        self.max_drawdown_duration = max(self.max_drawdown_duration, self.periods - self.peak_period)
+        self.last_equity = equity
+        self.equity_sum += equity
+        if exposure:
+            self.exposed_periods += 1
+        self.periods += 1
+
+    def record_fill(self, notional):
+        self.traded_notional += abs(notional)
+
+    def record_trade(self, pnl):
+        self.trades += 1
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        elif pnl < 0:
+            self.losses += 1
+            self.gross_loss -= pnl
+
+    def sharpe(self):
+        if self.return_count < 2 or self.return_m2 == 0:
+            return 0.0
+        std = math.sqrt(self.return_m2 / (self.return_count - 1))
+        return self.return_mean / std * math.sqrt(self.periods_per_year)
+
+    def sortino(self):
+        if self.return_count < 2 or self.downside_sq_sum == 0:
+            return 0.0
+        downside = math.sqrt(self.downside_sq_sum / self.return_count)
+        return self.return_mean / downside * math.sqrt(self.periods_per_year)
+
+    def report(self):
+        return {
+            'trades': self.trades,
+            'wins': self.wins,
+            'losses': self.losses,
+            'win_rate': self.wins / self.trades if self.trades else 0.0,
+            'profit_factor': self.gross_profit / self.gross_loss if self.gross_loss else (math.inf if self.gross_profit else 0.0),
+            'total_pnl': self.gross_profit - self.gross_loss,
+            'sharpe': self.sharpe(),
+            'sortino': self.sortino(),
+            'max_drawdown': self.max_drawdown,
+            'max_drawdown_duration': self.max_drawdown_duration,
+            'exposure': self.exposed_periods / self.periods if self.periods else 0.0,
+            'turnover': self.traded_notional / (self.equity_sum / self.periods) if self.periods else 0.0
+        }
@@ -1,44 +1,106 @@
 import logging
+from collections import deque
+from domain.entities.performance import RunningPerformance
+from domain.entities.mark_to_market import MarkToMarket
+
+# Portfolio reports are sampled every 5 minutes across 6.5-hour sessions
+REPORT_PERIODS_PER_YEAR = 252 * 78
+
+class Position:
+    __slots__ = ('quantity', 'entry_price')
+
+    def __init__(self, quantity, entry_price):
+        self.quantity = quantity
+        self.entry_price = entry_price
+
+    def __repr__(self):
+        return f"Position(quantity={self.quantity}, entry_price={self.entry_price})"
 
 class Portfolio:
-    def __init__(self, initial_cash=100000.0):
+    def __init__(self, initial_cash=100000.0, trade_log_size=1000):
         self.cash = initial_cash
-        self.positions = {}
-        self.realized_gains_losses = []
+        self.positions = {}  # symbol -> Position
+        self.realized_pnl = 0.0
+        self.cost_basis = 0.0  # Entry value of the open positions, kept in step with every fill
+        # (symbol, quantity, entry_price, exit_price, profit_loss) of the most recent closing fills
+        self.trade_log = deque(maxlen=trade_log_size) if trade_log_size else None
+        self.performance = RunningPerformance(periods_per_year=REPORT_PERIODS_PER_YEAR)
+        self.marks = MarkToMarket()  # Open positions against their last prices, kept in step with every fill
+
+    @property
+    def recent_realized_pnl(self):
+        """P/L of the closing fills still in the bounded trade log, oldest first; realized_pnl holds the full total."""
+        return [trade[-1] for trade in self.trade_log] if self.trade_log is not None else []
 
-    def buy(self, symbol, price, quantity):
-        cost = price * quantity
+    def buy(self, symbol, price, quantity, commission=0.0):
+        cost = price * quantity + commission
         if self.cash >= cost:
-            if symbol in self.positions:
-                current_quantity = self.positions[symbol]['quantity']
-                current_entry = self.positions[symbol]['entry_price']
-                new_quantity = current_quantity + quantity
-                new_entry = (current_entry * current_quantity + price * quantity) / new_quantity
-                self.positions[symbol] = {'quantity': new_quantity, 'entry_price': new_entry}
+            position = self.positions.get(symbol)
+            if position:
+                new_quantity = position.quantity + quantity
+                # Commission is part of the cost basis
+                position.entry_price = (position.entry_price * position.quantity + price * quantity + commission) / new_quantity
+                position.quantity = new_quantity
             else:
-                self.positions[symbol] = {'quantity': quantity, 'entry_price': price}
+                position = self.positions[symbol] = Position(quantity, price + commission / quantity)
+            self.marks.set_position(symbol, position.quantity, position.entry_price)
             self.cash -= cost
+            self.cost_basis += cost
+            self.performance.record_fill(price * quantity)
             logging.info(f"[SIM] Bought {quantity} shares of {symbol} at {price}, Cost: {cost:.2f}, Cash: {self.cash:.2f}")
-        else:
-            logging.warning(f"Insufficient cash to buy {quantity} shares of {symbol}")
-
-    def sell(self, symbol, price, quantity):
-        if symbol in self.positions and self.positions[symbol]['quantity'] >= quantity:
-            position = self.positions[symbol]
-            entry_price = position['entry_price']
-            profit_loss = (price - entry_price) * quantity
-            self.cash += price * quantity
-            self.realized_gains_losses.append(profit_loss)
-            position['quantity'] -= quantity
-            if position['quantity'] == 0:
+            return True
+        logging.warning(f"Insufficient cash to buy {quantity} shares of {symbol}")
+        return False
+
+    def sell(self, symbol, price, quantity, commission=0.0):
+        position = self.positions.get(symbol)
+        if position and position.quantity >= quantity:
+            entry_price = position.entry_price
+            profit_loss = (price - entry_price) * quantity - commission
+            self.cash += price * quantity - commission
+            self.realized_pnl += profit_loss
+            if self.trade_log is not None:
+                self.trade_log.append((symbol, quantity, entry_price, price, profit_loss))
+            self.performance.record_fill(price * quantity)
+            self.performance.record_trade(profit_loss)
+            position.quantity -= quantity
+            if position.quantity == 0:
                 del self.positions[symbol]
+            self.marks.set_position(symbol, position.quantity, entry_price)
+            # Reset when flat so rounding never accumulates across sessions
+            self.cost_basis = self.cost_basis - entry_price * quantity if self.positions else 0.0
             logging.info(f"[SIM] Sold {quantity} shares of {symbol} at {price}, P/L: {profit_loss:.2f}, Cash: {self.cash:.2f}")
-        else:
-            logging.warning(f"No/insufficient position to sell {quantity} shares of {symbol}")
+            return True
+        logging.warning(f"No/insufficient position to sell {quantity} shares of {symbol}")
+        return False
 
     def get_position(self, symbol):
         return self.positions.get(symbol)
 
+    def book_value(self):
+        return self.cost_basis
+
+    def update_prices(self, updates):
+        """Take the last price of each open position from (symbol, close, ...) chart updates."""
+        self.marks.update_prices(updates)
+
+    def mark(self):
+        return self.marks.mark()
+
+    def equity(self):
+        return self.cash + self.marks.mark().market_value
+
     def report_gains_losses(self):
-        total_gains_losses = sum(self.realized_gains_losses)
-        logging.info(f"[Portfolio Report] Total Realized Gains/Losses: {total_gains_losses:.2f}, Cash: {self.cash:.2f}")
+        marks = self.mark()
+        equity = self.cash + marks.market_value
+        self.performance.update_equity(equity, marks.gross_exposure)
+        metrics = self.performance.report()
+        logging.info(f"[Portfolio Report] Total Realized Gains/Losses: {self.realized_pnl:.2f}, Cash: {self.cash:.2f}")
+        logging.info(f"[Portfolio Report] Equity: {equity:.2f}, Unrealized P/L: {marks.unrealized_pnl:.2f} "
+                     f"across {len(marks.quantity)} positions, Gross Exposure: {marks.gross_exposure:.2f}, "
+                     f"Net Exposure: {marks.net_exposure:.2f}")
+        logging.info(f"[Portfolio Report] Trades: {metrics['trades']} ({metrics['wins']} won, {metrics['losses']} lost), Win Rate: {metrics['win_rate']:.2%}, "
+                     f"Profit Factor: {metrics['profit_factor']:.2f}, Sharpe: {metrics['sharpe']:.2f}, "
+                     f"Sortino: {metrics['sortino']:.2f}, Max Drawdown: {metrics['max_drawdown']:.2%} "
+                     f"({metrics['max_drawdown_duration']} reports), Exposure: {metrics['exposure']:.2%}, "
+                     f"Turnover: {metrics['turnover']:.2f}")
@@ -0,0 +1,136 @@
+import numpy as np
+from domain.entities.indicators import Indicators
+
+class StrategyParameters:
+    def __init__(self, sma_short=10, sma_long=20, rsi_threshold=70, bollinger_width=0.1, volume_lookback=6, macd_lookback=3):
+        self.sma_short = sma_short
+        self.sma_long = sma_long
+        self.rsi_threshold = rsi_threshold
+        self.bollinger_width = bollinger_width
+        self.volume_lookback = volume_lookback
+        self.macd_lookback = macd_lookback
+
+    def as_dict(self):
+        return {
+            'sma_short': self.sma_short,
+            'sma_long': self.sma_long,
+            'rsi_threshold': self.rsi_threshold,
+            'bollinger_width': self.bollinger_width,
+            'volume_lookback': self.volume_lookback,
+            'macd_lookback': self.macd_lookback
+        }
+
+    def key(self):
+        return tuple(self.as_dict().values())
+
+    def create_indicators(self):
+        return Indicators(
+            sma_short=self.sma_short,
+            sma_long=self.sma_long,
+            volume_lookback=self.volume_lookback,
+            macd_lookback=self.macd_lookback
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, StrategyParameters) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value}" for name, value in self.as_dict().items())
+        return f"StrategyParameters({fields})"
+
+def has_macd_crossover(macdhistory, direction="above", lookback=3):
+    if len(macdhistory) < 2:
+        return False
+    for i in range(1, min(lookback + 1, len(macdhistory))):
+        prev_macd, prev_signal = macdhistory[-i-1]
+        curr_macd, curr_signal = macdhistory[-i]
+        if direction == "above" and prev_macd <= prev_signal and curr_macd > curr_signal:
+            return True
+        elif direction == "below" and prev_macd >= prev_signal and curr_macd < curr_signal:
+            return True
+    return False
+
+def evaluate_signal(ind, params):
+    """
+    Determine trading action for one symbol's latest indicator histories.
+
+    Args:
+        ind (dict): Indicator histories for the symbol, as kept by Indicators.indicators.
+        params (StrategyParameters): Strategy thresholds.
+
+    Returns:
+        str: "buy", "sell", or "hold"
+    """
+    if not ind or len(ind['ma_short_history']) < 2:
+        return "hold"
+
+    ma_short_prev = ind['ma_short_history'][-2]
+    ma_long_prev = ind['ma_long_history'][-2]
+    ma_short_current = ind['ma_short_history'][-1]
+    ma_long_current = ind['ma_long_history'][-1]
+    ma_cross_up = ma_short_prev <= ma_long_prev and ma_short_current > ma_long_current
+    ma_cross_down = ma_short_prev >= ma_long_prev and ma_short_current < ma_long_current
+
+    rsi = ind['rsi_history'][-1] if ind['rsi_history'] else None
+    rsi_buy = rsi is not None and rsi < params.rsi_threshold
+    rsi_sell = rsi is not None and rsi > params.rsi_threshold
+
+    macd_history = ind['macd_history']
+    macd_buy = has_macd_crossover(macd_history, "above", params.macd_lookback)
+    macd_sell = has_macd_crossover(macd_history, "below", params.macd_lookback)
+
+    bollinger = ind['bollinger_history'][-1] if ind['bollinger_history'] else (None, None, None)
+    bollinger_condition = False
+    if bollinger[0] is not None:
+        upper, middle, lower = bollinger
+        band_width = (upper - lower) / middle
+        bollinger_condition = band_width < params.bollinger_width
+
+    volume_history = ind['volume_history']
+    volume_condition = False
+    if len(volume_history) >= params.volume_lookback:
+        current_volume = volume_history[-1]
+        volume_condition = all(current_volume > v for v in volume_history[-params.volume_lookback:-1])
+
+    if ma_cross_up and rsi_buy and macd_buy and bollinger_condition and volume_condition:
+        return "buy"
+    if ma_cross_down and rsi_sell and macd_sell and bollinger_condition:
+        return "sell"
+    return "hold"
+
+def signal_arrays(series, params):
+    """
+    Vectorized form of evaluate_signal over every finalized hourly bar.
+
+    Args:
+        series (SeriesCache): Indicator series for one symbol.
+        params (StrategyParameters): Strategy thresholds.
+
+    Returns:
+        tuple: (numpy.ndarray, numpy.ndarray) - Boolean buy and sell masks, one entry per hourly bar.
+    """
+    ma_short = series.sma(params.sma_short)
+    ma_long = series.sma(params.sma_long)
+    valid = ~(np.isnan(ma_short) | np.isnan(ma_long))
+    ma_cross_up = np.zeros(len(valid), dtype=bool)
+    ma_cross_down = np.zeros(len(valid), dtype=bool)
+    both = valid[1:] & valid[:-1]
+    ma_cross_up[1:] = both & (ma_short[:-1] <= ma_long[:-1]) & (ma_short[1:] > ma_long[1:])
+    ma_cross_down[1:] = both & (ma_short[:-1] >= ma_long[:-1]) & (ma_short[1:] < ma_long[1:])
+
+    rsi = series.rsi(14)
+    with np.errstate(invalid='ignore'):
+        rsi_buy = rsi < params.rsi_threshold
+        rsi_sell = rsi > params.rsi_threshold
+        bollinger_condition = series.bollinger_width(20, 2) < params.bollinger_width
+
+    macd_buy = series.macd_crossover("above", params.macd_lookback)
+    macd_sell = series.macd_crossover("below", params.macd_lookback)
+    volume_condition = series.volume_breakout(params.volume_lookback)
+
+    buy = ma_cross_up & rsi_buy & macd_buy & bollinger_condition & volume_condition
+    sell = ma_cross_down & rsi_sell & macd_sell & bollinger_condition
+    return buy, sell
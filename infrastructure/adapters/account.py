@@ -1,11 +1,12 @@
 import logging
+from infrastructure.adapters.rate_limiter import rate_limited
 
 def fetch_account_hash(client, simulate):
     """
     Retrieves the account hash for real trading if simulation is disabled.
 
     Args:
-        client (schwabdev.Client): Initialized Schwab API client object.
+        client (schwabdev.Client): Initialized Schwab API client object; calls take the shared rate limiter's account lane.
         simulate (bool): Flag indicating if trading is in simulation mode.
 
     Returns:
@@ -19,6 +20,7 @@ def fetch_account_hash(client, simulate):
         logging.error("Client object is None; cannot fetch account hash")
         return False, None
     
+    client = rate_limited(client)
     try:
         response = client.account_linked()
         if not response.ok:
@@ -43,7 +45,7 @@ def request_account_details(client, account_hash):
     Fetches detailed account information from Schwab for the specified account.
 
     Args:
-        client (schwabdev.Client): Initialized Schwab API client object.
+        client (schwabdev.Client): Initialized Schwab API client object; calls take the shared rate limiter's account lane.
         account_hash (str): Hash of the account to query.
 
     Returns:
@@ -57,6 +59,7 @@ def request_account_details(client, account_hash):
         logging.error("Invalid or missing account hash")
         return False, None
     
+    client = rate_limited(client)
     try:
         response = client.account_details(account_hash)
         if not response.ok:
@@ -80,7 +83,7 @@ def request_account_positions(client, account_hash):
     Retrieves current positions (e.g., stock holdings) for the Schwab account.
 
     Args:
-        client (schwabdev.Client): Initialized Schwab API client object.
+        client (schwabdev.Client): Initialized Schwab API client object; calls take the shared rate limiter's account lane.
         account_hash (str): Hash of the account to query.
 
     Returns:
@@ -94,6 +97,7 @@ def request_account_positions(client, account_hash):
         logging.error("Invalid or missing account hash")
         return False, None
     
+    client = rate_limited(client)
     try:
         response = client.account_positions(account_hash)
         if not response.ok:
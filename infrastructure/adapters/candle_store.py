@@ -0,0 +1,75 @@
+import os
+import json
+import logging
+import numpy as np
+
+CANDLE_FIELDS = ("datetime", "open", "high", "low", "close", "volume")
+DATETIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(CANDLE_FIELDS))
+
+def candle_cache_path(data_path, symbol, cache_dir=None):
+    """
+    Returns the path of the binary candle cache for a symbol.
+
+    Args:
+        data_path (str): Directory holding the <symbol>.json candle files.
+        symbol (str): Stock symbol.
+        cache_dir (str, optional): Directory for .npy caches. Defaults to <data_path>/npy_cache.
+
+    Returns:
+        str: Path of the symbol's .npy cache file.
+    """
+    return os.path.join(cache_dir or os.path.join(data_path, "npy_cache"), f"{symbol}.npy")
+
+def build_candle_cache(data_path, symbol, cache_dir=None):
+    """
+    Converts a symbol's JSON candles into a float64 (n, 6) .npy array, once.
+
+    The cache is rebuilt only when the JSON file is newer than it.
+
+    Args:
+        data_path (str): Directory holding the <symbol>.json candle files.
+        symbol (str): Stock symbol.
+        cache_dir (str, optional): Directory for .npy caches.
+
+    Returns:
+        str or None: Path of the cache file, or None if the JSON is missing or invalid.
+    """
+    json_path = os.path.join(data_path, f"{symbol}.json")
+    cache_path = candle_cache_path(data_path, symbol, cache_dir)
+    if not os.path.exists(json_path):
+        logging.error(f"Data file for {symbol} not found at {json_path}")
+        return None
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(json_path):
+        return cache_path
+    try:
+        with open(json_path, 'r') as f:
+            candles = json.load(f)
+    except json.JSONDecodeError:
+        logging.error(f"Invalid JSON in {symbol}.json")
+        return None
+    array = np.array([[candle[field] for field in CANDLE_FIELDS] for candle in candles], dtype=np.float64).reshape(-1, len(CANDLE_FIELDS))
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    # Write to a temporary file first so concurrent readers never map a partial array
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(temp_path, cache_path)
+    logging.info(f"Cached {len(array)} candles for {symbol} at {cache_path}")
+    return cache_path
+
+def load_candles(data_path, symbol, cache_dir=None):
+    """
+    Memory-maps a symbol's candle array read-only, building the cache if needed.
+
+    Args:
+        data_path (str): Directory holding the <symbol>.json candle files.
+        symbol (str): Stock symbol.
+        cache_dir (str, optional): Directory for .npy caches.
+
+    Returns:
+        numpy.ndarray or None: Read-only (n, 6) array with columns CANDLE_FIELDS, or None if unavailable.
+    """
+    cache_path = build_candle_cache(data_path, symbol, cache_dir)
+    if cache_path is None:
+        return None
+    return np.load(cache_path, mmap_mode='r')
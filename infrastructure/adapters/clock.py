@@ -0,0 +1,109 @@
+import datetime
+import threading
+import time
+import zoneinfo
+
+class RealClock:
+    """Wall-clock time for live trading."""
+    realtime = True
+    seeded = True
+
+    def time(self):
+        return time.time()
+
+    def now(self, tz=None):
+        return datetime.datetime.now(tz)
+
+    def advance_to(self, timestamp):
+        """Real time follows the wall clock; stream timestamps are ignored."""
+        pass
+
+class VirtualClock:
+    """
+    Simulated time that only moves when told to, so replays run at CPU speed.
+
+    Time moves when the bot consumes the next replayed event (advance_to).
+    Without a start time the clock is unseeded and reads 0 until the first
+    advance_to sets it, so a replay starts at its first recorded timestamp.
+    """
+    realtime = False
+
+    def __init__(self, start=None):
+        self._now = float(start) if start is not None else 0.0
+        self.seeded = start is not None
+        self._lock = threading.Lock()
+
+    def time(self):
+        return self._now
+
+    def now(self, tz=None):
+        return datetime.datetime.fromtimestamp(self._now, tz)
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += seconds
+
+    def advance_to(self, timestamp):
+        """Move time forward to the given epoch seconds; never moves backwards."""
+        with self._lock:
+            if timestamp > self._now or not self.seeded:
+                self._now = float(timestamp)
+                self.seeded = True
+
+class Scheduler:
+    """
+    Periodic timers evaluated against an injectable clock.
+
+    Timers registered before a virtual clock is seeded are anchored to the
+    time it is seeded with, so they do not all come due on the first event.
+    """
+    def __init__(self, clock):
+        self.clock = clock
+        self.tasks = []
+
+    def call_every(self, interval, callback):
+        """
+        Register a callback to run every interval seconds of clock time.
+
+        Args:
+            interval (float): Seconds between runs.
+            callback (callable): Function called with no arguments.
+
+        Returns:
+            dict: The task record, which can be passed to cancel().
+        """
+        task = {'interval': interval, 'callback': callback, 'deadline': None}
+        self._anchor(task)
+        self.tasks.append(task)
+        return task
+
+    def _anchor(self, task):
+        if task['deadline'] is None and self.clock.seeded:
+            task['deadline'] = self.clock.time() + task['interval']
+
+    def cancel(self, task):
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def next_deadline(self):
+        for task in self.tasks:
+            self._anchor(task)
+        return min((task['deadline'] for task in self.tasks if task['deadline'] is not None), default=None)
+
+    def run_pending(self):
+        """Run every task whose deadline has passed and reschedule it one interval from now."""
+        now = self.clock.time()
+        for task in list(self.tasks):
+            self._anchor(task)
+            if task['deadline'] is not None and now >= task['deadline']:
+                task['callback']()
+                task['deadline'] = now + task['interval']
+
+class MarketHours:
+    """Session window used to start and stop the live streamer."""
+    def __init__(self, start_time=datetime.time(9, 29, 0), stop_time=datetime.time(16, 0, 0), on_days=(0, 1, 2, 3, 4), timezone=zoneinfo.ZoneInfo("America/New_York")):
+        self.start_time = start_time
+        self.stop_time = stop_time
+        self.on_days = on_days
+        self.timezone = timezone
+
@@ -1,11 +1,12 @@
 import logging
+from infrastructure.adapters.rate_limiter import rate_limited
 
 def load_initial_historical_data(client, symbols, indicators):
     """
     Fetches initial historical minute-level data for a list of symbols and updates the indicators object.
 
     Args:
-        client (schwabdev.Client): Schwab API client object for fetching historical data.
+        client (schwabdev.Client): Schwab API client object for fetching historical data; requests take the shared rate limiter's history lane.
         symbols (list): List of stock symbols (e.g., ["TSLA", "AAPL"]) to fetch data for.
         indicators (Indicators): Instance of Indicators class to update with historical data.
 
@@ -16,6 +17,7 @@ def load_initial_historical_data(client, symbols, indicators):
         logging.info("No symbols provided for historical data loading")
         return True  # Nothing to do, but not an error
 
+    client = rate_limited(client)
     success = True
     for symbol in symbols:
         try:
@@ -0,0 +1,175 @@
+import threading
+import time
+
+# Lanes in priority order: a waiting request is never passed by one from a later lane
+ORDERS = "orders"
+ACCOUNT = "account"
+HISTORY = "history"
+BULK = "bulk"
+LANES = (ORDERS, ACCOUNT, HISTORY, BULK)
+
+# Lane of every rate-limited Client method; other attributes are passed through unthrottled
+METHOD_LANES = {
+    'order_place': ORDERS,
+    'order_details': ORDERS,
+    'order_cancel': ORDERS,
+    'order_replace': ORDERS,
+    'account_orders': ORDERS,
+    'account_orders_all': ORDERS,
+    'account_linked': ACCOUNT,
+    'account_details': ACCOUNT,
+    'account_details_all': ACCOUNT,
+    'account_positions': ACCOUNT,
+    'preferences': ACCOUNT,
+    'transactions': ACCOUNT,
+    'transaction_details': ACCOUNT,
+    'price_history': HISTORY,
+    'quotes': HISTORY,
+    'quote': HISTORY,
+    'movers': HISTORY,
+    'instruments': HISTORY,
+    'instrument_cusip': HISTORY,
+    'market_hour': HISTORY,
+    'market_hours': HISTORY,
+    'option_chains': HISTORY,
+    'option_expiration_chain': HISTORY,
+}
+
+class PriorityRateLimiter:
+    def __init__(self, rate=2.0, burst=10, order_reserve=1):
+        """
+        Token bucket shared by every API call, handed out to waiting requests in lane priority.
+
+        When several requests wait for a token, the next token goes to the
+        earliest lane (orders, then account queries, then history warm-up,
+        then bulk collection), in arrival order within a lane. Requests
+        outside the orders lane also leave order_reserve tokens in the
+        bucket, so an order placed in the middle of a warm-up burst finds a
+        token waiting instead of queueing behind the burst. The reserve only
+        shifts when tokens are spent, not how many: every lane together
+        still uses the full rate.
+
+        Args:
+            rate (float): Requests per second across all lanes. Schwab allows 120 per minute.
+            burst (int): Tokens the bucket holds, i.e. requests that may be made back to back.
+            order_reserve (int): Tokens only the orders lane may take.
+        """
+        if burst < order_reserve + 1:
+            raise ValueError("burst must exceed order_reserve")
+        self.rate = rate
+        self.burst = burst
+        self.order_reserve = order_reserve
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.condition = threading.Condition()
+        self.waiting = {lane: [] for lane in LANES}  # lane -> tickets in arrival order
+        self.tickets = 0
+        self.granted = {lane: 0 for lane in LANES}
+        self.waited = {lane: 0.0 for lane in LANES}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _first(self, lane):
+        """Whether the ticket at the head of lane is the next request to be served."""
+        for earlier in LANES:
+            if earlier == lane:
+                return True
+            if self.waiting[earlier]:
+                return False
+        return True
+
+    def acquire(self, lane=HISTORY):
+        """
+        Block until a request in the given lane may be made.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        if lane not in self.waiting:
+            raise ValueError(f"Unknown rate limiter lane: {lane}")
+        floor = 1.0 if lane == ORDERS else 1.0 + self.order_reserve
+        started = time.monotonic()
+        with self.condition:
+            self.tickets += 1
+            ticket = self.tickets
+            queue = self.waiting[lane]
+            queue.append(ticket)
+            try:
+                while True:
+                    self._refill()
+                    if queue[0] == ticket and self._first(lane) and self.tokens >= floor:
+                        self.tokens -= 1
+                        break
+                    # Sleep until enough tokens should have accrued; an earlier grant wakes everyone
+                    self.condition.wait(max((floor - self.tokens) / self.rate, 0.001))
+            finally:
+                queue.remove(ticket)
+                self.condition.notify_all()
+            waited = time.monotonic() - started
+            self.granted[lane] += 1
+            self.waited[lane] += waited
+        return waited
+
+    def stats(self):
+        with self.condition:
+            return {lane: {'granted': self.granted[lane], 'waiting': len(self.waiting[lane]), 'waited_s': self.waited[lane]}
+                    for lane in LANES}
+
+class RateLimitedClient:
+    def __init__(self, client, limiter, lanes=None):
+        """
+        Wrap a schwabdev Client so each API call first takes a token from the limiter in its lane.
+
+        Args:
+            client: The Client (or a stand-in with the same methods) to wrap.
+            limiter (PriorityRateLimiter): Limiter shared with every other client in the process.
+            lanes (dict, optional): Method name -> lane overrides of METHOD_LANES, e.g.
+                {'price_history': BULK} for data collection.
+        """
+        self.client = client
+        self.limiter = limiter
+        self.lanes = dict(METHOD_LANES, **(lanes or {}))
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        lane = self.lanes.get(name)
+        if lane is None or not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            self.limiter.acquire(lane)
+            return attribute(*args, **kwargs)
+        return call
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_limiter():
+    """The process-wide limiter, created on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PriorityRateLimiter()
+        return _shared
+
+def rate_limited(client, lanes=None, limiter=None):
+    """
+    Wrap a client in the process-wide limiter (or the given one); a client that is already wrapped is returned as-is.
+
+    Args:
+        client: Client to wrap.
+        lanes (dict, optional): Method name -> lane overrides.
+        limiter (PriorityRateLimiter, optional): Defaults to shared_limiter().
+
+    Returns:
+        RateLimitedClient: The rate-limited client.
+    """
+    if isinstance(client, RateLimitedClient) and not lanes:
+        return client
+    if isinstance(client, RateLimitedClient):
+        limiter = limiter or client.limiter
+        client = client.client
+    return RateLimitedClient(client, limiter or shared_limiter(), lanes)
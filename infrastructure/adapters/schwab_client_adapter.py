@@ -2,6 +2,7 @@ import os
 import logging
 from dotenv import load_dotenv
 from schwabdev import Client
+from infrastructure.adapters.rate_limiter import rate_limited
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -9,7 +10,9 @@ class SchwabClientAdapter:
     def __init__(self):
         """
         Initialize the SchwabClientAdapter with API credentials and fetch account hashes.
-        
+
+        API calls go through the process-wide rate limiter shared with the trading bot.
+
         Raises:
             ValueError: If required environment variables are missing.
         """
@@ -18,7 +21,7 @@ class SchwabClientAdapter:
         callback_url = os.getenv('callback_url')
         if not all([app_key, app_secret, callback_url]):
             raise ValueError("Missing required environment variables: app_key, app_secret, or callback_url")
-        self.client = Client(app_key, app_secret, callback_url)
+        self.client = rate_limited(Client(app_key, app_secret, callback_url))
         self.account_hashes = self._fetch_account_hashes()
         logging.info("SchwabClientAdapter initialized")
 
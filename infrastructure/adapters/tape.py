@@ -0,0 +1,236 @@
+import logging
+import queue
+import threading
+import time
+import zlib
+
+MAGIC = b"STAPE1\n"
+CHUNK_SIZE = 1 << 16
+
+def encode_varint(value, out):
+    """Append a non-negative integer to a bytearray as an unsigned LEB128 varint."""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varint(buffer, position):
+    """
+    Read a varint from buffer at position.
+
+    Returns:
+        tuple: (value, next position), or (None, position) if the buffer ends mid-varint.
+    """
+    value = 0
+    shift = 0
+    while position < len(buffer):
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+    return None, position
+
+class TapeRecorder:
+    def __init__(self, path, flush_interval=1.0):
+        """
+        Append raw stream messages with their receive time to a compact tape file.
+
+        The tape is the magic line followed by one zlib stream of records per
+        recording session: a varint receive-time delta in microseconds from
+        the previous record (the session's first is relative to the epoch), a
+        varint payload length and the UTF-8 payload. Receive times come from a
+        monotonic clock anchored to the wall clock when recording starts, so a
+        wall-clock step cannot skew them; an explicit time earlier than the
+        previous record is stored with a zero delta without moving the base.
+        Compression across records captures the repetition between
+        consecutive stream messages.
+        Encoding and writing happen on a background thread; the stream is
+        sync-flushed every flush_interval seconds, so a crash loses at most
+        that much of the session.
+
+        Args:
+            path (str): Tape file, appended to if it exists.
+            flush_interval (float): Seconds between flushes to disk.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pending = queue.SimpleQueue()
+        self.closed = False
+        self.recorded = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.epoch_ns = time.time_ns() - time.monotonic_ns()
+        self.thread = threading.Thread(target=self._write, name="TapeRecorder", daemon=True)
+        self.thread.start()
+
+    def record(self, message, received_ns=None):
+        """Queue a raw message; never blocks. Ignored after close()."""
+        if not self.closed:
+            self.pending.put((self.epoch_ns + time.monotonic_ns() if received_ns is None else received_ns, message))
+
+    def _write(self):
+        compressor = zlib.compressobj(level=6)
+        previous_us = 0
+        dirty = False
+        next_flush = time.monotonic() + self.flush_interval
+        with open(self.path, "ab") as f:
+            if f.tell() == 0:
+                f.write(MAGIC)
+            while True:
+                try:
+                    item = self.pending.get(timeout=max(0.0, next_flush - time.monotonic()))
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if item:
+                    received_ns, message = item
+                    payload = message.encode("utf-8") if isinstance(message, str) else bytes(message)
+                    received_us = received_ns // 1000
+                    record = bytearray()
+                    encode_varint(max(0, received_us - previous_us), record)
+                    encode_varint(len(payload), record)
+                    record += payload
+                    # Only move forward, so replayed times stay anchored to the recording
+                    previous_us = max(previous_us, received_us)
+                    self.bytes_in += len(record)
+                    self.bytes_out += f.write(compressor.compress(bytes(record)))
+                    self.recorded += 1
+                    dirty = True
+                if time.monotonic() >= next_flush:
+                    if dirty:
+                        self.bytes_out += f.write(compressor.flush(zlib.Z_SYNC_FLUSH))
+                        f.flush()
+                        dirty = False
+                    next_flush = time.monotonic() + self.flush_interval
+            self.bytes_out += f.write(compressor.flush(zlib.Z_FINISH))
+
+    def close(self):
+        """Write everything queued so far and finish the tape."""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.thread.join()
+
+    def stats(self):
+        return {'recorded': self.recorded, 'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out}
+
+def read_tape(path):
+    """
+    Yield (received_ns, message) for every complete record of a tape.
+
+    Sessions appended to the same file are read in order. A truncated tail,
+    e.g. from a crash, ends the tape at the last complete record.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a stream tape")
+        decompressor = zlib.decompressobj()
+        buffer = bytearray()
+        position = 0
+        received_us = 0
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            while chunk:
+                try:
+                    buffer += decompressor.decompress(chunk)
+                except zlib.error as e:
+                    logging.error(f"Tape {path} is corrupt: {e}")
+                    return
+                chunk = decompressor.unused_data
+                while True:
+                    delta, start = decode_varint(buffer, position)
+                    if delta is None:
+                        break
+                    length, start = decode_varint(buffer, start)
+                    if length is None or start + length > len(buffer):
+                        break
+                    received_us += delta
+                    yield received_us * 1000, buffer[start:start + length].decode("utf-8")
+                    position = start + length
+                del buffer[:position]
+                position = 0
+                if decompressor.eof:
+                    # The next appended session restarts its time deltas from the epoch
+                    decompressor = zlib.decompressobj()
+                    buffer.clear()
+                    received_us = 0
+
+class TapeReplayer:
+    """
+    Streamer stand-in that feeds a recorded tape to a receiver, e.g. TradingBot.response_handler.
+
+    Subscription requests are recorded but do not filter the tape, which
+    already holds exactly what the recorded session received.
+    """
+    def __init__(self, path, speed=1.0):
+        """
+        Args:
+            path (str): Tape file written by TapeRecorder.
+            speed (float or None): Replay speed relative to the recording; None replays as fast as possible.
+        """
+        self.path = path
+        self.speed = speed
+        self.subscriptions = {}
+        self.active = False
+        self.thread = None
+        self.replayed = 0
+
+    def replay(self, receiver):
+        """Feed the tape to receiver on the calling thread, paced by the original receive times."""
+        self.active = True
+        self._replay(receiver)
+
+    def _replay(self, receiver):
+        first_ns = None
+        started = time.perf_counter()
+        for received_ns, message in read_tape(self.path):
+            if not self.active:
+                break
+            if self.speed:
+                if first_ns is None:
+                    first_ns = received_ns
+                delay = started + (received_ns - first_ns) / 1e9 / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            receiver(message)
+            self.replayed += 1
+        self.active = False
+
+    def start(self, receiver, daemon=True):
+        self.active = True
+        self.thread = threading.Thread(target=self._replay, args=(receiver,), name="TapeReplayer", daemon=daemon)
+        self.thread.start()
+
+    def start_auto(self, receiver, daemon=True, **kwargs):
+        """Market-hours arguments are ignored; the tape already spans the recorded session."""
+        self.start(receiver, daemon)
+
+    def stop(self):
+        self.active = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def send(self, requests):
+        if not isinstance(requests, list):
+            requests = [requests]
+        for request in requests:
+            service = request.get("service")
+            keys = request.get("parameters", {}).get("keys", "").split(",")
+            subscribed = self.subscriptions.setdefault(service, {})
+            if request.get("command") == "UNSUBS":
+                for key in keys:
+                    subscribed.pop(key, None)
+            else:
+                subscribed.update({key: request["parameters"].get("fields", "").split(",") for key in keys if key})
+
+    def chart_equity(self, keys, fields, command="ADD"):
+        return {"service": "CHART_EQUITY", "command": command, "parameters": {"keys": keys, "fields": fields}}
+
+    def screener_equity(self, keys, fields, command="ADD"):
+        return {"service": "SCREENER_EQUITY", "command": command, "parameters": {"keys": keys, "fields": fields}}
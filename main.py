@@ -5,10 +5,10 @@ import json
 import zoneinfo
 import datetime
 from dotenv import load_dotenv
-from time import sleep
 from time import time
 from collections import deque
 import math
+from application.message_queue import MessageQueue
 
 # Define the Indicators class
 class Indicators:
@@ -201,8 +201,9 @@ class Indicators:
 # Initialize Indicators class
 indicators = Indicators()
 
-# Shared list for streamer messages
-shared_list = []
+# Bounded queue for streamer messages; the main loop blocks on it instead of polling.
+# When full it sheds (oldest screener first) so the websocket receive thread never blocks.
+message_queue = MessageQueue(maxsize=10000, overflow="shed")
 
 class Portfolio:
     def __init__(self, initial_cash=100000.0):
@@ -251,8 +252,8 @@ class Portfolio:
         logging.info(f"[Portfolio Report] Total Realized Gains/Losses: {total_gains_losses:.2f}, Cash: {self.cash:.2f}")
 
 def response_handler(message):
-    """Append incoming streamer messages to the shared list."""
-    shared_list.append(message)
+    """Enqueue incoming streamer messages for the main loop without blocking the receive thread."""
+    message_queue.put(message)
 
 def has_macd_crossover(macdhistory, direction="above"):
     """
@@ -564,35 +565,39 @@ def main():
     last_report_time = time()
 
     while True:
-        while len(shared_list) > 0:
-            message = json.loads(shared_list.pop(0))
-            for rtype, services in message.items():
-                match rtype:
-                    case "data":
-                        for service in services:
-                            match service:
-                                case "CHART_EQUITY":
-                                    stockTrader(service, client, simulate, portfolio, indicators)
-                                    break
-                                case "SCREENER_EQUITY":
-                                    stockScanner(service, client, simulate, portfolio, indicators)
-                                    #pass
-                                    break
-                                case _:
-                                    break
-                        break
-                    case "notify":
-                        for service in services:
-                            print(f"[Heartbeat]({datetime.datetime.fromtimestamp(int(service.get('heartbeat', 0))//1000)})")
-                        break
-                    case _:
-                        break
-                
+        # Wakes as soon as a message arrives instead of polling on a fixed sleep
+        message = message_queue.get(timeout=0.5)
+        message = json.loads(message) if message is not None else {}
+        for rtype, services in message.items():
+            match rtype:
+                case "data":
+                    for service in services:
+                        match service:
+                            case "CHART_EQUITY":
+                                stockTrader(service, client, simulate, portfolio, indicators)
+                                break
+                            case "SCREENER_EQUITY":
+                                stockScanner(service, client, simulate, portfolio, indicators)
+                                #pass
+                                break
+                            case _:
+                                break
+                    break
+                case "notify":
+                    for service in services:
+                        print(f"[Heartbeat]({datetime.datetime.fromtimestamp(int(service.get('heartbeat', 0))//1000)})")
+                    break
+                case _:
+                    break
+            
         current_time = time()
         if current_time - last_report_time >= report_interval and streamer.active:
             portfolio.report_gains_losses()
+            stats = message_queue.stats()
+            logging.info(f"[Queue Report] Depth: {stats['depth']} (max {stats['max_depth']}), Processed: {stats['dequeued']}, "
+                         f"Dropped: {stats['dropped_chart']} chart / {stats['dropped_screener']} screener, "
+                         f"Wait: {stats['mean_wait_ms']:.2f} ms mean / {stats['max_wait_ms']:.2f} ms max")
             last_report_time = current_time
-        sleep(0.5)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,8 +1,11 @@
+import bisect
+import heapq
 import json
 import os
 import threading
 import time
 import logging
+from collections import OrderedDict
 
 # Mock Response class to mimic requests.Response for price_history
 class MockResponse:
@@ -13,12 +16,81 @@ class MockResponse:
     def json(self):
         return self._data
 
+class CandleCache:
+    """
+    Size-capped LRU cache of parsed <ticker>.json candle lists, shared by price_history and the replay.
+
+    Cached lists are shared and must be treated as read-only.
+    """
+    def __init__(self, data_path, max_candles=1000000):
+        self.data_path = data_path
+        self.max_candles = max_candles  # Total candles kept before least recently used tickers are evicted
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, ticker):
+        """
+        Return a ticker's parsed candles, reading the JSON file only on a miss.
+
+        Raises:
+            FileNotFoundError: If the ticker has no data file.
+            json.JSONDecodeError: If the data file is invalid.
+        """
+        with self.lock:
+            candles = self.entries.get(ticker)
+            if candles is not None:
+                self.entries.move_to_end(ticker)
+                self.hits += 1
+                return candles
+            self.misses += 1
+        with open(os.path.join(self.data_path, f"{ticker}.json"), 'r') as f:
+            candles = json.load(f)
+        with self.lock:
+            if ticker not in self.entries:
+                self.entries[ticker] = candles
+                self.size += len(candles)
+                while self.size > self.max_candles and len(self.entries) > 1:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.size -= len(evicted)
+                    self.evictions += 1
+            return self.entries.get(ticker, candles)
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'tickers': len(self.entries), 'candles': self.size}
+
+class CandleCursor:
+    """Position of a subscribed ticker in its cached candle list."""
+    __slots__ = ('candles', 'position')
+
+    def __init__(self, candles, position=0):
+        self.candles = candles
+        self.position = position
+
 class SimulatedStream:
-    def __init__(self, data_path="./Automated_Trading_retry/Data Collection/stock_data/"):
-        """Initialize the simulated stream with the path to the data directory."""
+    def __init__(self, data_path="./Automated_Trading_retry/Data Collection/stock_data/", delay=0.1, cache=None):
+        """
+        Initialize the simulated stream with the path to the data directory.
+
+        Args:
+            data_path (str): Directory holding the <ticker>.json candle files.
+            delay (float): Seconds to wait between emitted messages.
+            cache (CandleCache, optional): Parsed candle cache, e.g. shared between streams. Defaults to a new CandleCache.
+        """
         self.data_path = data_path
+        self.delay = delay       # Seconds to wait between emitted messages
+        self.cache = cache or CandleCache(data_path)
         self.subscriptions = {}  # Tracks subscribed services and tickers: {service: {ticker: fields}}
-        self.data_iterators = {}  # Maps tickers to iterators over their candle data
+        self.data_iterators = {}  # Maps tickers to cursors into their cached candles
+        self.heads = {}          # Maps tickers to their next pending candle: {ticker: (datetime, seq, candle)}
+        self.heap = []           # Min-heap of (datetime, seq, ticker) used to merge tickers by time
+        self.seq = 0             # Tie-breaker and staleness marker for heap entries
+        self.replay_time = None  # Datetime of the last emitted candle group
+        self.lock = threading.Lock()  # Guards iterators and heap against concurrent send() calls
         self.receiver = None     # Function to receive simulated messages
         self.active = False      # Flag to control the simulation loop
         self.thread = None       # Background thread for simulation
@@ -40,40 +112,88 @@ class SimulatedStream:
         self.active = False
         if self.thread:
             self.thread.join()
-        self.logger.info("Simulated stream stopped")
+        cache = self.cache.stats()
+        self.logger.info(f"Simulated stream stopped (candle cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions)")
 
     def _simulate_stream(self):
         """Background thread loop to simulate streaming data."""
         while self.active:
-            for ticker in list(self.data_iterators.keys()):
-                try:
-                    candle = next(self.data_iterators[ticker])
-                    message = self._construct_message(ticker, candle)
-                    if self.receiver:
-                        self.receiver(json.dumps(message))
-                except StopIteration:
-                    self.logger.info(f"No more data for {ticker}, unsubscribing")
-                    del self.data_iterators[ticker]
-            time.sleep(0.1)  # Simulate real-time with a 0.1-second delay
-
-    def _construct_message(self, ticker, candle):
+            with self.lock:
+                message = self._next_message()
+            if message is None:
+                time.sleep(0.1)  # Nothing subscribed or all data exhausted; idle
+                continue
+            if self.receiver:
+                self.receiver(json.dumps(message))
+            if self.delay:
+                time.sleep(self.delay)  # Simulate real-time pacing between candle groups
+
+    def _next_message(self):
+        """
+        Pop every subscribed ticker's candle at the earliest pending datetime.
+
+        Tickers are k-way merged by candle datetime, so replay stays chronological
+        across symbols with gaps or different start times. Candles sharing a
+        timestamp are batched into a single CHART_EQUITY message, as Schwab does.
+
+        Returns:
+            dict or None: The message for the next timestamp, or None if no data is pending.
+        """
+        batch = []
+        while self.heap:
+            timestamp, seq, ticker = self.heap[0]
+            if batch and timestamp != batch[0][0]:
+                break
+            heapq.heappop(self.heap)
+            head = self.heads.get(ticker)
+            if head is None or head[1] != seq:
+                continue  # Stale entry left behind by an unsubscribe
+            batch.append((timestamp, ticker, head[2]))
+        if not batch:
+            return None
+        self.replay_time = batch[0][0]
+        for _, ticker, _ in batch:
+            self._advance(ticker)
+        return self._construct_message(self.replay_time, [(ticker, candle) for _, ticker, candle in batch])
+
+    def _advance(self, ticker):
+        """Move a ticker's head to its next candle."""
+        cursor = self.data_iterators[ticker]
+        if cursor.position < len(cursor.candles):
+            candle = cursor.candles[cursor.position]
+            cursor.position += 1
+            self.seq += 1
+            self.heads[ticker] = (candle["datetime"], self.seq, candle)
+            heapq.heappush(self.heap, (candle["datetime"], self.seq, ticker))
+            return
+        self.logger.info(f"No more data for {ticker}, unsubscribing")
+        self._remove_iterator(ticker)
+
+    def _remove_iterator(self, ticker):
+        """Drop a ticker from the replay; its heap entry is discarded lazily."""
+        self.data_iterators.pop(ticker, None)
+        self.heads.pop(ticker, None)
+
+    def _construct_message(self, timestamp, candles):
         """Construct a message mimicking Schwab's CHART_EQUITY stream format."""
-        content = {
-            "key": ticker,
-            "1": candle["open"],
-            "2": candle["high"],
-            "3": candle["low"],
-            "4": candle["close"],
-            "5": candle["volume"],
-            "7": candle["datetime"]
-        }
+        contents = []
+        for ticker, candle in candles:
+            contents.append({
+                "key": ticker,
+                "1": candle["open"],
+                "2": candle["high"],
+                "3": candle["low"],
+                "4": candle["close"],
+                "5": candle["volume"],
+                "7": candle["datetime"]
+            })
         message = {
             "data": [
                 {
                     "service": "CHART_EQUITY",
-                    "timestamp": candle["datetime"],
+                    "timestamp": timestamp,
                     "command": "SUBS",
-                    "content": [content]
+                    "content": contents
                 }
             ]
         }
@@ -88,30 +208,35 @@ class SimulatedStream:
             service = request.get("service")
             command = request.get("command")
             if service == "CHART_EQUITY":
-                if command in ["ADD", "SUBS"]:
-                    keys = request["parameters"]["keys"].split(",")
-                    for ticker in keys:
-                        if ticker not in self.data_iterators:
-                            self._start_iterator(ticker)
-                elif command == "UNSUBS":
-                    keys = request["parameters"]["keys"].split(",")
-                    for ticker in keys:
-                        if ticker in self.data_iterators:
-                            del self.data_iterators[ticker]
+                with self.lock:
+                    if command in ["ADD", "SUBS"]:
+                        keys = request["parameters"]["keys"].split(",")
+                        for ticker in keys:
+                            if ticker not in self.data_iterators:
+                                self._start_iterator(ticker)
+                    elif command == "UNSUBS":
+                        keys = request["parameters"]["keys"].split(",")
+                        for ticker in keys:
+                            if ticker in self.data_iterators:
+                                self._remove_iterator(ticker)
 
     def _start_iterator(self, ticker):
-        """Load candle data for a ticker and start an iterator."""
-        file_path = os.path.join(self.data_path, f"{ticker}.json")
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    candles = json.load(f)
-                self.data_iterators[ticker] = iter(candles)
-                self.logger.info(f"Started iterator for {ticker}")
-            except json.JSONDecodeError:
-                self.logger.error(f"Invalid JSON in {ticker}.json")
-        else:
-            self.logger.error(f"Data file for {ticker} not found at {file_path}")
+        """Start a cursor into a ticker's cached candles."""
+        try:
+            candles = self.cache.get(ticker)
+        except FileNotFoundError:
+            self.logger.error(f"Data file for {ticker} not found at {os.path.join(self.data_path, f'{ticker}.json')}")
+            return
+        except json.JSONDecodeError:
+            self.logger.error(f"Invalid JSON in {ticker}.json")
+            return
+        position = 0
+        if self.replay_time is not None:
+            # Late subscription: start after the current replay time like a live stream
+            position = bisect.bisect_right(candles, self.replay_time, key=lambda candle: candle["datetime"])
+        self.data_iterators[ticker] = CandleCursor(candles, position)
+        self._advance(ticker)
+        self.logger.info(f"Started iterator for {ticker}")
 
     def chart_equity(self, keys, fields, command="ADD"):
         """Create a CHART_EQUITY subscription request dictionary."""
@@ -124,18 +249,26 @@ class SimulatedStream:
             }
         }
 
+    def screener_equity(self, keys, fields, command="ADD"):
+        """Create a SCREENER_EQUITY subscription request dictionary (recorded, but not simulated)."""
+        return {
+            "service": "SCREENER_EQUITY",
+            "command": command,
+            "parameters": {
+                "keys": keys,
+                "fields": fields
+            }
+        }
+
     def price_history(self, symbol, **kwargs):
-        """Retrieve historical data for a symbol from its JSON file."""
-        file_path = os.path.join(self.data_path, f"{symbol}.json")
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    candles = json.load(f)
-                return MockResponse(True, {"candles": candles})
-            except json.JSONDecodeError:
-                return MockResponse(False, {"error": "Invalid JSON format"})
-        else:
+        """Retrieve historical data for a symbol from the candle cache."""
+        try:
+            candles = self.cache.get(symbol)
+        except FileNotFoundError:
             return MockResponse(False, {"error": f"Data not found for {symbol}"})
+        except json.JSONDecodeError:
+            return MockResponse(False, {"error": "Invalid JSON format"})
+        return MockResponse(True, {"candles": list(candles)})  # Copy so callers cannot reorder the shared list
 
     def _record_request(self, request):
         """Update the subscriptions dictionary based on the request."""
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import websockets
+from websockets.asyncio.server import serve
+from infrastructure.adapters.tape import read_tape
+from tests.SimulatedStream import CandleCache, MockResponse, SimulatedStream
+
+class LocalTokens:
+    access_token = "local-access-token"
+
+class LocalStreamerClient:
+    """
+    Minimal schwabdev.Client stand-in pointing a real schwabdev Stream at a SimulatedStreamServer.
+
+    price_history serves candles from the server's data directory, so a
+    TradingBot can warm up and stream entirely offline.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.tokens = LocalTokens()
+        self.logger = logging.getLogger('LocalStreamerClient')
+
+    def preferences(self):
+        return MockResponse(True, {"streamerInfo": [{
+            "streamerSocketUrl": self.server.url,
+            "schwabClientCustomerId": "local-customer",
+            "schwabClientCorrelId": "local-correl",
+            "schwabClientChannel": "N9",
+            "schwabClientFunctionId": "APIAPP",
+        }]})
+
+    def price_history(self, symbol, **kwargs):
+        if self.server.cache is None:
+            return MockResponse(False, {"error": "No candle data behind this server"})
+        try:
+            return MockResponse(True, {"candles": list(self.server.cache.get(symbol))})
+        except FileNotFoundError:
+            return MockResponse(False, {"error": f"Data not found for {symbol}"})
+
+    def account_linked(self):
+        return MockResponse(True, [{"accountNumber": "LOCAL", "hashValue": "LOCAL"}])
+
+class SimulatedStreamServer:
+    def __init__(self, data_path=None, tape=None, rate=None, heartbeat_interval=10.0, screener_interval=60,
+                 screener_size=10, host="127.0.0.1", port=0):
+        """
+        Local WebSocket server speaking the subset of the Schwab streaming protocol the bot uses.
+
+        It answers ADMIN LOGIN/LOGOUT and CHART_EQUITY/SCREENER_EQUITY
+        SUBS/ADD/UNSUBS requests, sends heartbeats, and streams data frames
+        either from <ticker>.json candles (merged by datetime, one frame per
+        timestamp, only for subscribed tickers) or from a recorded tape.
+
+        Args:
+            data_path (str, optional): Directory of <ticker>.json candle files.
+            tape (str, optional): Tape recorded by TapeRecorder, replayed as-is instead of candle data.
+            rate (float, optional): Data frames per second per connection; None sends as fast as the client reads.
+            heartbeat_interval (float): Seconds between heartbeat notifications.
+            screener_interval (int): Candle frames between SCREENER_EQUITY frames while that service is subscribed.
+            screener_size (int): Symbols listed per screener frame, rotating through the data directory.
+            host (str): Interface to listen on.
+            port (int): Port to listen on; 0 picks a free port.
+        """
+        if (data_path is None) == (tape is None):
+            raise ValueError("Exactly one of data_path and tape is required")
+        self.data_path = data_path
+        self.tape = tape
+        self.cache = CandleCache(data_path) if data_path else None
+        self.rate = rate
+        self.heartbeat_interval = heartbeat_interval
+        self.screener_interval = screener_interval
+        self.screener_size = screener_size
+        self.host = host
+        self.port = port
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.sent = 0
+        self.connections = 0
+        self.on_frame = None  # Optional callable(frame, sent_ns) called just before each data frame is sent
+        self.logger = logging.getLogger('SimulatedStreamServer')
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def client(self):
+        return LocalStreamerClient(self)
+
+    def start(self):
+        """Serve on a background thread; returns once the server is listening."""
+        self.thread = threading.Thread(target=lambda: asyncio.run(self._serve()), name="SimulatedStreamServer", daemon=True)
+        self.thread.start()
+        if not self.ready.wait(5):
+            raise RuntimeError("Simulated stream server did not start")
+        self.logger.info(f"Simulated stream server listening on {self.url}")
+
+    def stop(self):
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        async with serve(self._session, self.host, self.port, max_size=None) as self.server:
+            self.port = self.server.sockets[0].getsockname()[1]
+            self.ready.set()
+            await self.server.wait_closed()
+
+    def _response(self, request, code=0, msg=None):
+        return {"service": request.get("service"), "command": request.get("command"), "requestid": str(request.get("requestid")),
+                "SchwabClientCorrelId": request.get("SchwabClientCorrelId"), "timestamp": int(time.time() * 1000),
+                "content": {"code": code, "msg": msg or f"{request.get('command')} command succeeded"}}
+
+    async def _session(self, websocket):
+        self.connections += 1
+        session = StreamSession(self)
+        try:
+            login = json.loads(await websocket.recv())
+            login = login.get("requests", [login])[0]
+            if login.get("service") != "ADMIN" or login.get("command") != "LOGIN":
+                await websocket.send(json.dumps({"response": [self._response(login, code=3, msg="Login required")]}))
+                return
+            await websocket.send(json.dumps({"response": [self._response(login, msg="server=local;status=PN")]}))
+            tasks = [asyncio.create_task(session.produce(websocket)), asyncio.create_task(self._heartbeat(websocket))]
+            try:
+                async for raw in websocket:
+                    message = json.loads(raw)
+                    requests = message.get("requests", [message])
+                    responses = [self._response(request) for request in requests]
+                    if any(request.get("command") == "LOGOUT" for request in requests):
+                        await websocket.send(json.dumps({"response": responses}))
+                        await websocket.close()
+                        break
+                    for request in requests:
+                        session.apply(request)
+                    await websocket.send(json.dumps({"response": responses}))
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _heartbeat(self, websocket):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await websocket.send(json.dumps({"notify": [{"heartbeat": str(int(time.time() * 1000))}]}))
+
+class StreamSession:
+    """Per-connection subscriptions and replay position."""
+    def __init__(self, server):
+        self.server = server
+        self.feed = None
+        if server.data_path:
+            self.feed = SimulatedStream(server.data_path, delay=0, cache=server.cache)
+        self.screener_keys = set()
+        self.frames = 0
+        self.screener_offset = 0
+        self.changed = asyncio.Event()
+
+    def apply(self, request):
+        service = request.get("service")
+        if service == "CHART_EQUITY" and self.feed:
+            self.feed.send(request)
+        elif service == "SCREENER_EQUITY":
+            keys = set(request.get("parameters", {}).get("keys", "").split(",")) - {""}
+            if request.get("command") == "UNSUBS":
+                self.screener_keys -= keys
+            elif request.get("command") == "SUBS":
+                self.screener_keys = keys
+            else:
+                self.screener_keys |= keys
+        self.changed.set()
+
+    def frames_from_data(self):
+        """Next frame(s) from candle data, or [] if nothing subscribed is pending."""
+        message = self.feed._next_message()
+        if message is None:
+            return []
+        self.frames += 1
+        for content in message["data"][0]["content"]:
+            content["6"] = self.frames  # Chart sequence field
+        frames = [message]
+        if self.screener_keys and self.frames % self.server.screener_interval == 0:
+            frames.append(self.screener_frame(message["data"][0]["timestamp"]))
+        return frames
+
+    def screener_frame(self, timestamp):
+        tickers = sorted(name[:-5] for name in os.listdir(self.server.data_path) if name.endswith(".json"))
+        if not tickers:
+            return {"data": []}
+        size = min(self.server.screener_size, len(tickers))
+        items = [{"symbol": tickers[(self.screener_offset + i) % len(tickers)]} for i in range(size)]
+        self.screener_offset = (self.screener_offset + size) % len(tickers)
+        content = [{"key": key, "1": timestamp, "2": "AVERAGE_PERCENT_VOLUME", "3": 60, "4": items} for key in sorted(self.screener_keys)]
+        return {"data": [{"service": "SCREENER_EQUITY", "timestamp": timestamp, "command": "SUBS", "content": content}]}
+
+    async def produce(self, websocket):
+        rate = self.server.rate
+        started = time.perf_counter()
+        sent = 0
+        tape = read_tape(self.server.tape) if self.server.tape else None
+        while True:
+            if tape is not None:
+                record = next(tape, None)
+                if record is None:
+                    return  # Tape exhausted; the connection stays open for requests
+                frames = [record[1]]
+            else:
+                frames = self.frames_from_data()
+                if not frames:
+                    self.changed.clear()
+                    try:
+                        await asyncio.wait_for(self.changed.wait(), timeout=0.1)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+            for frame in frames:
+                if rate:
+                    delay = started + sent / rate - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                raw = frame if isinstance(frame, str) else json.dumps(frame)
+                if self.server.on_frame:
+                    self.server.on_frame(raw, time.perf_counter_ns())  # Before sending, so the receiver cannot see the frame first
+                await websocket.send(raw)
+                sent += 1
+                self.server.sent += 1
+            if not rate and sent % 64 == 0:
+                await asyncio.sleep(0)  # Let requests and heartbeats through
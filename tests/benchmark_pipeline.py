@@ -0,0 +1,347 @@
+"""
+Synthetic CHART_EQUITY load through the production trading loop.
+
+Drives TradingBot.response_handler -> run loop -> decoder -> Indicators ->
+buy_condition with a stubbed client and stream, and reports sustained
+throughput, CPU per message, memory growth and stage latency percentiles.
+With --server the load is replayed by a SimulatedStreamServer through a
+real schwabdev Stream, and send-to-decision latency is reported as well.
+
+    python -m tests.benchmark_pipeline --symbols 50,200,800 --rate 5000 --duration 10
+    python -m tests.benchmark_pipeline --symbols 200 --rate 0 --json baseline.json
+    python -m tests.benchmark_pipeline --symbols 200 --rate 5000 --server
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+from schwabdev.stream import Stream
+from application.TradingBot import TradingBot
+from application.message_queue import BackpressurePolicy
+from infrastructure.adapters.candle_store import load_candles, CLOSE, VOLUME
+from infrastructure.adapters.tape import TapeRecorder
+from tests.SimulatedStream import MockResponse
+from tests.SimulatedStreamServer import SimulatedStreamServer
+
+START = 1737729000  # 2025-01-24 14:30 UTC
+DEFAULT_STATS = (100.0, 0.001, 10000.0)  # Close, per-minute log-return volatility, mean minute volume
+HISTORY_HOURS = 40  # Seeded history; at least the 35 hourly candles warm-ups require, so no second request is made
+
+def symbol_statistics(data_path, symbols=None):
+    """
+    (last close, minute log-return volatility, mean minute volume) per symbol in stock_data.
+
+    Returns:
+        list: Statistics tuples, or [DEFAULT_STATS] if no data is available.
+    """
+    if data_path is None or not os.path.isdir(data_path):
+        return [DEFAULT_STATS]
+    symbols = symbols or sorted(name[:-5] for name in os.listdir(data_path) if name.endswith(".json"))
+    stats = []
+    for symbol in symbols:
+        candles = load_candles(data_path, symbol)
+        if candles is None or len(candles) < 2:
+            continue
+        closes = np.asarray(candles[:, CLOSE])
+        returns = np.diff(np.log(closes[closes > 0]))
+        stats.append((float(closes[-1]), float(returns.std()) if len(returns) else DEFAULT_STATS[1], float(np.mean(candles[:, VOLUME]))))
+    return stats or [DEFAULT_STATS]
+
+class SyntheticChartFeed:
+    def __init__(self, stats, symbols, symbols_per_message=25, seed=7):
+        """
+        Random-walk CHART_EQUITY messages for `symbols` synthetic tickers.
+
+        Ticker i follows a geometric random walk seeded from stats[i % len(stats)].
+        history() serves HISTORY_HOURS of minute candles leading up to the
+        stream, so every ticker starts with warmed-up indicators. Every call
+        to messages() advances chart time by one minute and returns that
+        minute for all tickers, split into messages of up to
+        symbols_per_message updates, as the streamer groups them.
+        """
+        self.symbols = [f"S{i:04d}" for i in range(symbols)]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        picked = [stats[i % len(stats)] for i in range(symbols)]
+        self.close = np.array([s[0] for s in picked])
+        self.volatility = np.array([s[1] for s in picked])
+        self.volume = np.array([s[2] for s in picked])
+        self.symbols_per_message = symbols_per_message
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.minute = 0
+
+    def history(self, symbol):
+        """Minute candles of the HISTORY_HOURS before the stream starts, ending at the ticker's starting close."""
+        i = self.index[symbol]
+        rng = np.random.default_rng([self.seed, i])
+        minutes = HISTORY_HOURS * 60
+        steps = self.volatility[i] * rng.standard_normal(minutes)
+        # Walk backwards from the starting close so history and stream join up
+        closes = np.round(self.close[i] * np.exp(steps - np.cumsum(steps[::-1])[::-1]), 2).tolist()
+        volumes = rng.poisson(self.volume[i], minutes).tolist()
+        return [{"open": close, "high": close, "low": close, "close": close, "volume": volume, "datetime": (START - (minutes - k) * 60) * 1000}
+                for k, (close, volume) in enumerate(zip(closes, volumes))]
+
+    def messages(self):
+        """The next minute as (JSON message, number of chart updates in it) pairs."""
+        self.close *= np.exp(self.volatility * self.rng.standard_normal(len(self.close)))
+        volume = self.rng.poisson(self.volume)
+        chart_time = (START + self.minute * 60) * 1000
+        self.minute += 1
+        closes = np.round(self.close, 2).tolist()
+        volumes = volume.tolist()
+        messages = []
+        for start in range(0, len(self.symbols), self.symbols_per_message):
+            content = [{"key": self.symbols[i], "1": closes[i], "2": closes[i], "3": closes[i], "4": closes[i], "5": volumes[i], "7": chart_time}
+                       for i in range(start, min(start + self.symbols_per_message, len(self.symbols)))]
+            messages.append((json.dumps({"data": [{"service": "CHART_EQUITY", "timestamp": chart_time, "command": "SUBS", "content": content}]}), len(content)))
+        return messages
+
+class LoadClient:
+    """Stubbed API client: synthetic history from the feed, no account."""
+    def __init__(self, feed):
+        self.feed = feed
+
+    def price_history(self, symbol, **kwargs):
+        return MockResponse(True, {"candles": self.feed.history(symbol)})
+
+class LoadStream:
+    """Stubbed streamer that hands the bot's receiver to the load generator."""
+    def __init__(self):
+        self.subscriptions = {}
+        self.active = False
+        self.receiver = None
+        self.started = threading.Event()
+
+    def start(self, receiver, daemon=True, **kwargs):
+        self.receiver = receiver
+        self.active = True
+        self.started.set()
+
+    def start_auto(self, receiver, daemon=True, **kwargs):
+        self.start(receiver, daemon)
+
+    def send(self, requests):
+        pass
+
+    def chart_equity(self, keys, fields, command="ADD"):
+        return {"service": "CHART_EQUITY", "command": command, "parameters": {"keys": keys, "fields": fields}}
+
+    def screener_equity(self, keys, fields, command="ADD"):
+        return {"service": "SCREENER_EQUITY", "command": command, "parameters": {"keys": keys, "fields": fields}}
+
+class ServerStream(Stream):
+    """Real schwabdev Stream that connects straight away instead of waiting for market hours."""
+    def __init__(self, client):
+        super().__init__(client)
+        self.started = threading.Event()
+
+    def start(self, receiver=print, daemon=True, **kwargs):
+        super().start(receiver=receiver, daemon=daemon, **kwargs)
+        self.started.set()
+
+    def start_auto(self, receiver=print, daemon=True, **kwargs):
+        self.start(receiver, daemon)
+
+def write_tape(feed, updates, path):
+    """
+    Record at least `updates` chart updates from the feed to a tape.
+
+    Returns:
+        list: (chart_time, chunk, updates) per recorded frame, in order; chunk is the frame's index within its minute.
+    """
+    frames = []
+    recorded = 0
+    recorder = TapeRecorder(path)
+    while recorded < updates:
+        for chunk, (message, count) in enumerate(feed.messages()):
+            recorder.record(message)
+            frames.append(((START + (feed.minute - 1) * 60) * 1000, chunk, count))
+            recorded += count
+    recorder.close()
+    return frames
+
+class SendToDecision:
+    """
+    Server-to-decision latency: from the moment the server sends a frame to
+    the end of the decision pass that consumed it.
+
+    Frames are identified by (chart time, chunk), which every chart update
+    carries implicitly through its symbol, so no extra field is streamed.
+    """
+    def __init__(self, bot, feed, frames):
+        self.chunk = {symbol: i // feed.symbols_per_message for symbol, i in feed.index.items()}
+        self.frames = [(chart_time, chunk) for chart_time, chunk, _ in frames]
+        self.count = 0
+        self.sent_ns = {}
+        self.histogram = bot.latency.histogram('send_to_decision')
+        self.decide = bot.decisions
+        bot.decisions = self.decisions
+
+    def on_frame(self, frame, sent_ns):
+        if self.count < len(self.frames):
+            self.sent_ns[self.frames[self.count]] = sent_ns
+        self.count += 1
+
+    def decisions(self, updates):
+        decisions = self.decide(updates)
+        decided = time.perf_counter_ns()
+        for key in {(chart_time, self.chunk[symbol]) for symbol, _, _, chart_time, _ in updates}:
+            sent_ns = self.sent_ns.pop(key, None)
+            if sent_ns is not None:
+                self.histogram.record(decided - sent_ns)
+        return decisions
+
+def thread_cpu_time(thread):
+    """CPU seconds used by a thread, or by the whole process where per-thread clocks are unavailable."""
+    if hasattr(time, "pthread_getcpuclockid") and thread.ident is not None:
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+        except OSError:
+            pass
+    return time.process_time()
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # Kilobytes on Linux
+
+def run_load(symbols, rate, duration, stats, symbols_per_message=25, seed=7, server=False):
+    """
+    Offer `rate` chart updates per second (0 for unpaced, lossless) for `duration` seconds.
+
+    With server=True the updates are recorded to a tape and streamed by a
+    SimulatedStreamServer at the same rate through a real schwabdev Stream;
+    this needs a positive rate and adds send_to_decision latency.
+
+    Returns:
+        dict: Offered and processed rates, CPU per message, memory growth, drops and latency percentiles.
+    """
+    if server and not rate:
+        raise ValueError("Server mode needs a positive rate")
+    feed = SyntheticChartFeed(stats, symbols, symbols_per_message, seed)
+    if server:
+        tape_dir = tempfile.mkdtemp()
+        frames = write_tape(feed, math.ceil(rate * duration), os.path.join(tape_dir, "load.tape"))
+        frame_rate = rate * len(frames) / sum(count for _, _, count in frames)
+        sim = SimulatedStreamServer(tape=os.path.join(tape_dir, "load.tape"), rate=frame_rate)
+        sim.start()
+        stream = ServerStream(sim.client())
+    else:
+        stream = LoadStream()
+    backpressure = BackpressurePolicy.lossless() if rate == 0 else BackpressurePolicy()
+    bot = TradingBot(None, None, client=LoadClient(feed), stream=stream, backpressure=backpressure)
+    bot.report_interval = duration * 10  # Keep periodic reports out of the measurement
+    if server:
+        sim.on_frame = SendToDecision(bot, feed, frames).on_frame
+    loop = threading.Thread(target=bot.run, args=(feed.symbols,), name="BenchmarkTradingLoop", daemon=True)
+    loop.start()
+    if not stream.started.wait(300):  # Warm-ups replay HISTORY_HOURS of history per symbol first
+        raise RuntimeError("Trading loop did not start")
+    rss_before = max_rss_mb()
+
+    cpu_before = thread_cpu_time(loop)
+    offered_messages = offered_updates = 0
+    started = time.perf_counter()
+    deadline = started + duration
+    if server:
+        while sim.sent < len(frames) and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        offered_messages = min(sim.sent, len(frames))
+        offered_updates = sum(count for _, _, count in frames[:offered_messages])
+    else:
+        while time.perf_counter() < deadline:
+            for message, updates in feed.messages():
+                if rate:
+                    ahead = started + offered_updates / rate - time.perf_counter()
+                    if ahead > 0.001:
+                        time.sleep(ahead)
+                stream.receiver(message)
+                offered_messages += 1
+                offered_updates += updates
+    offered_elapsed = time.perf_counter() - started
+    # Let the loop finish what it was given, including frames still in the socket, up to one more duration
+    while ((len(bot.message_queue) or (server and bot.decoder.stats()['messages'] < offered_messages))
+           and time.perf_counter() < deadline + duration):
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    cpu = thread_cpu_time(loop) - cpu_before
+    bot.stop()
+    loop.join(timeout=10)
+    if server:
+        stream.stop()
+        sim.stop()
+        shutil.rmtree(tape_dir)
+
+    queue_stats = bot.message_queue.stats()
+    decoded = bot.decoder.stats()
+    latency = bot.latency.snapshot()
+    return {
+        'symbols': symbols,
+        'offered_updates_per_s': offered_updates / offered_elapsed,
+        'offered_messages_per_s': offered_messages / offered_elapsed,
+        'processed_messages_per_s': decoded['messages'] / elapsed,
+        'processed_updates_per_s': decoded['updates'] / elapsed,
+        'cpu_us_per_message': cpu / decoded['messages'] * 1e6 if decoded['messages'] else math.nan,
+        'max_rss_growth_mb': max_rss_mb() - rss_before,
+        'dropped': queue_stats['dropped_chart'],
+        'backlog': len(bot.message_queue),
+        'lag_alerts': bot.lag_alerts,
+        'collapsed_batches': decoded['collapsed_batches'],
+        'latency_us': {stage: {key: summary[key] for key in ('p50_us', 'p99_us', 'p999_us')}
+                       for stage, summary in latency.items() if summary['count']},
+    }
+
+def saturated(result, tolerance=0.95):
+    """A run saturates the bot if it shed load, collapsed batches or fell behind the offered rate."""
+    return (result['dropped'] > 0 or result['collapsed_batches'] > 0
+            or result['processed_messages_per_s'] < tolerance * result['offered_messages_per_s'])
+
+def format_result(result):
+    def percentiles(stage):
+        latency = result['latency_us'].get(stage, {})
+        return f"{latency.get('p50_us', 0):.0f}/{latency.get('p99_us', 0):.0f}/{latency.get('p999_us', 0):.0f} us"
+
+    line = (f"{result['symbols']:>6} symbols | offered {result['offered_updates_per_s']:>9.0f} upd/s | "
+            f"processed {result['processed_messages_per_s']:>8.0f} msg/s ({result['processed_updates_per_s']:>9.0f} upd/s) | "
+            f"{result['cpu_us_per_message']:>7.1f} us CPU/msg | +{result['max_rss_growth_mb']:.1f} MB | "
+            f"dropped {result['dropped']} | tick-to-decision p50/p99/p999 {percentiles('tick_to_decision')}")
+    if 'send_to_decision' in result['latency_us']:
+        line += f" | send-to-decision {percentiles('send_to_decision')}"
+    return line
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", default="50,100,200,400", help="Comma-separated symbol counts to sweep")
+    parser.add_argument("--rate", type=float, default=5000.0, help="Offered chart updates per second; 0 for unpaced, lossless")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per symbol count")
+    parser.add_argument("--symbols-per-message", type=int, default=25)
+    parser.add_argument("--data-path", default=os.path.join("Data Collection", "stock_data"))
+    parser.add_argument("--server", action="store_true", help="Stream the load from a SimulatedStreamServer through a real schwabdev Stream")
+    parser.add_argument("--json", help="Write the results to this file, e.g. to compare against a baseline")
+    args = parser.parse_args()
+    if args.server and not args.rate:
+        parser.error("--server needs a positive --rate")
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('TradingBot').setLevel(logging.WARNING)
+    stats = symbol_statistics(args.data_path)
+    results = []
+    for symbols in (int(count) for count in args.symbols.split(",")):
+        result = run_load(symbols, args.rate, args.duration, stats, args.symbols_per_message, server=args.server)
+        results.append(result)
+        print(format_result(result) + ("  <- saturated" if args.rate and saturated(result) else ""), flush=True)
+    if args.rate:
+        saturating = [result['symbols'] for result in results if saturated(result)]
+        print(f"Saturation at {saturating[0]} symbols" if saturating else "No saturation in this sweep")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'rate': args.rate, 'duration': args.duration, 'server': args.server, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import json
+import unittest
+from unittest.mock import patch
+from domain.entities import strategy
+from tests.benchmark_pipeline import DEFAULT_STATS, HISTORY_HOURS, START, SyntheticChartFeed, run_load, saturated, symbol_statistics
+
+class TestBenchmarkPipeline(unittest.TestCase):
+
+    def test_feed_groups_one_minute_per_call(self):
+        feed = SyntheticChartFeed([DEFAULT_STATS], symbols=60, symbols_per_message=25)
+        first, second = feed.messages(), feed.messages()
+        self.assertEqual([len(json.loads(m)["data"][0]["content"]) for m, _ in first], [25, 25, 10])
+        self.assertEqual([updates for _, updates in first], [25, 25, 10])
+        times = {json.loads(m)["data"][0]["timestamp"] for m, _ in second}
+        self.assertEqual(len(times), 1)
+        self.assertEqual(times.pop() - json.loads(first[0][0])["data"][0]["timestamp"], 60000)
+
+    def test_history_leads_into_the_stream(self):
+        feed = SyntheticChartFeed([DEFAULT_STATS], symbols=2)
+        history = feed.history("S0001")
+        self.assertEqual(len(history), HISTORY_HOURS * 60)
+        self.assertEqual(history[-1]["datetime"], (START - 60) * 1000)
+        self.assertEqual(history[-1]["close"], DEFAULT_STATS[0])
+        self.assertEqual(feed.history("S0001"), history)
+
+    def test_short_run_reports_metrics(self):
+        self.assertEqual(symbol_statistics("/nonexistent"), [DEFAULT_STATS])
+        # MACD crossovers are checked only once a symbol has two moving-average readings
+        with patch.object(strategy, "has_macd_crossover", wraps=strategy.has_macd_crossover) as crossover:
+            result = run_load(symbols=10, rate=2000, duration=0.5, stats=[DEFAULT_STATS])
+        self.assertGreater(crossover.call_count, 0)
+        self.assertGreater(result['processed_updates_per_s'], 0)
+        self.assertEqual(result['dropped'], 0)
+        self.assertIn('tick_to_decision', result['latency_us'])
+        self.assertFalse(saturated(dict(result, processed_messages_per_s=result['offered_messages_per_s'])))
+        self.assertTrue(saturated(dict(result, dropped=1)))
+
+    def test_server_mode_reports_send_to_decision(self):
+        with self.assertRaises(ValueError):
+            run_load(symbols=10, rate=0, duration=0.5, stats=[DEFAULT_STATS], server=True)
+        result = run_load(symbols=10, rate=2000, duration=0.5, stats=[DEFAULT_STATS], server=True)
+        self.assertGreater(result['offered_updates_per_s'], 0)
+        self.assertGreater(result['processed_updates_per_s'], 0)
+        self.assertGreater(result['latency_us']['send_to_decision']['p50_us'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
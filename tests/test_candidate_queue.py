@@ -0,0 +1,60 @@
+import unittest
+from application.candidate_queue import CandidateQueue, screener_candidates
+from infrastructure.adapters.clock import VirtualClock
+
+class TestScreenerCandidates(unittest.TestCase):
+
+    def test_items_ranked_by_position(self):
+        service = {"service": "SCREENER_EQUITY", "content": [
+            {"key": "$SPX.X_AVERAGE_PERCENT_VOLUME_60", "4": [{"symbol": "AAA"}, {"symbol": "BBB"}, {"symbol": "CCC"}, {"symbol": "DDD"}]}
+        ]}
+        self.assertEqual(screener_candidates(service), [("AAA", 1.0), ("BBB", 0.75), ("CCC", 0.5), ("DDD", 0.25)])
+
+    def test_content_keys_as_symbols(self):
+        service = {"content": [{"key": "AAA"}, {}, {"key": "BBB"}]}
+        self.assertEqual(screener_candidates(service), [("AAA", 1.0), ("BBB", 0.5)])
+
+    def test_items_scored_by_ranking_fields(self):
+        service = {"content": [{"key": "$SPX.X_AVERAGE_PERCENT_VOLUME_60", "2": "AVERAGE_PERCENT_VOLUME", "4": [
+            {"symbol": "AAA", "averagePercentVolume": 1.0, "netPercentChange": 0.0, "volume": 100},
+            {"symbol": "BBB", "averagePercentVolume": 3.0, "netPercentChange": 2.0, "volume": 300},
+            {"symbol": "CCC", "averagePercentVolume": 2.0, "volume": 200}
+        ]}]}
+        self.assertEqual(screener_candidates(service), [("AAA", 0.0), ("BBB", 1.0), ("CCC", 1.0 / 3)])
+
+    def test_screener_id_is_not_a_symbol(self):
+        service = {"content": [{"key": "$SPX.X_VOLUME_60", "1": 0, "2": "VOLUME", "3": 60}, {"key": "NASDAQ_VOLUME_30", "2": "VOLUME"}]}
+        self.assertEqual(screener_candidates(service), [])
+
+class TestCandidateQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = VirtualClock(start=1000.0)
+        self.queue = CandidateQueue(capacity=3, max_age=60.0, recheck=600.0, clock=self.clock)
+
+    def test_bounded_by_priority(self):
+        self.assertEqual(self.queue.offer([("A", 0.1), ("B", 0.9), ("C", 0.5), ("D", 0.7)]), 1)
+        self.assertEqual(self.queue.pop(2), ["B", "D"])
+        self.assertEqual(self.queue.pop(5), ["C"])
+        self.assertEqual(self.queue.stats(), {'queued': 0, 'offered': 4, 'evicted': 1, 'stale': 0})
+
+    def test_past_evaluations_adjust_priority(self):
+        self.queue.record("REJECTED", "hold")
+        self.queue.record("BOUGHT", "buy")
+        self.queue.offer([("REJECTED", 1.0), ("BOUGHT", 0.2), ("NEW", 0.5)])
+        self.assertEqual(self.queue.pop(3), ["BOUGHT", "NEW", "REJECTED"])
+        # The rejection fades out over the recheck period
+        self.clock.advance(600)
+        self.queue.offer([("REJECTED", 1.0), ("NEW", 0.5)])
+        self.assertEqual(self.queue.pop(1), ["REJECTED"])
+
+    def test_stale_candidates_dropped(self):
+        self.queue.offer([("OLD", 1.0)])
+        self.clock.advance(30)
+        self.queue.offer([("NEW", 0.1)])
+        self.clock.advance(31)
+        self.assertEqual(self.queue.pop(2), ["NEW"])
+        self.assertEqual(self.queue.stats()['stale'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from application.TradingBot import TradingBot
+from infrastructure.adapters.clock import VirtualClock, Scheduler
+from tests.SimulatedStream import SimulatedStream
+
+START = 1737729000  # 2025-01-24 14:30 UTC
+
+class TestVirtualClock(unittest.TestCase):
+
+    def test_advance_is_instant(self):
+        clock = VirtualClock(start=100.0)
+        wall = time.perf_counter()
+        clock.advance(3600)
+        self.assertEqual(clock.time(), 3700.0)
+        self.assertLess(time.perf_counter() - wall, 0.5)
+
+    def test_unseeded_clock_starts_at_first_timestamp(self):
+        clock = VirtualClock()
+        self.assertFalse(clock.seeded)
+        clock.advance_to(START)
+        self.assertTrue(clock.seeded)
+        self.assertEqual(clock.time(), START)
+
+    def test_advance_to_never_moves_backwards(self):
+        clock = VirtualClock(start=100.0)
+        clock.advance_to(50.0)
+        self.assertEqual(clock.time(), 100.0)
+        clock.advance_to(250.0)
+        self.assertEqual(clock.time(), 250.0)
+
+    def test_scheduler_runs_due_tasks(self):
+        clock = VirtualClock(start=0)
+        scheduler = Scheduler(clock)
+        callback = Mock()
+        task = scheduler.call_every(300, callback)
+        self.assertEqual(scheduler.next_deadline(), 300)
+        clock.advance(299)
+        scheduler.run_pending()
+        callback.assert_not_called()
+        clock.advance(1)
+        scheduler.run_pending()
+        self.assertEqual(callback.call_count, 1)
+        self.assertEqual(scheduler.next_deadline(), 600)
+        scheduler.cancel(task)
+        self.assertIsNone(scheduler.next_deadline())
+
+    def test_timers_anchor_to_the_seeded_time(self):
+        clock = VirtualClock()
+        scheduler = Scheduler(clock)
+        callback = Mock()
+        scheduler.call_every(300, callback)
+        self.assertIsNone(scheduler.next_deadline())
+        clock.advance_to(START)
+        scheduler.run_pending()
+        callback.assert_not_called()
+        self.assertEqual(scheduler.next_deadline(), START + 300)
+
+class TestTradingBotVirtualTime(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        for i, ticker in enumerate(["AAA", "BBB"]):
+            candles = [
+                {"open": 10 + i, "high": 10 + i, "low": 10 + i, "close": 10 + i + m / 100, "volume": 100, "datetime": (START + m * 60) * 1000}
+                for m in range(180)
+            ]
+            with open(os.path.join(self.data_path, f"{ticker}.json"), "w") as f:
+                json.dump(candles, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_replay_drives_report_timer_at_cpu_speed(self):
+        self.replay(VirtualClock(start=START))
+
+    def test_unseeded_clock_starts_timers_at_the_first_message(self):
+        # Timers registered at time 0 would all be overdue; they anchor to the first replayed bar instead
+        self.replay(VirtualClock())
+
+    def replay(self, clock):
+        stream = SimulatedStream(data_path=self.data_path, delay=0)
+        bot = TradingBot(None, None, client=stream, stream=stream, clock=clock)
+        bot.portfolio.report_gains_losses = Mock()
+        thread = threading.Thread(target=bot.run, kwargs={'initial_symbols': ["AAA", "BBB"]}, daemon=True)
+        wall = time.perf_counter()
+        thread.start()
+        while (stream.data_iterators or len(bot.message_queue) or not bot.running) and time.perf_counter() - wall < 10:
+            time.sleep(0.01)
+        bot.stop()
+        thread.join(timeout=5)  # Finish the current message while the stream is still active
+        stream.stop()
+
+        self.assertLess(time.perf_counter() - wall, 10)
+        self.assertEqual(clock.time(), START + 179 * 60)
+        # 179 minutes of replayed data at a 5-minute report interval
+        self.assertEqual(bot.portfolio.report_gains_losses.call_count, 179 * 60 // bot.report_interval)
+
+if __name__ == '__main__':
+    unittest.main()
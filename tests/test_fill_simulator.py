@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock
+from application.fill_simulator import Commission, FillSimulator, FixedBps, NextBarOpen, VolumeParticipation
+from application.TradingBot import TradingBot
+
+START_MS = 1737729000 * 1000  # 2025-01-24 14:30 UTC
+
+def bar(symbol, minute, close=10.0, volume=1000):
+    return (symbol, close, volume, START_MS + minute * 60000, START_MS + minute * 60000)
+
+class TestFillSimulator(unittest.TestCase):
+
+    def test_immediate_fill_with_slippage_and_spread(self):
+        simulator = FillSimulator(FixedBps(5.0), spread_bps=2.0)
+        simulator.on_bars([bar("AAA", 0)])
+        order, fills = simulator.submit("buy", "AAA", 100, 10.0, START_MS)
+        self.assertEqual(order.status, "FILLED")
+        self.assertEqual(len(fills), 1)
+        _, quantity, price, commission = fills[0]
+        self.assertEqual(quantity, 100)
+        self.assertAlmostEqual(price, 10.0 * 1.0005 * 1.0001)
+        self.assertEqual(commission, 0.0)
+        _, fills = simulator.submit("sell", "AAA", 100, 10.0, START_MS)
+        self.assertLess(fills[0][2], 10.0)
+        self.assertGreater(simulator.stats()['slippage_cost'], 0.0)
+
+    def test_latency_fills_in_a_later_bar(self):
+        simulator = FillSimulator(latency=90.0)
+        simulator.on_bars([bar("AAA", 0)])
+        order, fills = simulator.submit("buy", "AAA", 10, 10.0, START_MS)
+        self.assertEqual(fills, [])
+        self.assertTrue(simulator.has_open("AAA"))
+        # Decided at the close of minute 0 (14:31); arrives 14:32:30, during minute 2
+        self.assertEqual(simulator.on_bars([bar("AAA", 1, 10.5)]), [])
+        fills = simulator.on_bars([bar("BBB", 2), bar("AAA", 2, 11.0)])
+        self.assertEqual([(f[1], f[2]) for f in fills], [(10, 11.0)])
+        self.assertFalse(simulator.has_open("AAA"))
+        self.assertEqual(simulator.stats()['mean_delay_bars'], 1.0)
+
+    def test_bars_later_in_the_same_batch(self):
+        simulator = FillSimulator(latency=1.0)
+        simulator.on_bars([bar("AAA", 0), bar("AAA", 1, 10.2)])
+        order, fills = simulator.submit("buy", "AAA", 10, 10.0, START_MS)
+        self.assertEqual(order.status, "FILLED")
+        self.assertEqual(fills[0][2], 10.2)
+
+    def test_partial_fills_by_volume_and_expiry(self):
+        simulator = FillSimulator(VolumeParticipation(max_participation=0.1, impact_bps=10.0), max_bars=2,
+                                  commission=Commission(per_share=0.01, minimum=1.0))
+        simulator.on_bars([bar("AAA", 0, volume=300)])
+        order, fills = simulator.submit("buy", "AAA", 100, 10.0, START_MS)
+        # 10% of 300 shares at full impact, with the minimum commission on the first fill
+        self.assertEqual([(f[1], f[3]) for f in fills], [(30, 1.0)])
+        self.assertAlmostEqual(fills[0][2], 10.0 * 1.001)
+        fills = simulator.on_bars([bar("AAA", 1, volume=500)])
+        self.assertEqual(fills[0][1], 50)
+        self.assertAlmostEqual(fills[0][3], 0.5)
+        self.assertEqual(simulator.on_bars([bar("AAA", 2, volume=0)]), [])
+        self.assertEqual(order.status, "EXPIRED")
+        self.assertEqual(order.filled_quantity, 80)
+        stats = simulator.stats()
+        self.assertEqual((stats['expired'], stats['partial_fills'], stats['open']), (1, 2, 0))
+        self.assertAlmostEqual(stats['commissions'], 1.5)
+
+    def test_next_bar_open(self):
+        data_path = tempfile.mkdtemp()
+        try:
+            candles = [{"datetime": START_MS + m * 60000, "open": 20.0 + m, "high": 30, "low": 10, "close": 25.0, "volume": 100} for m in range(3)]
+            with open(os.path.join(data_path, "AAA.json"), "w") as f:
+                json.dump(candles, f)
+            simulator = FillSimulator(NextBarOpen(data_path))
+            simulator.on_bars([bar("AAA", 0, 25.0)])
+            order, fills = simulator.submit("buy", "AAA", 10, 25.0, START_MS)
+            self.assertEqual(fills, [])
+            self.assertEqual(simulator.on_bars([bar("AAA", 1, 25.0)])[0][2], 21.0)
+            # No candles for the symbol: the bar's close is used
+            simulator.on_bars([bar("ZZZ", 0, 5.0)])
+            simulator.submit("buy", "ZZZ", 10, 5.0)
+            self.assertEqual(simulator.on_bars([bar("ZZZ", 1, 6.0)])[0][2], 6.0)
+        finally:
+            shutil.rmtree(data_path)
+
+    def test_thousands_of_orders_per_second(self):
+        simulator = FillSimulator(VolumeParticipation(), latency=0.5)
+        symbols = [f"S{i:04d}" for i in range(1000)]
+        started = time.perf_counter()
+        for minute in range(10):
+            simulator.on_bars([bar(symbol, minute) for symbol in symbols])
+            for symbol in symbols:
+                simulator.submit("buy", symbol, 100, 10.0)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(simulator.stats()['submitted'], 10000)
+        self.assertGreater(10000 / elapsed, 5000)
+
+class TestTradingBotFills(unittest.TestCase):
+
+    def test_simulated_orders_fill_through_simulator(self):
+        bot = TradingBot(None, None, client=Mock(), stream=Mock(), fill_simulator=FillSimulator(latency=1.0, commission=Commission(per_order=1.0)))
+        signals = iter([("buy", "AAA", 10.0)])
+        bot.decisions = lambda updates: [next(signals)] if updates[0][3] == START_MS else []
+        bot.process_batch([json.dumps({"data": [{"service": "CHART_EQUITY", "content": [{"key": "AAA", "4": 10.0, "5": 100, "7": START_MS}]}]})])
+        self.assertIsNone(bot.portfolio.get_position("AAA"))
+        self.assertFalse(bot.should_place("buy", "AAA"))
+        bot.process_batch([json.dumps({"data": [{"service": "CHART_EQUITY", "content": [{"key": "AAA", "4": 10.5, "5": 100, "7": START_MS + 60000}]}]})])
+        position = bot.portfolio.get_position("AAA")
+        self.assertEqual(position.quantity, 100)
+        self.assertAlmostEqual(position.entry_price, 10.51)
+        self.assertAlmostEqual(bot.portfolio.cash, 100000.0 - 1051.0)
+
+    def test_fills_the_portfolio_refuses_reject_the_order(self):
+        simulator = FillSimulator(VolumeParticipation(max_participation=0.5), commission=Commission(per_order=1.0))
+        bot = TradingBot(None, None, client=Mock(), stream=Mock(), fill_simulator=simulator)
+        bot.portfolio.cash = 600.0
+        bot.apply_fills(simulator.on_bars([bar("AAA", 0, volume=100)]))
+        # 50 shares fill at once and are booked; the next 50 no longer fit in the cash left
+        order, fills = simulator.submit("buy", "AAA", 100, 10.0, START_MS)
+        self.assertEqual(len(fills), 1)
+        bot.apply_fills(fills)
+        fills = simulator.on_bars([bar("AAA", 1, volume=100), bar("AAA", 2, volume=100)])
+        with self.assertLogs(level='WARNING'):
+            bot.apply_fills(fills)
+        self.assertEqual(order.status, "REJECTED")
+        self.assertEqual(order.filled_quantity, bot.portfolio.get_position("AAA").quantity)
+        self.assertFalse(simulator.has_open("AAA"))
+        stats = simulator.stats()
+        self.assertEqual((stats['filled'], stats['rejected'], stats['fills'], stats['partial_fills']), (0, 1, 1, 1))
+        self.assertEqual(stats['commissions'], 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+from domain.entities.indicators import Indicators
+from domain.entities.indicator_series import aggregate_hourly, SeriesCache
+from domain.entities.strategy import StrategyParameters, evaluate_signal, signal_arrays
+
+def random_walk_minutes(hours=200, seed=1):
+    rng = np.random.default_rng(seed)
+    start = 1737727200000  # An hour boundary
+    timestamps = start + np.arange(hours * 60, dtype=np.int64) * 60000
+    closes = np.round(100 + np.cumsum(rng.normal(0, 0.2, len(timestamps))), 2)
+    volumes = rng.integers(1000, 5000, len(timestamps)).astype(float)
+    return timestamps, closes, volumes
+
+class TestIndicatorSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.timestamps, self.closes, self.volumes = random_walk_minutes()
+        self.bars = aggregate_hourly(self.timestamps, self.closes, self.volumes)
+        self.series = SeriesCache(self.bars)
+
+    def replay(self, params):
+        """Feed the minutes through Indicators, recording state at every finalized hour."""
+        indicators = params.create_indicators()
+        snapshots = []
+        for ts, close, volume in zip(self.timestamps.tolist(), self.closes.tolist(), self.volumes.tolist()):
+            first = 'AAA' not in indicators.current_hour
+            if not indicators.update_minute_data('AAA', close, volume, ts) or first:
+                continue
+            ind = indicators.indicators['AAA']
+            snapshots.append({
+                'sma_short': indicators.calculate_SMA('AAA', params.sma_short),
+                'rsi': ind['rsi_history'][-1] if ind['rsi_history'] else None,
+                'macd': ind['macd_history'][-1] if ind['macd_history'] else None,
+                'action': evaluate_signal(ind, params)
+            })
+        return indicators, snapshots
+
+    def test_aggregation_matches_indicators(self):
+        indicators, _ = self.replay(StrategyParameters())
+        hourly = indicators.hourly_data['AAA']
+        self.assertEqual(len(self.bars), len(hourly))
+        np.testing.assert_allclose(self.bars.close, [c for c, _, _ in hourly])
+        np.testing.assert_allclose(self.bars.volume, [v for _, v, _ in hourly])
+
+    def test_series_match_indicators(self):
+        params = StrategyParameters(sma_short=5)
+        _, snapshots = self.replay(params)
+        sma = self.series.sma(5)
+        rsi = self.series.rsi(14)
+        macd_line, signal_line = self.series.macd()
+        for i, snap in enumerate(snapshots):
+            if snap['sma_short'] is None:
+                self.assertTrue(np.isnan(sma[i]))
+            else:
+                self.assertAlmostEqual(sma[i], snap['sma_short'])
+            if snap['rsi'] is not None:
+                self.assertAlmostEqual(rsi[i], snap['rsi'])
+            if snap['macd'] is not None:
+                self.assertAlmostEqual(macd_line[i], snap['macd'][0])
+                self.assertAlmostEqual(signal_line[i], snap['macd'][1])
+
+    def test_signal_arrays_match_evaluate_signal(self):
+        for params in (StrategyParameters(), StrategyParameters(sma_short=3, sma_long=6, rsi_threshold=50, bollinger_width=1.0, volume_lookback=2, macd_lookback=4)):
+            _, snapshots = self.replay(params)
+            buy, sell = signal_arrays(self.series, params)
+            expected = [snap['action'] for snap in snapshots]
+            actual = ["buy" if b else "sell" if s else "hold" for b, s in zip(buy, sell)]
+            self.assertEqual(actual, expected)
+        self.assertIn("buy", actual)  # The permissive parameters must exercise both branches
+        self.assertIn("sell", actual)
+
+    def test_series_are_memoized(self):
+        self.series.sma(10)
+        self.series.sma(10)
+        self.assertEqual(self.series.misses, 1)
+        self.assertEqual(self.series.hits, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from application.latency import LatencyHistogram, LatencyRecorder, bucket_index, bucket_upper_bound, BUCKETS, MAX_VALUE
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_buckets_cover_values_contiguously(self):
+        for value in list(range(5000)) + [2 ** k + d for k in range(13, 42) for d in (-1, 0, 1)]:
+            index = bucket_index(value)
+            self.assertLessEqual(value, bucket_upper_bound(index))
+            if index:
+                self.assertGreater(value, bucket_upper_bound(index - 1))
+        self.assertEqual(bucket_index(MAX_VALUE), BUCKETS - 1)
+
+    def test_percentiles_within_bucket_precision(self):
+        values = np.random.default_rng(3).lognormal(mean=10, sigma=1.5, size=50000).astype(np.int64)
+        histogram = LatencyHistogram()
+        for value in values.tolist():
+            histogram.record(value)
+        for q in (0.5, 0.99, 0.999):
+            exact = np.quantile(values, q, method='inverted_cdf')
+            self.assertLessEqual(abs(histogram.percentile(q) - exact) / exact, 1 / 16)
+        self.assertEqual(histogram.max, values.max())
+        self.assertEqual(histogram.count, len(values))
+
+    def test_merge_and_clamping(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(-5)
+        second.record(MAX_VALUE * 2)
+        first.merge(second)
+        self.assertEqual(first.count, 2)
+        self.assertEqual(first.percentile(0.5), 0)
+        self.assertEqual(first.max, MAX_VALUE)
+
+    def test_record_overhead_under_a_microsecond(self):
+        histogram = LatencyHistogram()
+        started = time.perf_counter_ns()
+        for value in range(100000):
+            histogram.record(value * 31)
+        self.assertLess((time.perf_counter_ns() - started) / 100000, 1000)
+
+class TestLatencyRecorder(unittest.TestCase):
+
+    def test_report_and_dump(self):
+        recorder = LatencyRecorder(('decode', 'decision'))
+        recorder.record('decode', 1000, 6000)
+        recorder.record('decode', 1000, 3000)
+        report = recorder.format_report()
+        self.assertIn("decode p50", report)
+        self.assertNotIn("decision", report)  # Stages without samples are left out
+
+        path = os.path.join(tempfile.mkdtemp(), "latency.json")
+        recorder.dump(path)
+        with open(path) as f:
+            dumped = json.load(f)
+        self.assertEqual(dumped['stages']['decode']['count'], 2)
+        self.assertEqual(dumped['stages']['decode']['max_us'], 5.0)
+        self.assertEqual(set(dumped['stages']['decision']), {'count', 'mean_us', 'p50_us', 'p99_us', 'p999_us', 'max_us'})
+
+if __name__ == '__main__':
+    unittest.main()
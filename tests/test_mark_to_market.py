@@ -0,0 +1,71 @@
+import time
+import unittest
+import numpy as np
+from domain.entities.mark_to_market import MarkToMarket
+
+class TestMarkToMarket(unittest.TestCase):
+
+    def test_long_and_short_positions(self):
+        marks = MarkToMarket()
+        marks.set_position("AAA", 100, 10.0)
+        marks.set_position("BBB", -50, 20.0)
+        marks.update_prices([("AAA", 12.0, 1000, 0, 0), ("BBB", 18.0, 1000, 0, 0)])
+        result = marks.mark()
+        self.assertEqual(result.symbols, ["AAA", "BBB"])
+        self.assertEqual(result.by_symbol(), {"AAA": 200.0, "BBB": 100.0})
+        self.assertEqual(result.unrealized_pnl, 300.0)
+        self.assertEqual(result.gross_exposure, 1200.0 + 900.0)
+        self.assertEqual(result.net_exposure, 1200.0 - 900.0)
+        self.assertEqual(result.market_value, result.net_exposure)
+
+    def test_snapshot_keeps_its_symbols_after_a_slot_is_reused(self):
+        marks = MarkToMarket()
+        marks.set_position("AAA", 100, 10.0)
+        marks.set_position("BBB", 50, 20.0)
+        marks.update_prices([("AAA", 12.0, 1000, 0, 0), ("BBB", 22.0, 1000, 0, 0)])
+        snapshot = marks.mark()
+        marks.set_position("AAA", 0, 0.0)
+        marks.set_position("CCC", 10, 5.0)
+        self.assertEqual(snapshot.by_symbol(), {"AAA": 200.0, "BBB": 100.0})
+
+    def test_unknown_symbols_and_missing_prices(self):
+        marks = MarkToMarket()
+        marks.update_price("AAA", 12.0)
+        marks.set_position("AAA", 10, 10.0)
+        # The price came before the position opened; it is marked at entry until the next tick
+        self.assertEqual(marks.mark().unrealized_pnl, 0.0)
+        marks.update_prices([("ZZZ", 50.0, 100, 0, 0), ("AAA", 11.0, 100, 0, 0), ("AAA", 11.5, 100, 0, 0)])
+        self.assertEqual(marks.mark().unrealized_pnl, 15.0)
+        self.assertEqual(len(marks), 1)
+
+    def test_closed_slots_are_reused_and_capacity_grows(self):
+        marks = MarkToMarket(capacity=2)
+        marks.set_position("AAA", 10, 10.0)
+        marks.update_price("AAA", 15.0)
+        marks.set_position("AAA", 0, 0.0)
+        marks.set_position("BBB", 10, 10.0)
+        # BBB took AAA's slot without inheriting its last price
+        self.assertEqual(marks.slots["BBB"], 0)
+        self.assertEqual(marks.mark().unrealized_pnl, 0.0)
+        for i in range(5):
+            marks.set_position(f"S{i}", 1, 1.0)
+        self.assertEqual(len(marks.quantity), 8)
+        self.assertEqual(len(marks.mark().quantity), 6)
+        self.assertEqual(marks.mark().symbols, ["BBB", "S0", "S1", "S2", "S3", "S4"])
+
+    def test_marking_hundreds_of_positions_per_tick(self):
+        marks = MarkToMarket()
+        symbols = [f"S{i:04d}" for i in range(500)]
+        for symbol in symbols:
+            marks.set_position(symbol, 100, 10.0)
+        started = time.perf_counter()
+        for tick in range(1000):
+            marks.update_price(symbols[tick % 500], 10.5)
+            result = marks.mark()
+        elapsed = time.perf_counter() - started
+        self.assertEqual(result.unrealized_pnl, 500 * 50.0)
+        self.assertTrue(np.all(result.price == 10.5))
+        self.assertLess(elapsed / 1000, 0.001)
+
+if __name__ == '__main__':
+    unittest.main()
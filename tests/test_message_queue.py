@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+import json
+from application.message_queue import MessageQueue, message_lane, HIGH, LOW
+
+class TestMessageQueue(unittest.TestCase):
+    def test_fifo_order_and_stats(self):
+        queue = MessageQueue()
+        for i in range(5):
+            self.assertTrue(queue.put(i))
+        self.assertEqual([queue.get(timeout=0) for _ in range(5)], [0, 1, 2, 3, 4])
+        stats = queue.stats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['max_depth'], 5)
+        self.assertEqual(stats['enqueued'], 5)
+        self.assertEqual(stats['dequeued'], 5)
+        self.assertGreaterEqual(stats['max_wait_ms'], stats['mean_wait_ms'])
+
+    def test_get_times_out_when_empty(self):
+        queue = MessageQueue()
+        started = time.perf_counter()
+        self.assertIsNone(queue.get(timeout=0.05))
+        self.assertGreaterEqual(time.perf_counter() - started, 0.04)
+        self.assertGreater(queue.stats()['consumer_idle_s'], 0)
+
+    def test_get_wakes_when_message_arrives(self):
+        queue = MessageQueue()
+        received = []
+
+        def consume():
+            received.append((queue.get(timeout=5), time.perf_counter()))
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        time.sleep(0.05)
+        sent = time.perf_counter()
+        queue.put("message")
+        consumer.join(timeout=5)
+        message, woke = received[0]
+        self.assertEqual(message, "message")
+        self.assertLess(woke - sent, 0.05)
+
+    def test_bounded_put_times_out_when_full(self):
+        queue = MessageQueue(maxsize=2)
+        self.assertTrue(queue.put(1))
+        self.assertTrue(queue.put(2))
+        self.assertFalse(queue.put(3, timeout=0.01))
+        self.assertEqual(len(queue), 2)
+
+    def test_drain_and_close(self):
+        queue = MessageQueue()
+        for i in range(3):
+            queue.put(i)
+        self.assertEqual(queue.drain(max_items=2), [0, 1])
+        self.assertEqual(queue.drain(), [2])
+        queue.close()
+        self.assertFalse(queue.put(4))
+        self.assertIsNone(queue.get(timeout=5))
+
+    def test_shed_evicts_screener_before_chart(self):
+        chart = [json.dumps({"data": [{"service": "CHART_EQUITY", "content": [{"key": str(i)}]}]}) for i in range(3)]
+        screener = json.dumps({"data": [{"service": "SCREENER_EQUITY", "content": []}]})
+        self.assertEqual((message_lane(chart[0]), message_lane(screener)), (HIGH, LOW))
+        queue = MessageQueue(maxsize=2, overflow="shed")
+        queue.put(screener)
+        queue.put(chart[0])
+        self.assertTrue(queue.put(chart[1]))   # Evicts the screener message
+        self.assertFalse(queue.put(screener))  # Screener never displaces a chart message
+        self.assertTrue(queue.put(chart[2]))   # Evicts the oldest chart message
+        self.assertEqual(queue.drain(), chart[1:])
+        stats = queue.stats()
+        self.assertEqual((stats['dropped_chart'], stats['dropped_screener']), (1, 2))
+
+    def test_lanes_preserve_arrival_order(self):
+        screener = json.dumps({"data": [{"service": "SCREENER_EQUITY"}]})
+        chart = json.dumps({"data": [{"service": "CHART_EQUITY"}]})
+        queue = MessageQueue()
+        for message in (chart, screener, chart, screener):
+            queue.put(message)
+        self.assertEqual(queue.drain(), [chart, screener, chart, screener])
+
+    def test_lag_measures_oldest_pending_message(self):
+        queue = MessageQueue()
+        self.assertEqual(queue.lag(), 0.0)
+        queue.put("message")
+        time.sleep(0.02)
+        self.assertGreaterEqual(queue.lag(), 0.02)
+
+if __name__ == '__main__':
+    unittest.main()
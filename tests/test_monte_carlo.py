@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from application.backtest import hourly_pnl, combine_hourly, simulate_trades
+from application.monte_carlo import MonteCarlo, block_bootstrap_indices, path_statistics
+from domain.entities.indicator_series import HourlyBars
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.trade_pnl = rng.normal(50, 400, 60)
+        self.period_pnl = rng.normal(5, 120, 300)
+
+    def test_path_statistics(self):
+        final, drawdown = path_statistics(np.array([[10.0, -30.0, 40.0], [5.0, 5.0, 5.0]]), 100.0)
+        np.testing.assert_allclose(final, [120.0, 115.0])
+        np.testing.assert_allclose(drawdown, [30.0 / 110.0, 0.0])
+
+    def test_block_indices_keep_runs_together(self):
+        indices = block_bootstrap_indices(10, 4, 3, np.random.default_rng(0))
+        self.assertEqual(indices.shape, (4, 10))
+        for row in indices:
+            for block in range(0, 9, 3):
+                np.testing.assert_array_equal(np.diff(row[block:block + 3]), [1, 1])
+        self.assertTrue((indices >= 0).all() and (indices < 10).all())
+
+    def test_results_are_reproducible_across_worker_counts(self):
+        first = MonteCarlo(self.trade_pnl, self.period_pnl, n_paths=2000, batch_size=300, seed=11, workers=1).run()
+        second = MonteCarlo(self.trade_pnl, self.period_pnl, n_paths=2000, batch_size=300, seed=11, workers=3).run()
+        self.assertEqual(first, second)
+        for method in ('trades', 'hourly'):
+            self.assertEqual(first[method]['paths'], 2000)
+            low, median, high = first[method]['final_equity'].values()
+            self.assertLess(low, median)
+            self.assertLess(median, high)
+            self.assertLessEqual(first[method]['max_drawdown'][2.5], first[method]['max_drawdown'][97.5])
+
+    def test_hourly_pnl_telescopes_to_trade_pnl(self):
+        prices = np.array([10.0, 11.0, 12.5, 12.0, 13.0, 12.0, 14.0])
+        bars = HourlyBars(prices, np.ones(7), np.arange(7) * 3600000, np.arange(7), prices, np.arange(7))
+        buy = np.array([True, False, False, False, True, False, False])
+        sell = np.array([False, False, True, False, False, False, True])
+        trades = simulate_trades(bars, buy, sell, quantity=10)
+        hours, pnl = hourly_pnl(bars, trades, quantity=10)
+        self.assertAlmostEqual(pnl.sum(), trades['pnl'].sum())
+        self.assertEqual(pnl[3], 0.0)  # Flat between the two trades
+        combined_hours, combined = combine_hourly([(hours, pnl), (hours[2:], pnl[2:])])
+        np.testing.assert_array_equal(combined_hours, hours)
+        self.assertAlmostEqual(combined.sum(), pnl.sum() + pnl[2:].sum())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+from application.order_gateway import OrderGateway
+
+def wait_for(condition, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+class TestOrderGateway(unittest.TestCase):
+
+    def test_submit_returns_before_round_trip(self):
+        placed = []
+        lock = threading.Lock()
+        def place(action, symbol, quantity):
+            time.sleep(0.1)
+            with lock:
+                placed.append((action, symbol))
+            return True, f"{symbol}-{len(placed)}"
+        gateway = OrderGateway(place, workers=4)
+        started = time.perf_counter()
+        tickets = [gateway.submit(action, symbol, 100) for symbol in ("AAA", "BBB", "CCC") for action in ("buy", "sell")]
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertTrue(wait_for(lambda: len(placed) == 6))
+        gateway.stop()
+        # Each symbol's orders keep their decision order
+        for symbol in ("AAA", "BBB", "CCC"):
+            self.assertEqual([action for action, s in placed if s == symbol], ["buy", "sell"])
+        self.assertTrue(all(ticket.status == "PLACED" and ticket.acked_ns >= ticket.submitted_ns >= ticket.queued_ns for ticket in tickets))
+        self.assertEqual([status for _, status in gateway.drain()], ["PLACED"] * 6)
+
+    def test_status_polling_tracks_fills(self):
+        statuses = {"1": ("WORKING", 0)}
+        gateway = OrderGateway(lambda *args: (True, "1"), status=lambda order_id: statuses[order_id])
+        ticket = gateway.submit("buy", "AAA", 100)
+        self.assertTrue(wait_for(lambda: gateway.stats()['open'] == 1))
+        gateway.poll()
+        self.assertTrue(wait_for(lambda: ticket.status == "WORKING"))
+        statuses["1"] = ("FILLED", 100)
+        gateway.poll()
+        self.assertTrue(wait_for(lambda: ticket.done))
+        gateway.poll()  # Closed orders are no longer polled
+        gateway.stop()
+        self.assertEqual([status for _, status in gateway.drain()], ["PLACED", "WORKING", "FILLED"])
+        self.assertEqual(ticket.filled_quantity, 100)
+        self.assertGreaterEqual(ticket.filled_ns, ticket.acked_ns)
+        self.assertEqual(gateway.stats(), {'submitted': 1, 'placed': 1, 'rejected': 0, 'filled': 1, 'open': 0, 'pending': 0})
+
+    def test_rejections_and_failures(self):
+        def place(action, symbol, quantity):
+            if symbol == "BAD":
+                raise ConnectionError("timeout")
+            return False, None
+        updated = threading.Event()
+        gateway = OrderGateway(place, workers=1, on_update=updated.set)
+        with self.assertLogs(level='ERROR'):
+            gateway.submit("buy", "BAD", 100)
+            gateway.submit("buy", "AAA", 100)
+            gateway.stop()
+        self.assertTrue(updated.is_set())
+        self.assertEqual(sorted(status for _, status in gateway.drain()), ["FAILED", "REJECTED"])
+        self.assertEqual(gateway.stats()['rejected'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from application.parameter_sweep import ParameterSweep, expand_grid
+from application.backtest import prepare_series, backtest_series
+from infrastructure.adapters.candle_store import load_candles, candle_cache_path, CLOSE
+from tests.test_indicator_series import random_walk_minutes
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        self.symbols = ["AAA", "BBB"]
+        for seed, symbol in enumerate(self.symbols):
+            timestamps, closes, volumes = random_walk_minutes(seed=seed + 1)
+            candles = [
+                {"open": c, "high": c, "low": c, "close": c, "volume": v, "datetime": int(t)}
+                for t, c, v in zip(timestamps.tolist(), closes.tolist(), volumes.tolist())
+            ]
+            with open(os.path.join(self.data_path, f"{symbol}.json"), "w") as f:
+                json.dump(candles, f)
+        self.grid = {'sma_short': [3, 5], 'sma_long': [6], 'rsi_threshold': [50, 70], 'bollinger_width': [1.0], 'volume_lookback': [2], 'macd_lookback': [4]}
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_expand_grid(self):
+        param_sets = expand_grid(self.grid)
+        self.assertEqual(len(param_sets), 4)
+        self.assertEqual({(p.sma_short, p.rsi_threshold) for p in param_sets}, {(3, 50), (3, 70), (5, 50), (5, 70)})
+
+    def test_load_candles_is_read_only_memory_map(self):
+        candles = load_candles(self.data_path, "AAA")
+        self.assertTrue(os.path.exists(candle_cache_path(self.data_path, "AAA")))
+        self.assertIsInstance(candles, np.memmap)
+        with self.assertRaises(ValueError):
+            candles[0, CLOSE] = 0.0
+        self.assertIsNone(load_candles(self.data_path, "MISSING"))
+
+    def test_sweep_matches_serial_backtest(self):
+        streamed = []
+        summary = ParameterSweep(self.data_path, self.symbols, self.grid, workers=2, chunk_size=3).run(
+            on_result=lambda symbol, result: streamed.append((symbol, result['params'])))
+        self.assertEqual(len(streamed), 8)
+        self.assertEqual(summary.results, 8)
+
+        param_sets = expand_grid(self.grid)
+        expected = {params: 0.0 for params in param_sets}
+        for symbol in self.symbols:
+            series = prepare_series(load_candles(self.data_path, symbol))
+            for result in backtest_series(series, param_sets):
+                expected[result['params']] += result['pnl']
+        for row in summary.table():
+            self.assertEqual(row['symbols'], 2)
+            self.assertAlmostEqual(row['pnl'], expected[row['params']])
+        self.assertIn("sma_short", summary.format_table(top=2))
+
+if __name__ == '__main__':
+    unittest.main()
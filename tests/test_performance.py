@@ -0,0 +1,52 @@
+import math
+import unittest
+import numpy as np
+from domain.entities.performance import (
+    RunningPerformance, max_drawdown, performance_report, period_returns, sharpe_ratio, sortino_ratio, trade_statistics
+)
+
+class TestPerformance(unittest.TestCase):
+
+    def setUp(self):
+        self.equity = np.array([100.0, 110.0, 99.0, 105.0, 120.0, 90.0, 95.0, 121.0])
+        self.trades = np.array([10.0, -5.0, 20.0, -15.0, 0.0])
+
+    def test_max_drawdown_and_duration(self):
+        drawdown, duration = max_drawdown(self.equity)
+        self.assertAlmostEqual(drawdown, 0.25)  # 120 -> 90
+        self.assertEqual(duration, 2)           # Two periods below the 120 peak
+        self.assertEqual(max_drawdown([]), (0.0, 0))
+
+    def test_ratios(self):
+        returns = period_returns(self.equity)
+        self.assertAlmostEqual(sharpe_ratio(returns), returns.mean() / returns.std(ddof=1))
+        downside = math.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+        self.assertAlmostEqual(sortino_ratio(returns, periods_per_year=4), returns.mean() / downside * 2)
+        self.assertEqual(sharpe_ratio(np.zeros(5)), 0.0)
+
+    def test_trade_statistics(self):
+        stats = trade_statistics(self.trades)
+        self.assertEqual((stats['trades'], stats['wins'], stats['losses']), (5, 2, 2))
+        self.assertAlmostEqual(stats['win_rate'], 0.4)
+        self.assertAlmostEqual(stats['profit_factor'], 30.0 / 20.0)
+        self.assertEqual(trade_statistics([5.0])['profit_factor'], math.inf)
+
+    def test_running_matches_vectorized(self):
+        exposure = np.array([0, 1, 1, 0, 1, 1, 0, 0])
+        notional = np.array([1000.0, 1010.0, 500.0])
+        running = RunningPerformance(periods_per_year=252)
+        for value, exposed in zip(self.equity, exposure):
+            running.update_equity(value, exposed)
+        for pnl in self.trades:
+            running.record_trade(pnl)
+        for fill in notional:
+            running.record_fill(fill)
+
+        expected = performance_report(self.equity, self.trades, exposure, notional, periods_per_year=252)
+        actual = running.report()
+        self.assertEqual(set(actual), set(expected))
+        for key, value in expected.items():
+            self.assertAlmostEqual(actual[key], value, msg=key)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import logging
-from domain.entities.portfolio import Portfolio
+from domain.entities.portfolio import Portfolio, Position
 
 class TestPortfolio(unittest.TestCase):
     
@@ -16,7 +16,8 @@ class TestPortfolio(unittest.TestCase):
         # Assert
         self.assertEqual(self.portfolio.cash, 100000.0)
         self.assertEqual(self.portfolio.positions, {})
-        self.assertEqual(self.portfolio.realized_gains_losses, [])
+        self.assertEqual(self.portfolio.realized_pnl, 0.0)
+        self.assertEqual(self.portfolio.recent_realized_pnl, [])
     
     ### Tests for buy Method
     def test_buy_successful(self):
@@ -143,5 +144,56 @@ class TestPortfolio(unittest.TestCase):
         # Assert
         self.assertEqual(total, 750.0)  # 500 + 250
 
+class TestPortfolioRunningTotals(unittest.TestCase):
+
+    def test_running_pnl_and_counters(self):
+        portfolio = Portfolio(initial_cash=10000.0)
+        portfolio.buy('AAA', 10.0, 100)
+        portfolio.buy('AAA', 12.0, 100)
+        self.assertIsInstance(portfolio.get_position('AAA'), Position)
+        self.assertEqual(portfolio.get_position('AAA').entry_price, 11.0)
+        self.assertEqual(portfolio.book_value(), 2200.0)
+        portfolio.sell('AAA', 13.0, 50)
+        portfolio.sell('AAA', 10.0, 150)
+        self.assertIsNone(portfolio.get_position('AAA'))
+        self.assertEqual(portfolio.realized_pnl, 100.0 - 150.0)
+        self.assertEqual(portfolio.book_value(), 0.0)
+        self.assertEqual(portfolio.cash, 10000.0 - 50.0)
+        metrics = portfolio.performance.report()
+        self.assertEqual((metrics['trades'], metrics['wins'], metrics['losses']), (2, 1, 1))
+
+    def test_trade_log_is_bounded(self):
+        portfolio = Portfolio(initial_cash=10000.0, trade_log_size=3)
+        for i in range(10):
+            portfolio.buy('AAA', 10.0, 10)
+            portfolio.sell('AAA', 10.0 + i, 10)
+        self.assertEqual(portfolio.recent_realized_pnl, [70.0, 80.0, 90.0])
+        self.assertEqual(portfolio.trade_log[-1], ('AAA', 10, 10.0, 19.0, 90.0))
+        # The running total still covers every trade
+        self.assertEqual(portfolio.realized_pnl, 450.0)
+        self.assertEqual(portfolio.performance.trades, 10)
+        self.assertIsNone(Portfolio(trade_log_size=0).trade_log)
+
+    def test_position_has_no_dict(self):
+        with self.assertRaises(AttributeError):
+            Position(1, 1.0).note = "x"
+
+    def test_equity_marks_open_positions(self):
+        portfolio = Portfolio(initial_cash=10000.0)
+        portfolio.buy('AAA', 10.0, 100)
+        portfolio.buy('BBB', 20.0, 50)
+        # Before any tick, positions are marked at their entry price
+        self.assertEqual(portfolio.equity(), 10000.0)
+        portfolio.update_prices([('AAA', 11.0, 500, 0, 0), ('CCC', 99.0, 500, 0, 0), ('BBB', 19.0, 500, 0, 0)])
+        marks = portfolio.mark()
+        self.assertEqual(marks.by_symbol(), {'AAA': 100.0, 'BBB': -50.0})
+        self.assertEqual(portfolio.equity(), 10050.0)
+        portfolio.sell('AAA', 11.0, 100)
+        self.assertEqual(portfolio.mark().symbols, ['BBB'])
+        self.assertEqual(portfolio.equity(), 10050.0)
+        with self.assertLogs(level='INFO') as logs:
+            portfolio.report_gains_losses()
+        self.assertIn("Equity: 10050.00, Unrealized P/L: -50.00 across 1 positions, Gross Exposure: 950.00", "\n".join(logs.output))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
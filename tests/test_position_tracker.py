@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from application.position_tracker import PositionTracker
+from application.TradingBot import TradingBot
+
+def wait_for(condition, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+class TestPositionTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.positions = {"AAA": (100, 10.0)}
+        self.orders = {"1": ("WORKING", 0)}
+        self.polled = threading.Event()
+        self.tracker = PositionTracker(lambda: dict(self.positions), lambda: dict(self.orders), on_update=self.polled.set)
+
+    def tearDown(self):
+        self.tracker.stop()
+
+    def poll(self):
+        polls = self.tracker.polls
+        self.tracker.poll()
+        self.assertTrue(wait_for(lambda: self.tracker.polls > polls))
+        return self.tracker.apply()
+
+    def test_only_deltas_published(self):
+        self.assertEqual(sorted(self.poll()), [('order', '1', 'WORKING', 0), ('position', 'AAA', 100, 10.0)])
+        self.assertTrue(self.polled.is_set())
+        self.assertTrue(self.tracker.holds("AAA"))
+        self.assertEqual(self.tracker.order_status(1), ("WORKING", 0))
+        # Nothing changed: nothing to apply
+        self.assertEqual(self.poll(), [])
+        self.positions = {"BBB": (50, 20.0)}
+        self.orders["1"] = ("FILLED", 50)
+        self.assertEqual(sorted(self.poll()), [('order', '1', 'FILLED', 50), ('position', 'AAA', 0, 0.0), ('position', 'BBB', 50, 20.0)])
+        self.assertFalse(self.tracker.holds("AAA"))
+        self.assertEqual(self.tracker.quantity("BBB"), 50)
+        stats = self.tracker.stats()
+        self.assertEqual((stats['polls'], stats['position_deltas'], stats['order_deltas']), (3, 3, 2))
+
+    def test_finished_orders_outside_the_window_are_dropped(self):
+        self.orders = {"1": ("WORKING", 0), "2": ("FILLED", 100)}
+        self.poll()
+        self.orders = {"3": ("CANCELED", 0)}  # 1 and 2 fell out of the request window
+        self.poll()
+        self.assertEqual(self.tracker.order_states, {"1": ("WORKING", 0), "3": ("CANCELED", 0)})
+        self.assertEqual(self.tracker.order_status("2"), (None, 0))
+        self.orders = {}
+        self.poll()
+        self.assertEqual(self.tracker.order_states, {"1": ("WORKING", 0)})
+
+    def test_failed_requests_keep_last_snapshot(self):
+        self.poll()
+        self.tracker.fetch_positions = lambda: None
+        self.tracker.fetch_orders = Mock(side_effect=ConnectionError("down"))
+        with self.assertLogs(level='ERROR'):
+            self.assertEqual(self.poll(), [])
+        self.assertTrue(self.tracker.holds("AAA"))
+        self.assertEqual(self.tracker.order_status("1"), ("WORKING", 0))
+        self.assertEqual(self.tracker.stats()['failures'], 1)
+
+    def test_polls_do_not_pile_up(self):
+        release = threading.Event()
+        calls = []
+        def slow_positions():
+            calls.append(1)
+            release.wait(5)
+            return {}
+        self.tracker.fetch_positions = slow_positions
+        for _ in range(5):
+            self.tracker.poll()
+        release.set()
+        self.assertTrue(wait_for(lambda: self.tracker.polls == 1))
+        time.sleep(0.05)
+        self.assertEqual(len(calls), 1)
+
+class TestTradingBotPositions(unittest.TestCase):
+
+    def test_live_positions_and_fills_from_polls(self):
+        client = Mock()
+        client.account_linked.return_value = Mock(ok=True, json=Mock(return_value=[{"hashValue": "HASH"}]))
+        client.order_place.return_value = Mock(ok=True, headers={"location": "https://api.schwabapi.com/trader/v1/accounts/HASH/orders/42"})
+        orders = []
+        positions = []
+        client.account_orders.side_effect = lambda *args: Mock(ok=True, json=Mock(return_value=list(orders)))
+        client.account_details.side_effect = lambda *args, **kwargs: Mock(ok=True, json=Mock(return_value={
+            "securitiesAccount": {"positions": list(positions)}}))
+        stream = Mock()
+        stream.subscriptions = {}
+        bot = TradingBot(None, None, simulate=False, client=client, stream=stream)
+        try:
+            bot.subscriptions.track("AAA")
+            bot.execute("buy", "AAA", 10.0)
+            self.assertTrue(wait_for(lambda: bot.orders.stats()['open'] == 1))
+            bot.apply_order_updates()
+
+            orders.append({"orderId": 42, "status": "FILLED", "filledQuantity": 100})
+            positions.append({"instrument": {"symbol": "AAA"}, "longQuantity": 100.0, "shortQuantity": 0.0, "averagePrice": 10.02})
+            bot.tracker.poll()
+            self.assertTrue(wait_for(lambda: not bot.tracker.updates.empty()))
+            bot.apply_order_updates()
+            # Position answered from memory; the gateway saw the fill in the tracker's cache
+            self.assertTrue(bot.holds("AAA"))
+            self.assertEqual(bot.open_positions(), ["AAA"])
+            self.assertFalse(bot.should_place("buy", "AAA"))
+            self.assertTrue(wait_for(lambda: bot.orders.stats()['filled'] == 1))
+            client.order_details.assert_not_called()
+            self.assertEqual(client.account_details.call_args.kwargs, {"fields": "positions"})
+        finally:
+            bot._stop_orders()
+
+if __name__ == '__main__':
+    unittest.main()
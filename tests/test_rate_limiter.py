@@ -0,0 +1,79 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from infrastructure.adapters.rate_limiter import ACCOUNT, BULK, HISTORY, ORDERS, PriorityRateLimiter, RateLimitedClient, rate_limited
+
+class TestPriorityRateLimiter(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        limiter = PriorityRateLimiter(rate=50.0, burst=3, order_reserve=0)
+        started = time.monotonic()
+        for _ in range(7):
+            limiter.acquire(HISTORY)
+        elapsed = time.monotonic() - started
+        # Three requests from the burst, then four at 50/s
+        self.assertGreaterEqual(elapsed, 0.07)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(limiter.stats()[HISTORY]['granted'], 7)
+        self.assertGreater(limiter.stats()[HISTORY]['waited_s'], 0.0)
+
+    def test_reserve_kept_for_orders(self):
+        limiter = PriorityRateLimiter(rate=0.5, burst=3, order_reserve=1)
+        limiter.acquire(HISTORY)
+        limiter.acquire(HISTORY)
+        # The last token is reserved: an order takes it at once while history would wait
+        self.assertLess(limiter.acquire(ORDERS), 0.05)
+        self.assertLess(limiter.tokens, 1.0)
+
+    def test_waiting_orders_served_before_earlier_bulk(self):
+        limiter = PriorityRateLimiter(rate=20.0, burst=2, order_reserve=0)
+        limiter.acquire(BULK)
+        limiter.acquire(BULK)
+        served = []
+        def request(lane):
+            limiter.acquire(lane)
+            served.append(lane)
+        bulk = [threading.Thread(target=request, args=(BULK,)) for _ in range(3)]
+        for thread in bulk:
+            thread.start()
+        time.sleep(0.01)
+        order = threading.Thread(target=request, args=(ORDERS,))
+        account = threading.Thread(target=request, args=(ACCOUNT,))
+        order.start()
+        account.start()
+        for thread in bulk + [order, account]:
+            thread.join(timeout=5)
+        # Bulk requests queued first, but the order and the account query get the next tokens
+        self.assertEqual(served[:2], [ORDERS, ACCOUNT])
+        self.assertEqual(served[2:], [BULK] * 3)
+
+    def test_unknown_lane(self):
+        with self.assertRaises(ValueError):
+            PriorityRateLimiter().acquire("express")
+
+class TestRateLimitedClient(unittest.TestCase):
+
+    def test_calls_take_their_lane(self):
+        client = Mock()
+        limiter = Mock()
+        limited = RateLimitedClient(client, limiter, lanes={'price_history': BULK})
+        limited.order_place("HASH", {})
+        limited.price_history(symbol="AAPL")
+        limited.account_details("HASH")
+        self.assertEqual([c.args[0] for c in limiter.acquire.call_args_list], [ORDERS, BULK, ACCOUNT])
+        client.price_history.assert_called_once_with(symbol="AAPL")
+        # Attributes other than API calls pass through without a token
+        self.assertIs(limited.tokens, client.tokens)
+        self.assertEqual(limiter.acquire.call_count, 3)
+
+    def test_rate_limited_wraps_once(self):
+        limiter = PriorityRateLimiter()
+        limited = rate_limited(Mock(), limiter=limiter)
+        self.assertIs(rate_limited(limited), limited)
+        bulk = rate_limited(limited, lanes={'price_history': BULK})
+        self.assertIs(bulk.client, limited.client)
+        self.assertIs(bulk.limiter, limiter)
+
+if __name__ == '__main__':
+    unittest.main()
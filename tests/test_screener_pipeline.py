@@ -0,0 +1,99 @@
+import threading
+import time
+import unittest
+from application.screener_pipeline import ScreenerPipeline
+from domain.entities.indicators import Indicators
+
+START = 1737729000  # 2025-01-24 14:30 UTC
+
+def candles(count, base=10.0):
+    return [{"close": base + m / 100, "volume": 100, "datetime": (START + m * 60) * 1000} for m in range(count)]
+
+class TestScreenerPipeline(unittest.TestCase):
+
+    def test_candidates_evaluated_concurrently(self):
+        def fetch_history(symbol, days, label="history"):
+            time.sleep(0.2)
+            return []
+        pipeline = ScreenerPipeline(fetch_history, lambda symbol, fetch: (fetch(symbol, 5), None), workers=4)
+        started = time.perf_counter()
+        self.assertEqual(pipeline.submit(["A", "B", "C", "D"]), ["A", "B", "C", "D"])
+        results = []
+        while len(results) < 4 and time.perf_counter() - started < 5:
+            results.extend(pipeline.drain())
+            time.sleep(0.01)
+        pipeline.stop()
+        self.assertEqual(sorted(symbol for symbol, _, _ in results), ["A", "B", "C", "D"])
+        # Serial evaluation would take 0.8 s
+        self.assertLess(time.perf_counter() - started, 0.6)
+
+    def test_in_flight_candidates_skipped(self):
+        release = threading.Event()
+        notified = threading.Event()
+        def screen(symbol, fetch):
+            release.wait(5)
+            return "buy", None
+        pipeline = ScreenerPipeline(lambda *args: [], screen, workers=2, on_result=notified.set)
+        self.assertEqual(pipeline.submit(["A", "B"]), ["A", "B"])
+        self.assertEqual(pipeline.submit(["A", "C"]), ["C"])
+        # Both workers are busy, so C waits in the candidate queue
+        self.assertEqual(pipeline.stats()['in_flight'], 2)
+        self.assertEqual(pipeline.stats()['queued'], 1)
+        release.set()
+        self.assertTrue(notified.wait(5))
+        deadline = time.perf_counter() + 5
+        while pipeline.stats()['completed'] < 3 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        pipeline.stop()
+        self.assertEqual(pipeline.stats(), {'submitted': 3, 'completed': 3, 'in_flight': 0, 'queued': 0, 'evicted': 0, 'stale': 0})
+        self.assertEqual(sorted(pipeline.drain()), [("A", "buy", None), ("B", "buy", None), ("C", "buy", None)])
+
+    def test_best_candidates_warmed_up_first(self):
+        release = threading.Event()
+        order = []
+        def screen(symbol, fetch):
+            release.wait(5)
+            order.append(symbol)
+            return "hold", None
+        pipeline = ScreenerPipeline(lambda *args: [], screen, workers=1)
+        pipeline.submit([("FIRST", 0.0)])
+        pipeline.submit([("LOW", 0.1), ("HIGH", 0.9), ("MID", 0.5)])
+        release.set()
+        deadline = time.perf_counter() + 5
+        while len(order) < 4 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        pipeline.stop()
+        self.assertEqual(order, ["FIRST", "HIGH", "MID", "LOW"])
+
+    def test_screen_failure_published_as_none(self):
+        def screen(symbol, fetch):
+            raise RuntimeError("boom")
+        pipeline = ScreenerPipeline(lambda *args: [], screen, workers=1)
+        with self.assertLogs(level='ERROR'):
+            pipeline.submit(["A"])
+            result = pipeline.results.get(timeout=5)
+        pipeline.stop()
+        self.assertEqual(result, ("A", None, None))
+
+class TestAdoptSymbol(unittest.TestCase):
+
+    def test_adopted_state_matches_direct_warm_up(self):
+        history = candles(60 * 40)
+        direct, warmed, adopter = Indicators(), Indicators(), Indicators()
+        for indicators in (direct, warmed):
+            for candle in history:
+                indicators.update_minute_data("AAA", candle['close'], candle['volume'], candle['datetime'])
+        adopter.update_minute_data("BBB", 5.0, 10, START * 1000)
+        adopter.adopt_symbol("AAA", warmed)
+
+        self.assertEqual(adopter.indicators["AAA"], direct.indicators["AAA"])
+        self.assertEqual(adopter.hourly_data["AAA"], direct.hourly_data["AAA"])
+        self.assertIn("BBB", adopter.current_hour)
+        # Further minutes update the adopted state exactly as the directly warmed one
+        for indicators in (direct, adopter):
+            indicators.update_minute_data("AAA", 20.0, 100, (START + 60 * 60 * 41) * 1000)
+        self.assertEqual(adopter.indicators["AAA"], direct.indicators["AAA"])
+        self.assertEqual(adopter.ema_values["AAA"], direct.ema_values["AAA"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import multiprocessing
+import time
+import unittest
+from application.partitioning import shard_for
+from application.sharded_runtime import ShardedRuntime
+from domain.entities.strategy import StrategyParameters, evaluate_signal
+from tests.test_indicator_series import random_walk_minutes
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+PARAMS = StrategyParameters(sma_short=3, sma_long=6, rsi_threshold=50, bollinger_width=1.0, volume_lookback=2, macd_lookback=4)
+
+def minute_updates(hours=80):
+    """Interleaved (symbol, close, volume, chart_time, service_time) updates for every symbol."""
+    columns = [random_walk_minutes(hours=hours, seed=seed) for seed in range(len(SYMBOLS))]
+    updates = []
+    for i in range(hours * 60):
+        for symbol, (timestamps, closes, volumes) in zip(SYMBOLS, columns):
+            ts = int(timestamps[i])
+            updates.append((symbol, float(closes[i]), float(volumes[i]), ts, ts))
+    return updates
+
+class TestShardedRuntime(unittest.TestCase):
+
+    def test_shard_for_is_stable_and_in_range(self):
+        self.assertEqual([shard_for(symbol, 4) for symbol in SYMBOLS], [shard_for(symbol, 4) for symbol in SYMBOLS])
+        self.assertTrue(all(0 <= shard_for(symbol, 3) < 3 for symbol in SYMBOLS))
+
+    def test_decisions_match_single_process(self):
+        updates = minute_updates()
+        indicators = PARAMS.create_indicators()
+        expected = {symbol: [] for symbol in SYMBOLS}
+
+        def evaluate(symbol, close):
+            action = evaluate_signal(indicators.indicators.get(symbol, {}), PARAMS)
+            if action in ("buy", "sell"):
+                expected[symbol].append((action, close))
+
+        indicators.update_minute_batch([update[:4] for update in updates], evaluate)
+
+        received = {symbol: [] for symbol in SYMBOLS}
+        runtime = ShardedRuntime(PARAMS, shards=3)
+        runtime.start()
+        for start in range(0, len(updates), 500):
+            runtime.route(updates[start:start + 500], received_ns=start)
+        runtime.stop()
+        published = runtime.drain()
+        for action, symbol, price, chart_time, received_ns in published:
+            received[symbol].append((action, price))
+
+        self.assertGreater(sum(len(decisions) for decisions in expected.values()), 0)
+        self.assertEqual(received, expected)
+        for _, symbol, price, chart_time, received_ns in published:
+            # Each decision carries its bar's chart time and the receive stamp of the batch that held the bar
+            self.assertIn((symbol, price, chart_time), [update[:2] + update[3:4] for update in updates[received_ns:received_ns + 500]])
+        self.assertEqual(sum(runtime.stats()['routed']), len(updates))
+
+    def test_stop_terminates_a_hung_shard(self):
+        runtime = ShardedRuntime(PARAMS, shards=2)
+        runtime.start()
+        runtime.processes[0].terminate()  # Never reads its stop sentinel
+        runtime.processes[0].join()
+        pending = runtime.load_history(next(symbol for symbol in SYMBOLS if runtime.shard(symbol) == 0), [])
+        runtime.processes[0] = multiprocessing.Process(target=time.sleep, args=(60,), daemon=True)
+        runtime.processes[0].start()
+        started = time.monotonic()
+        with self.assertLogs(level='WARNING'):
+            runtime.stop(timeout=0.5)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertFalse(any(process.is_alive() for process in runtime.processes))
+        self.assertFalse(runtime.executor.is_alive())
+        with self.assertRaises(RuntimeError):
+            pending.result(timeout=1)
+
+    def test_load_history_reports_hourly_count(self):
+        timestamps, closes, volumes = random_walk_minutes(hours=10)
+        candles = [{'close': c, 'volume': v, 'datetime': int(t)} for t, c, v in zip(timestamps, closes, volumes)]
+        runtime = ShardedRuntime(PARAMS, shards=2)
+        runtime.start()
+        hourly, action = runtime.load_history("AAA", candles).result(timeout=10)
+        runtime.stop()
+        self.assertEqual(hourly, 9)
+        self.assertIn(action, ("buy", "sell", "hold"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from tests.SimulatedStream import CandleCache, SimulatedStream
+
+def make_candle(minute, close):
+    return {"open": close, "high": close, "low": close, "close": close, "volume": 100, "datetime": minute * 60000}
+
+class TestSimulatedStreamMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        # AAA starts first; BBB starts later and has a gap at minute 3
+        self.write_ticker("AAA", [make_candle(m, 10 + m) for m in range(0, 5)])
+        self.write_ticker("BBB", [make_candle(m, 20 + m) for m in (2, 4, 5)])
+        self.stream = SimulatedStream(data_path=self.data_path, delay=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def write_ticker(self, ticker, candles):
+        with open(os.path.join(self.data_path, f"{ticker}.json"), "w") as f:
+            json.dump(candles, f)
+
+    def drain(self):
+        messages = []
+        while True:
+            message = self.stream._next_message()
+            if message is None:
+                return messages
+            messages.append(message)
+
+    def test_messages_are_chronological_and_grouped(self):
+        self.stream.send(self.stream.chart_equity("BBB,AAA", "0,1,2,3,4,5,6,7,8"))
+        messages = self.drain()
+
+        timestamps = [m["data"][0]["timestamp"] for m in messages]
+        self.assertEqual(timestamps, [m * 60000 for m in range(6)])
+        keys = [sorted(c["key"] for c in m["data"][0]["content"]) for m in messages]
+        self.assertEqual(keys, [["AAA"], ["AAA"], ["AAA", "BBB"], ["AAA"], ["AAA", "BBB"], ["BBB"]])
+        for message in messages:
+            for content in message["data"][0]["content"]:
+                self.assertEqual(content["7"], message["data"][0]["timestamp"])
+
+    def test_unsubscribe_drops_pending_candles(self):
+        self.stream.send(self.stream.chart_equity("AAA,BBB", "0,1,2,3,4,5,6,7,8"))
+        self.stream._next_message()
+        self.stream.send(self.stream.chart_equity("AAA", "0,1,2,3,4,5,6,7,8", command="UNSUBS"))
+        keys = {c["key"] for m in self.drain() for c in m["data"][0]["content"]}
+        self.assertEqual(keys, {"BBB"})
+
+    def test_late_subscription_starts_at_replay_time(self):
+        self.stream.send(self.stream.chart_equity("AAA", "0,1,2,3,4,5,6,7,8"))
+        for _ in range(4):
+            self.stream._next_message()  # Replay clock is now at minute 3
+        self.stream.send(self.stream.chart_equity("BBB", "0,1,2,3,4,5,6,7,8"))
+        bbb_times = [c["7"] for m in self.drain() for c in m["data"][0]["content"] if c["key"] == "BBB"]
+        self.assertEqual(bbb_times, [4 * 60000, 5 * 60000])
+
+class TestCandleCache(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        for ticker, count in (("AAA", 5), ("BBB", 3), ("CCC", 4)):
+            with open(os.path.join(self.data_path, f"{ticker}.json"), "w") as f:
+                json.dump([make_candle(m, 10 + m) for m in range(count)], f)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_history_and_replay_share_one_parse(self):
+        stream = SimulatedStream(data_path=self.data_path, delay=0)
+        history = stream.price_history("AAA").json()["candles"]
+        stream.send(stream.chart_equity("AAA", "0,1,2,3,4,5,6,7,8"))
+        self.assertEqual(stream.price_history("AAA").json()["candles"], history)
+        self.assertEqual(stream.cache.stats()['misses'], 1)
+        self.assertEqual(stream.cache.stats()['hits'], 2)
+        self.assertIs(stream.data_iterators["AAA"].candles, stream.cache.get("AAA"))
+        self.assertFalse(stream.price_history("ZZZ").ok)
+
+    def test_least_recently_used_evicted_beyond_cap(self):
+        cache = CandleCache(self.data_path, max_candles=9)
+        cache.get("AAA")
+        cache.get("BBB")
+        cache.get("AAA")
+        cache.get("CCC")  # 12 candles: BBB is least recently used
+        self.assertEqual(list(cache.entries), ["AAA", "CCC"])
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 3, 'evictions': 1, 'tickers': 2, 'candles': 9})
+
+if __name__ == '__main__':
+    unittest.main()
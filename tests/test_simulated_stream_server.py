@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock
+from schwabdev.stream import Stream
+from application.TradingBot import TradingBot
+from infrastructure.adapters.tape import TapeRecorder
+from tests.SimulatedStreamServer import SimulatedStreamServer
+
+START = 1737729000  # 2025-01-24 14:30 UTC
+
+def wait_for(condition, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+class TestSimulatedStreamServer(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        for i, ticker in enumerate(["AAA", "BBB", "CCC"]):
+            candles = [{"open": 10, "high": 10, "low": 10, "close": 10 + i + m / 100, "volume": 100, "datetime": (START + m * 60) * 1000} for m in range(120)]
+            with open(os.path.join(self.data_path, f"{ticker}.json"), "w") as f:
+                json.dump(candles, f)
+        self.server = None
+        self.stream = None
+
+    def tearDown(self):
+        if self.stream and self.stream.active:
+            self.stream.stop()
+        if self.server:
+            self.server.stop()
+        shutil.rmtree(self.data_path)
+
+    def connect(self, receiver, **kwargs):
+        self.server = SimulatedStreamServer(**kwargs)
+        self.server.start()
+        self.stream = Stream(self.server.client())
+        self.stream.start(receiver=receiver)
+        self.assertTrue(wait_for(lambda: self.stream.active))
+
+    def test_login_subscribe_and_unsubscribe(self):
+        received = []
+        self.connect(lambda raw: received.append(json.loads(raw)), data_path=self.data_path, rate=2000.0, screener_interval=30)
+        self.assertEqual(received[0]["response"][0]["command"], "LOGIN")
+        self.stream.send(self.stream.chart_equity("AAA,BBB", "0,1,2,3,4,5,6,7,8"))
+        self.stream.send(self.stream.screener_equity("$SPX.X_AVERAGE_PERCENT_VOLUME_60", "0,1,2,3,4,5,6,7,8"))
+        data = lambda service: [s for m in received for s in m.get("data", []) if s["service"] == service]
+        self.assertTrue(wait_for(lambda: len(data("CHART_EQUITY")) == 120))
+        chart = data("CHART_EQUITY")
+        self.assertEqual({c["key"] for c in chart[0]["content"]}, {"AAA", "BBB"})
+        self.assertEqual([s["timestamp"] for s in chart], [(START + m * 60) * 1000 for m in range(120)])
+        self.assertEqual(data("SCREENER_EQUITY")[0]["content"][0]["4"], [{"symbol": "AAA"}, {"symbol": "BBB"}, {"symbol": "CCC"}])
+
+        self.stream.send(self.stream.chart_equity("AAA", "0,1,2,3,4,5,6,7,8", command="UNSUBS"))
+        self.assertTrue(wait_for(lambda: any(r["command"] == "UNSUBS" for m in received for r in m.get("response", []))))
+        self.assertEqual(self.server.connections, 1)
+
+    def test_tape_feeds_bot_through_stream(self):
+        tape = os.path.join(self.data_path, "session.tape")
+        recorder = TapeRecorder(tape)
+        for minute in range(60):
+            content = {"key": "AAA", "4": 10.0 + minute / 100, "5": 100, "7": (START + minute * 60) * 1000}
+            recorder.record(json.dumps({"data": [{"service": "CHART_EQUITY", "timestamp": content["7"], "content": [content]}]}))
+        recorder.close()
+        bot = TradingBot(None, None, client=Mock(), stream=Mock())
+        self.connect(bot.response_handler, tape=tape)
+        # Tape frames flow through the real Stream receive loop into response_handler
+        self.assertTrue(wait_for(lambda: len(bot.message_queue) >= 61))
+        messages, collapse = bot.next_batch()
+        bot.process_batch(messages, collapse=collapse)
+        self.assertEqual(bot.decoder.stats()['updates'], 60)
+        self.assertEqual(bot.indicators.last_close["AAA"], 10.59)
+
+if __name__ == '__main__':
+    unittest.main()
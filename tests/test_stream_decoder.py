@@ -0,0 +1,90 @@
+import json
+import unittest
+from application.stream_decoder import StreamDecoder, chart_updates
+from domain.entities.indicators import Indicators
+
+START_MS = 1737729000000  # 2025-01-24 14:30 UTC
+
+def chart_message(candles, timestamp=None):
+    content = [{"key": symbol, "4": close, "5": volume, "7": chart_time} for symbol, close, volume, chart_time in candles]
+    service = {"service": "CHART_EQUITY", "content": content}
+    if timestamp is not None:
+        service["timestamp"] = timestamp
+    return json.dumps({"data": [service]})
+
+class TestStreamDecoder(unittest.TestCase):
+
+    def test_latest_update_per_symbol_minute_wins(self):
+        decoder = StreamDecoder()
+        batch = decoder.decode([
+            chart_message([("AAA", 10.0, 100, START_MS), ("BBB", 20.0, 200, START_MS)], START_MS),
+            chart_message([("AAA", 10.5, 150, START_MS)], START_MS + 1000),
+            chart_message([("AAA", 11.0, 50, START_MS + 60000)], START_MS + 60000)
+        ])
+        self.assertEqual(batch.chart, [
+            ("AAA", 10.5, 150, START_MS, START_MS + 1000),
+            ("BBB", 20.0, 200, START_MS, START_MS),
+            ("AAA", 11.0, 50, START_MS + 60000, START_MS + 60000)
+        ])
+        self.assertEqual(batch.timestamp, START_MS + 60000)
+        self.assertEqual(decoder.stats(), {'messages': 3, 'updates': 4, 'kept': 3, 'collapsed_batches': 0})
+
+    def test_late_correction_keeps_minutes_in_order_across_an_hour(self):
+        last_minute = START_MS + 29 * 60000  # 14:59, the last minute of the hour
+        batch = StreamDecoder().decode([
+            chart_message([("AAA", 10.0, 100, last_minute)]),
+            chart_message([("AAA", 11.0, 50, last_minute + 60000)]),
+            chart_message([("AAA", 10.2, 120, last_minute)])
+        ])
+        self.assertEqual([update[1:4] for update in batch.chart], [(10.2, 120, last_minute), (11.0, 50, last_minute + 60000)])
+
+    def test_collapse_keeps_latest_per_symbol_and_screener(self):
+        decoder = StreamDecoder()
+        screeners = [json.dumps({"data": [{"service": "SCREENER_EQUITY", "content": [{"key": key}]}]}) for key in ("CCC", "DDD")]
+        batch = decoder.decode([
+            chart_message([("AAA", 10.0, 100, START_MS), ("BBB", 20.0, 200, START_MS)]),
+            screeners[0],
+            chart_message([("AAA", 11.0, 50, START_MS + 60000)]),
+            screeners[1]
+        ], collapse=True)
+        self.assertEqual([update[:2] for update in batch.chart], [("AAA", 11.0), ("BBB", 20.0)])
+        self.assertEqual([service["content"][0]["key"] for service in batch.screener], ["DDD"])
+        self.assertEqual(decoder.stats()['collapsed_batches'], 1)
+
+    def test_separates_screener_heartbeats_and_malformed_messages(self):
+        decoder = StreamDecoder()
+        screener = {"service": "SCREENER_EQUITY", "timestamp": START_MS, "content": [{"key": "CCC"}]}
+        batch = decoder.decode([
+            json.dumps({"data": [screener]}),
+            json.dumps({"notify": [{"heartbeat": str(START_MS)}]}),
+            "{not json"
+        ])
+        self.assertEqual(batch.screener, [screener])
+        self.assertEqual(batch.heartbeats, [START_MS])
+        self.assertEqual(batch.chart, [])
+        self.assertEqual(decoder.stats()['messages'], 2)
+
+    def test_chart_updates_skips_incomplete_entries(self):
+        service = {"service": "CHART_EQUITY", "content": [{"key": "AAA", "4": 10.0, "5": 100}, {"key": "BBB", "4": 1.0, "5": 2, "7": START_MS}]}
+        self.assertEqual(chart_updates(service), [("BBB", 1.0, 2, START_MS, START_MS)])
+
+class TestIndicatorsBatch(unittest.TestCase):
+
+    def test_batch_matches_sequential_updates(self):
+        updates = [("AAA", 10 + (m % 7) / 10, 100 + m, START_MS + m * 60000) for m in range(600)]
+        sequential = Indicators()
+        expected = []
+        for symbol, close, volume, timestamp in updates:
+            if sequential.update_minute_data(symbol, close, volume, timestamp):
+                expected.append((symbol, close, len(sequential.hourly_data.get(symbol, []))))
+
+        batched = Indicators()
+        seen = []
+        count = batched.update_minute_batch(updates, lambda symbol, close: seen.append((symbol, close, len(batched.hourly_data.get(symbol, [])))))
+        self.assertEqual(seen, expected)
+        self.assertEqual(count, len(expected))
+        self.assertEqual(batched.hourly_data, sequential.hourly_data)
+        self.assertEqual(batched.indicators, sequential.indicators)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from application.subscription_manager import SubscriptionManager
+from infrastructure.adapters.clock import VirtualClock
+from tests.SimulatedStream import SimulatedStream
+
+class TestSubscriptionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = VirtualClock(start=1000.0)
+        self.stream = SimulatedStream(data_path="/nonexistent")
+        self.sent = []
+        self.manager = SubscriptionManager(self.stream, self.clock, hold=600.0)
+
+    def sync(self, keep=()):
+        return self.manager.sync(self.sent.append, keep)
+
+    def test_single_add_and_unsubs_per_cycle(self):
+        for symbol in ("CCC", "AAA", "BBB"):
+            self.manager.want(symbol)
+        self.assertEqual(self.sync(), (["AAA", "BBB", "CCC"], []))
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual([(r["command"], r["parameters"]["keys"]) for r in self.sent[0]], [("ADD", "AAA,BBB,CCC")])
+
+        self.clock.advance(300)
+        self.manager.want("DDD")
+        self.clock.advance(400)
+        self.assertEqual(self.sync(keep=["BBB"]), (["DDD"], ["AAA", "CCC"]))
+        self.assertEqual([(r["command"], r["parameters"]["keys"]) for r in self.sent[1]], [("ADD", "DDD"), ("UNSUBS", "AAA,CCC")])
+        self.assertEqual(self.manager.current, {"BBB", "DDD"})
+
+    def test_hold_prevents_churn(self):
+        self.manager.want("AAA")
+        self.sync()
+        # Just added without a position: kept until the hold expires
+        self.clock.advance(599)
+        self.assertEqual(self.sync(), ([], []))
+        self.manager.want("AAA")  # Qualified again; the hold restarts
+        self.clock.advance(599)
+        self.assertEqual(self.sync(), ([], []))
+        self.clock.advance(1)
+        self.assertEqual(self.sync(), ([], ["AAA"]))
+        self.assertFalse(self.manager.tracks("AAA"))
+        self.assertEqual(len(self.sent), 2)
+
+    def test_tracked_symbols_need_no_request(self):
+        self.manager.track("AAA")
+        self.assertTrue(self.manager.tracks("AAA"))
+        self.assertEqual(self.sync(), ([], []))
+        self.assertEqual(self.sent, [])
+        self.assertEqual(self.manager.stats(), {'subscribed': 1, 'requests': 0, 'added': 0, 'dropped': 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock
+from application.TradingBot import TradingBot
+from infrastructure.adapters.tape import MAGIC, TapeRecorder, TapeReplayer, decode_varint, encode_varint, read_tape
+
+START_NS = 1737729000 * 10 ** 9
+
+def chart_message(symbol, minute):
+    content = {"key": symbol, "1": 10.0, "2": 10.1, "3": 9.9, "4": 10.0 + minute / 100, "5": 100 + minute, "7": (START_NS // 10 ** 6) + minute * 60000}
+    return json.dumps({"data": [{"service": "CHART_EQUITY", "timestamp": content["7"], "command": "SUBS", "content": [content]}]})
+
+class TestTape(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "session.tape")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_varint_round_trip(self):
+        buffer = bytearray()
+        values = [0, 1, 127, 128, 300, 2 ** 35 + 7]
+        for value in values:
+            encode_varint(value, buffer)
+        position = 0
+        for value in values:
+            decoded, position = decode_varint(buffer, position)
+            self.assertEqual(decoded, value)
+        self.assertEqual(decode_varint(buffer[:-1], len(buffer) - 1)[0], None)
+
+    def test_round_trip_and_compression(self):
+        recorder = TapeRecorder(self.path)
+        messages = [(START_NS + minute * 60 * 10 ** 9 + 1234000, chart_message("AAA", minute)) for minute in range(390)]
+        for received_ns, message in messages:
+            recorder.record(message, received_ns)
+        recorder.close()
+        recorder.record("ignored after close")
+        self.assertEqual(list(read_tape(self.path)), messages)
+        # Consecutive messages differ only in a few digits
+        self.assertLess(os.path.getsize(self.path), recorder.stats()['bytes_in'] / 5)
+
+    def test_backwards_time_step_does_not_shift_later_records(self):
+        recorder = TapeRecorder(self.path)
+        for offset_s in (0, 10, 5, 20):  # The clock stepped back 5 s before the third record
+            recorder.record(f"at {offset_s}", START_NS + offset_s * 10 ** 9)
+        recorder.close()
+        self.assertEqual([received_ns for received_ns, _ in read_tape(self.path)],
+                         [START_NS, START_NS + 10 * 10 ** 9, START_NS + 10 * 10 ** 9, START_NS + 20 * 10 ** 9])
+
+    def test_appended_sessions_and_truncated_tail(self):
+        for session in range(2):
+            recorder = TapeRecorder(self.path)
+            recorder.record(f"session {session}", START_NS + session * 10 ** 9)
+            recorder.close()
+        self.assertEqual(list(read_tape(self.path)), [(START_NS, "session 0"), (START_NS + 10 ** 9, "session 1")])
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data[:-4])
+        self.assertEqual(list(read_tape(self.path))[0], (START_NS, "session 0"))
+        with open(self.path, "wb") as f:
+            f.write(b"not a tape")
+        with self.assertRaises(ValueError):
+            list(read_tape(self.path))
+        self.assertTrue(MAGIC.endswith(b"\n"))
+
+    def test_accelerated_replay(self):
+        recorder = TapeRecorder(self.path)
+        for i in range(5):
+            recorder.record(f"m{i}", START_NS + i * 10 ** 8)  # 0.4 s of recording
+        recorder.close()
+        received = []
+        started = time.perf_counter()
+        TapeReplayer(self.path, speed=4.0).replay(received.append)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(received, [f"m{i}" for i in range(5)])
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.3)
+
+    def test_bot_records_and_replays(self):
+        bot = TradingBot(None, None, client=Mock(), stream=Mock(), tape=self.path)
+        for minute in range(3):
+            bot.response_handler(chart_message("AAA", minute))
+        bot.stop()
+        replayed = TradingBot(None, None, client=Mock(), stream=TapeReplayer(self.path, speed=None))
+        replayed.stream.replay(replayed.response_handler)
+        self.assertEqual(len(replayed.message_queue), 3)
+        self.assertEqual(replayed.message_queue.drain(), [chart_message("AAA", minute) for minute in range(3)])
+
+if __name__ == '__main__':
+    unittest.main()
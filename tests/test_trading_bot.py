@@ -0,0 +1,309 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from unittest.mock import Mock
+from application.TradingBot import TradingBot
+from application.message_queue import BackpressurePolicy
+from infrastructure.adapters.clock import VirtualClock
+from infrastructure.adapters.rate_limiter import PriorityRateLimiter
+from tests.SimulatedStream import SimulatedStream
+
+START = 1737729000  # 2025-01-24 14:30 UTC
+
+def chart_message(symbol, minute):
+    content = {"key": symbol, "4": 10.0, "5": 100, "7": (START + minute * 60) * 1000}
+    return json.dumps({"data": [{"service": "CHART_EQUITY", "content": [content]}]})
+
+def screener_message(symbol):
+    return json.dumps({"data": [{"service": "SCREENER_EQUITY", "content": [{"key": symbol}]}]})
+
+def wait_for(condition, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+class TestTradingBotAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.client = Mock()
+        self.client.account_linked.return_value = Mock(ok=True, json=Mock(return_value=[{"hashValue": "HASH"}]))
+        self.client.price_history.return_value = Mock(ok=True, json=Mock(return_value={"candles": []}))
+        self.stream = Mock()
+        self.stream.subscriptions = {}
+
+    def start(self, bot, symbols):
+        thread = threading.Thread(target=asyncio.run, args=(bot.run_async(symbols),), daemon=True)
+        thread.start()
+        self.assertTrue(wait_for(lambda: bot.running))
+        return thread
+
+    def test_orders_do_not_block_decisions(self):
+        def slow_order(account_hash, order):
+            time.sleep(0.3)
+            return Mock(ok=True)
+        self.client.order_place.side_effect = slow_order
+        bot = TradingBot(None, None, simulate=False, client=self.client, stream=self.stream)
+        decided = []
+        def decisions(updates):
+            decided.extend(time.perf_counter() for _ in updates)
+            return [("buy", symbol, 10.0) for symbol, *_ in updates]
+        bot.decisions = decisions
+        symbols = ["AAA", "BBB", "CCC", "DDD"]  # One per order, as an open ticket blocks a second order for its symbol
+        thread = self.start(bot, symbols)
+
+        sent = time.perf_counter()
+        for symbol in symbols:
+            bot.response_handler(chart_message(symbol, 0))
+        self.assertTrue(wait_for(lambda: len(decided) == 4))
+        # Every decision is made before the first 0.3 s order round-trip completes
+        self.assertLess(decided[-1] - sent, 0.25)
+        self.assertTrue(wait_for(lambda: self.client.order_place.call_count == 4))
+        bot.stop()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+    def test_screener_warm_up_does_not_block_chart_messages(self):
+        bot = TradingBot(None, None, client=self.client, stream=self.stream)
+        thread = self.start(bot, ["AAA"])
+        def slow_history(**kwargs):
+            time.sleep(0.5)
+            return Mock(ok=True, json=Mock(return_value={"candles": []}))
+        self.client.price_history.side_effect = slow_history
+        charted = []
+        bot.decisions = lambda updates: charted.extend(time.perf_counter() for _ in updates) or []
+
+        sent = time.perf_counter()
+        bot.response_handler(screener_message("BBB"))
+        bot.response_handler(chart_message("AAA", 0))
+        self.assertTrue(wait_for(lambda: charted))
+        self.assertLess(charted[0] - sent, 0.25)
+        self.assertTrue(wait_for(lambda: self.client.price_history.call_count == 2))
+        bot.stop()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+class TestTradingBotOrders(unittest.TestCase):
+
+    def test_live_orders_handed_off_to_gateway(self):
+        client = Mock()
+        client.account_linked.return_value = Mock(ok=True, json=Mock(return_value=[{"hashValue": "HASH"}]))
+        def slow_order(account_hash, order):
+            time.sleep(0.3)
+            return Mock(ok=True, headers={"location": "https://api.schwabapi.com/trader/v1/accounts/HASH/orders/42"})
+        client.order_place.side_effect = slow_order
+        bot = TradingBot(None, None, simulate=False, client=client, stream=Mock())
+        bot.decisions = lambda updates: [("buy", symbol, 10.0) for symbol, *_ in updates]
+        bot.response_handler(chart_message("AAA", 0))
+        messages, collapse = bot.next_batch()
+        started = time.perf_counter()
+        bot.process_batch(messages, collapse=collapse)
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertTrue(wait_for(lambda: not bot.orders.updates.empty()))
+        with self.assertLogs('TradingBot', level='INFO') as logs:
+            bot.apply_order_updates()
+        self.assertIn("(order 42)", logs.output[0])
+        snapshot = bot.latency.snapshot()
+        self.assertEqual(snapshot['tick_to_order']['count'], 1)
+        self.assertGreaterEqual(snapshot['order_ack']['max_us'], 250000)
+        bot.orders.stop()
+
+    def test_open_ticket_blocks_duplicate_live_orders(self):
+        client = Mock()
+        client.account_linked.return_value = Mock(ok=True, json=Mock(return_value=[{"hashValue": "HASH"}]))
+        placing = threading.Event()
+        def held_order(account_hash, order):
+            placing.wait(5)
+            return Mock(ok=False, text="rejected")
+        client.order_place.side_effect = held_order
+        bot = TradingBot(None, None, simulate=False, client=client, stream=Mock())
+        bot.execute("buy", "AAA", 10.0)
+        bot.execute("buy", "AAA", 10.0)  # The first ticket is still queued or submitting
+        self.assertEqual(bot.orders.stats()['submitted'], 1)
+        placing.set()
+        self.assertTrue(wait_for(lambda: not bot.orders.updates.empty()))
+        with self.assertLogs('TradingBot', level='WARNING'):
+            bot.apply_order_updates()
+        self.assertEqual(bot.open_tickets, {})
+        bot.execute("buy", "AAA", 10.0)
+        self.assertEqual(bot.orders.stats()['submitted'], 2)
+        bot.orders.stop()
+
+    def test_orders_pass_screener_warm_up_in_rate_limiter(self):
+        client = Mock()
+        client.account_linked.return_value = Mock(ok=True, json=Mock(return_value=[{"hashValue": "HASH"}]))
+        client.price_history.return_value = Mock(ok=True, json=Mock(return_value={"candles": []}))
+        client.order_place.return_value = Mock(ok=True, headers={})
+        limiter = PriorityRateLimiter(rate=10.0, burst=2)
+        bot = TradingBot(None, None, simulate=False, client=client, stream=Mock(), rate_limiter=limiter)
+        # A warm-up burst queues in the history lane behind the exhausted bucket
+        warm_ups = [threading.Thread(target=bot._fetch_history, args=(f"S{i}", 5)) for i in range(4)]
+        for thread in warm_ups:
+            thread.start()
+        self.assertTrue(wait_for(lambda: limiter.stats()['history']['waiting'] >= 3))
+        started = time.perf_counter()
+        self.assertEqual(bot.place_order("buy", "AAA", 1), (True, None))
+        # The order takes the token held in reserve instead of waiting for the warm-ups
+        self.assertLess(time.perf_counter() - started, 0.05)
+        for thread in warm_ups:
+            thread.join(timeout=5)
+        self.assertEqual(limiter.stats()['orders']['granted'], 1)
+        self.assertEqual(client.price_history.call_count, 4)
+        bot.orders.stop()
+
+class TestTradingBotScreener(unittest.TestCase):
+
+    def test_inline_scanner_screens_payload_symbols_best_first(self):
+        stream = Mock()
+        stream.subscriptions = {}
+        bot = TradingBot(None, None, client=Mock(), stream=stream)
+        screened = []
+        bot._screen = lambda symbol, *args: screened.append(symbol)
+        bot.stock_scanner({"service": "SCREENER_EQUITY", "content": [{"key": "$SPX.X_VOLUME_60", "2": "VOLUME", "4": [
+            {"symbol": "AAA", "volume": 100}, {"symbol": "BBB", "volume": 300}, {"symbol": "AAA", "volume": 100}
+        ]}]})
+        self.assertEqual(screened, ["BBB", "AAA"])
+
+    def test_buy_results_adopted_and_subscribed(self):
+        stream = Mock()
+        stream.subscriptions = {}
+        bot = TradingBot(None, None, client=Mock(), stream=stream)
+        warmed = bot.strategy.create_indicators()
+        warmed.update_minute_data("BBB", 10.0, 100, START * 1000)
+        outcomes = {"BBB": ("buy", warmed), "CCC": ("sell", None)}
+        bot.start_screener(lambda symbol, fetch: outcomes[symbol])
+        bot.process_batch([screener_message("BBB"), screener_message("CCC")])
+        self.assertTrue(wait_for(lambda: bot.screener.stats()['completed'] == 2))
+        bot.apply_screener_results()
+        bot.screener.stop()
+        self.assertEqual(bot.indicators.last_close["BBB"], 10.0)
+        self.assertNotIn("CCC", bot.indicators.last_close)
+        stream.chart_equity.assert_called_once_with("BBB", "0,1,2,3,4,5,6,7,8")
+        stream.send.assert_called_once()
+
+class TestTradingBotBackpressure(unittest.TestCase):
+
+    def test_lag_alert_and_collapse(self):
+        policy = BackpressurePolicy(collapse_lag=0.01, lag_alert=0.01)
+        bot = TradingBot(None, None, client=Mock(), stream=Mock(), backpressure=policy)
+        for minute in range(3):
+            bot.response_handler(chart_message("AAA", minute))
+        time.sleep(0.02)
+        with self.assertLogs('TradingBot', level='WARNING'):
+            messages, collapse = bot.next_batch()
+        self.assertEqual(len(messages), 3)
+        self.assertTrue(collapse)
+        self.assertEqual(bot.lag_alerts, 1)
+        bot.process_batch(messages, collapse=collapse)
+        self.assertEqual(bot.decoder.stats()['kept'], 1)
+
+    def test_virtual_clock_defaults_to_lossless(self):
+        bot = TradingBot(None, None, client=Mock(), stream=Mock(), clock=VirtualClock(start=START))
+        self.assertEqual(bot.message_queue.overflow, "block")
+        self.assertIsNone(bot.backpressure.collapse_lag)
+        live = TradingBot(None, None, client=Mock(), stream=Mock())
+        self.assertEqual(live.message_queue.overflow, "shed")
+        self.assertIsNone(live.backpressure.collapse_lag)  # Collapsing drops minute volumes, so it is opt-in
+
+class TestTradingBotLatency(unittest.TestCase):
+
+    def test_stages_recorded_and_dumped(self):
+        path = os.path.join(tempfile.mkdtemp(), "latency.json")
+        bot = TradingBot(None, None, client=Mock(), stream=Mock(), latency_dump=path)
+        for minute in range(0, 120, 30):
+            bot.response_handler(chart_message("AAA", minute))
+        messages, collapse = bot.next_batch()
+        bot.process_batch(messages, collapse=collapse)
+        snapshot = bot.latency.snapshot()
+        for stage in ('queue_wait', 'decode', 'indicators', 'decision', 'tick_to_decision'):
+            self.assertGreater(snapshot[stage]['count'], 0, stage)
+        self.assertGreaterEqual(snapshot['tick_to_decision']['max_us'], snapshot['decision']['max_us'])
+        bot.report()
+        with open(path) as f:
+            self.assertEqual(json.load(f)['stages']['queue_wait']['count'], 4)
+
+class TestTradingBotAsyncReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        for i, ticker in enumerate(["AAA", "BBB"]):
+            candles = [
+                {"open": 10 + i, "high": 10 + i, "low": 10 + i, "close": 10 + i + m / 100, "volume": 100, "datetime": (START + m * 60) * 1000}
+                for m in range(180)
+            ]
+            with open(os.path.join(self.data_path, f"{ticker}.json"), "w") as f:
+                json.dump(candles, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_replay_under_virtual_clock(self):
+        clock = VirtualClock(start=START)
+        stream = SimulatedStream(data_path=self.data_path, delay=0)
+        bot = TradingBot(None, None, client=stream, stream=stream, clock=clock)
+        bot.portfolio.report_gains_losses = Mock()
+        thread = threading.Thread(target=asyncio.run, args=(bot.run_async(["AAA", "BBB"]),), daemon=True)
+        wall = time.perf_counter()
+        thread.start()
+        wait_for(lambda: bot.running and not stream.data_iterators and not len(bot.message_queue), timeout=10)
+        bot.stop()
+        thread.join(timeout=5)  # Finish the drained batch while the stream is still active
+        stream.stop()
+
+        self.assertLess(time.perf_counter() - wall, 10)
+        self.assertEqual(clock.time(), START + 179 * 60)
+        self.assertEqual(bot.portfolio.report_gains_losses.call_count, 179 * 60 // bot.report_interval)
+
+    def test_sharded_replay_routes_every_update(self):
+        clock = VirtualClock(start=START)
+        stream = SimulatedStream(data_path=self.data_path, delay=0)
+        bot = TradingBot(None, None, client=stream, stream=stream, clock=clock)
+        thread = threading.Thread(target=bot.run_sharded, kwargs={'initial_symbols': ["AAA", "BBB"], 'shards': 2}, daemon=True)
+        thread.start()
+        wait_for(lambda: bot.running and not stream.data_iterators and not len(bot.message_queue), timeout=10)
+        bot.stop()
+        thread.join(timeout=10)
+        stream.stop()
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(sum(bot.sharded.stats()['routed']), 2 * 180)
+        self.assertEqual(clock.time(), START + 179 * 60)
+
+class TestTradingBotShardedScreening(unittest.TestCase):
+
+    def test_hung_or_failed_shard_skips_the_symbol(self):
+        bot = TradingBot(None, None, client=Mock(), stream=Mock())
+        bot.shard_timeout = 0.05
+        bot.sharded = Mock()
+        bot.sharded.load_history.return_value = Future()
+        fetch = Mock(return_value=[{"close": 10.0, "volume": 100, "datetime": START * 1000}])
+        with self.assertLogs('TradingBot', level='ERROR'):
+            self.assertEqual(bot._screen_sharded("AAA", fetch), (None, None))
+        failed = Future()
+        failed.set_exception(RuntimeError("shard died"))
+        bot.sharded.load_history.return_value = failed
+        with self.assertLogs('TradingBot', level='ERROR'):
+            self.assertEqual(bot._screen_sharded("AAA", fetch), (None, None))
+        answered = Future()
+        answered.set_result((40, "buy"))
+        bot.sharded.load_history.return_value = answered
+        self.assertEqual(bot._screen_sharded("AAA", fetch), ("buy", None))
+
+    def test_shard_decisions_execute_on_the_trading_loop(self):
+        bot = TradingBot(None, None, client=Mock(), stream=Mock())
+        bot.sharded = Mock()
+        bot.sharded.drain.return_value = [("buy", "AAA", 10.0, START * 1000, time.perf_counter_ns())]
+        executed = []
+        bot.execute = lambda *args, **kwargs: executed.append((args, dict(bot.signal_times), threading.current_thread()))
+        bot.apply_shard_decisions()
+        self.assertEqual(executed, [(("buy", "AAA", 10.0), {"AAA": START * 1000}, threading.current_thread())])
+        self.assertEqual(bot.latency.snapshot()['tick_to_decision']['count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
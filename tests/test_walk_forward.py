@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from application.walk_forward import WalkForward, fold_windows, DAY_MS, _init_worker, _fold_task
+from tests.test_indicator_series import random_walk_minutes
+
+class TestWalkForward(unittest.TestCase):
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        self.symbols = ["AAA", "BBB"]
+        for seed, symbol in enumerate(self.symbols):
+            timestamps, closes, volumes = random_walk_minutes(hours=240, seed=seed + 1)
+            candles = [
+                {"open": c, "high": c, "low": c, "close": c, "volume": v, "datetime": int(t)}
+                for t, c, v in zip(timestamps.tolist(), closes.tolist(), volumes.tolist())
+            ]
+            with open(os.path.join(self.data_path, f"{symbol}.json"), "w") as f:
+                json.dump(candles, f)
+        self.grid = {'sma_short': [3, 5], 'sma_long': [6], 'rsi_threshold': [50, 70], 'bollinger_width': [1.0], 'volume_lookback': [2], 'macd_lookback': [4]}
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_fold_windows_roll_forward(self):
+        days = list(range(100, 110))
+        folds = fold_windows(days, in_sample_days=4, out_of_sample_days=2)
+        self.assertEqual(folds, [
+            (100 * DAY_MS, 104 * DAY_MS, 106 * DAY_MS),
+            (102 * DAY_MS, 106 * DAY_MS, 108 * DAY_MS),
+            (104 * DAY_MS, 108 * DAY_MS, 110 * DAY_MS),
+        ])
+        self.assertEqual(len(fold_windows(days, 4, 2, step_days=1)), 5)
+        self.assertEqual(fold_windows(days, 8, 4), [])
+
+    def test_parallel_folds_match_serial(self):
+        walk = WalkForward(self.data_path, self.symbols, self.grid, in_sample_days=4, out_of_sample_days=2, step_days=1, workers=2)
+        report = walk.run()
+        folds = report['folds']
+        self.assertEqual([fold['fold'] for fold in folds], list(range(len(folds))))
+        self.assertGreater(len(folds), 1)
+
+        _init_worker(self.data_path, None, self.symbols, walk.param_sets)
+        for fold in folds:
+            expected = _fold_task(fold['fold'], fold['window'], 100, 100000.0)
+            self.assertEqual(expected['params'], fold['params'])
+            self.assertAlmostEqual(expected['out_of_sample']['pnl'], fold['out_of_sample']['pnl'])
+        self.assertAlmostEqual(report['out_of_sample']['pnl'], sum(fold['out_of_sample']['pnl'] for fold in folds))
+
+    def test_empty_grid_rejected(self):
+        with self.assertRaises(ValueError):
+            WalkForward(self.data_path, self.symbols, dict(self.grid, sma_short=[]))
+
+if __name__ == '__main__':
+    unittest.main()